@@ -0,0 +1,113 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Answers with canned, well-formed responses after a configurable delay, so the
+LLM-bound parts of the pipeline can be benchmarked without network access or
+API cost. Point the app at it with ``Config.OPENAI_BASE_URL``.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class FakeLLMServer:
+    """OpenAI-compatible stub server with configurable latency"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, host: str = "127.0.0.1", port: int = 0, seed: int = 0,
+                 model_latency: Optional[Dict[str, float]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        # Per-model latency overrides, e.g. to make the large tier slow
+        self.model_latency = dict(model_latency or {})
+        self.request_count = 0
+        self.model_counts: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _delay(self, model: Optional[str] = None) -> float:
+        with self._lock:
+            self.request_count += 1
+            self.model_counts[model] = self.model_counts.get(model, 0) + 1
+            jitter = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.model_latency.get(model, self.latency) + jitter)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                time.sleep(server._delay(body.get("model")))
+                payload = json.dumps(_completion(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _reply_content(body: Dict[str, Any]) -> str:
+    prompt = body["messages"][-1]["content"]
+    response_format = body.get("response_format") or {}
+    schema_name = (response_format.get("json_schema") or {}).get("name")
+    table = re.search(r"Table(?: Name)?:\s*(\w+)", prompt)
+    table_name = table.group(1) if table else "data"
+
+    if schema_name == "ColumnDescription":
+        return json.dumps({"description": "Synthetic column used for benchmarking."})
+    if schema_name == "SQLGenerationResponse":
+        return json.dumps({"sql": f"SELECT COUNT(*) AS row_count FROM {table_name};", "explanation": None})
+    return "The query returned the requested rows."
+
+
+def _completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    content = _reply_content(body)
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": len(body["messages"][-1]["content"]) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(body["messages"][-1]["content"]) + len(content)) // 4,
+        },
+    }
@@ -0,0 +1,56 @@
+"""
+Scaling benchmark for ParallelProfiler.
+
+Usage:
+    python -m benchmarks.profile_scaling --rows 2000000 --columns 100 --workers 1 2 4 8 16
+
+Profiles the same synthetic CSV with each worker count and reports wall time
+and speedup relative to the single-process CSVAnalyzer.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic_data import DatasetSpec, generate_csv
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=100)
+    parser.add_argument("--cardinality", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--shard-mb", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    from src.backend.csv_analyzer import CSVAnalyzer
+    from src.backend.parallel_profiler import ParallelProfiler
+
+    spec = DatasetSpec(rows=args.rows, columns=args.columns, cardinality=args.cardinality)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(generate_csv(spec, Path(tmp) / f"{spec.name}.csv"))
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{spec.name}: {size_mb:.0f} MB, {os.cpu_count()} CPUs available")
+
+        start = time.perf_counter()
+        CSVAnalyzer().profile_csv(path)
+        serial = time.perf_counter() - start
+        print(f"{'serial':>10} {serial:8.2f}s {1.0:6.2f}x")
+
+        for workers in args.workers:
+            profiler = ParallelProfiler(workers=workers, shard_bytes=args.shard_mb * 1024 * 1024)
+            start = time.perf_counter()
+            profiler.profile_csv(path)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8}w {elapsed:8.2f}s {serial / elapsed:6.2f}x  ({len(profiler.plan(path))} shards)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
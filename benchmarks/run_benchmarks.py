@@ -0,0 +1,234 @@
+"""
+Benchmark runner for the CSV -> schema -> SQL pipeline.
+
+Usage:
+    python -m benchmarks.run_benchmarks                 # run and compare with the saved baseline
+    python -m benchmarks.run_benchmarks --save-baseline # run and store the results as the new baseline
+    python -m benchmarks.run_benchmarks --quick         # smaller matrix for CI
+
+Exits with status 1 when any benchmark is slower than the baseline by more than
+``--threshold`` (relative, default 25%).
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic_data import DatasetSpec, generate_csv
+from config.config import Config
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "results" / "baseline.json"
+
+QUICK_MATRIX = [
+    DatasetSpec(rows=10_000, columns=10, cardinality=20),
+    DatasetSpec(rows=10_000, columns=50, cardinality=1_000),
+]
+FULL_MATRIX = QUICK_MATRIX + [
+    DatasetSpec(rows=200_000, columns=20, cardinality=50),
+    DatasetSpec(rows=200_000, columns=20, cardinality=100_000),
+    DatasetSpec(rows=50_000, columns=200, cardinality=100),
+    DatasetSpec(rows=100_000, columns=20, cardinality=50, dtype_mix={"float": 1.0}),
+    DatasetSpec(rows=100_000, columns=20, cardinality=50, dtype_mix={"category": 0.5, "text": 0.5}),
+]
+
+
+def _time(fn: Callable[[], Any], repeats: int) -> List[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summary(timings: List[float], work: float, unit: str) -> Dict[str, Any]:
+    ordered = sorted(timings)
+    median = statistics.median(ordered)
+    return {
+        "median_s": median,
+        "p95_s": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "throughput": work / median if median > 0 else float("inf"),
+        "unit": unit,
+        "repeats": len(timings),
+    }
+
+
+def _chase_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Same list-of-columns shape the frontend hands to ChaseSQL"""
+    chase_schema = schema.copy()
+    chase_schema["columns"] = [{"name": k, **v} for k, v in schema["columns"].items()]
+    return chase_schema
+
+
+def _executes(engine, sql: str) -> bool:
+    try:
+        engine.execute(sql, max_rows=1)
+        return True
+    except Exception:
+        return False
+
+
+def run_suite(matrix: List[DatasetSpec], repeats: int, llm_latency: float, workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Run every benchmark over the dataset matrix and return timings keyed by benchmark name"""
+    import pandas as pd
+
+    from src.backend.chase_sql_v2 import ChaseSQL
+    from src.backend.csv_analyzer import CSVAnalyzer
+    from src.backend.prompt_context import PROMPT_METRICS
+    from src.backend.schema_descriptor import SchemaDescriptor
+    from src.backend.sql_executor import SQLEngine, SQLExecutor
+    from src.backend.strategy_policy import StrategyPolicy
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with FakeLLMServer(latency=llm_latency) as server:
+        Config.OPENAI_API_KEY = Config.OPENAI_API_KEY or "benchmark"
+        Config.OPENAI_BASE_URL = server.base_url
+
+        for spec in matrix:
+            path = generate_csv(spec, workdir / f"{spec.name}.csv")
+            analyzer = CSVAnalyzer(max_rows=spec.rows)
+            timings = _time(lambda: analyzer.analyze_csv(str(path)), repeats)
+            results[f"analyze_csv[{spec.name}]"] = _summary(timings, spec.rows, "rows/s")
+            schema = analyzer.analyze_csv(str(path))
+
+            df = pd.read_csv(path)
+            table_name = schema["table_name"]
+            group_column = next(c for c in df.columns)
+            queries = {
+                "count": f"SELECT COUNT(*) FROM {table_name}",
+                "group_by": f"SELECT {group_column}, COUNT(*) AS n FROM {table_name} GROUP BY {group_column}",
+                "select_all": f"SELECT * FROM {table_name}",
+            }
+            for query_name, sql in queries.items():
+                timings = _time(lambda: SQLExecutor().execute_query(df, sql, table_name), repeats)
+                results[f"execute_query[{query_name},{spec.name}]"] = _summary(timings, spec.rows, "rows/s")
+
+        # LLM-bound stages only depend on the column count, one small and one wide dataset is enough
+        for spec in matrix[:2]:
+            path = workdir / f"{spec.name}.csv"
+            schema = CSVAnalyzer(max_rows=spec.rows).analyze_csv(str(path))
+
+            calls_before = server.request_count
+            timings = _time(lambda: SchemaDescriptor().generate_descriptions(schema), repeats)
+            calls = (server.request_count - calls_before) / repeats
+            results[f"generate_descriptions[{spec.name}]"] = _summary(timings, spec.columns, "columns/s")
+            results[f"generate_descriptions[{spec.name}]"]["llm_calls"] = calls
+
+            chase_schema = _chase_schema(schema)
+
+            def chase_end_to_end():
+                chase = ChaseSQL(chase_schema, "How many rows are there in total?")
+                chase.generate_candidates()
+                chase.rank_candidates(rerank_with_llm=True)
+                return chase.get_best_sql()
+
+            calls_before = server.request_count
+            PROMPT_METRICS.reset()
+            timings = _time(chase_end_to_end, repeats)
+            calls = (server.request_count - calls_before) / repeats
+            results[f"chase_sql[{spec.name}]"] = _summary(timings, 1, "questions/s")
+            results[f"chase_sql[{spec.name}]"]["llm_calls"] = calls
+            results[f"chase_sql[{spec.name}]"]["prefix_share"] = PROMPT_METRICS.prefix_share
+
+            engine = SQLEngine()
+            engine.load_table(pd.read_csv(path), schema["table_name"])
+            policy = StrategyPolicy(ChaseSQL.STRATEGIES, seed=0)
+
+            def chase_adaptive():
+                chase = ChaseSQL(chase_schema, "How many rows are there in total?")
+                return chase.generate_adaptive(policy, validate=lambda sql: _executes(engine, sql))
+
+            calls_before = server.request_count
+            timings = _time(chase_adaptive, repeats)
+            calls = (server.request_count - calls_before) / repeats
+            results[f"chase_sql_adaptive[{spec.name}]"] = _summary(timings, 1, "questions/s")
+            results[f"chase_sql_adaptive[{spec.name}]"]["llm_calls"] = calls
+            engine.close()
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """
+    Compare results with a baseline
+
+    Returns:
+        Human-readable descriptions of every benchmark slower than baseline * (1 + threshold)
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        ratio = result["median_s"] / previous["median_s"] if previous["median_s"] > 0 else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {previous['median_s'] * 1000:.1f} ms -> {result['median_s'] * 1000:.1f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def _print_report(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'benchmark':<60} {'median':>10} {'p95':>10} {'throughput':>22} {'vs base':>8}")
+    for name, r in results.items():
+        previous = baseline.get(name)
+        delta = f"{r['median_s'] / previous['median_s']:.2f}x" if previous and previous["median_s"] > 0 else "-"
+        print(f"{name:<60} {r['median_s'] * 1000:>8.1f}ms {r['p95_s'] * 1000:>8.1f}ms "
+              f"{r['throughput']:>14,.0f} {r['unit']:<7} {delta:>8}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Run the small dataset matrix only")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM latency in seconds")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--output", type=Path, help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    matrix = QUICK_MATRIX if args.quick else FULL_MATRIX
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(matrix, args.repeats, args.llm_latency, Path(tmp))
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text()).get("results", {})
+    _print_report(results, baseline)
+
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "llm_latency": args.llm_latency,
+        "results": results,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(document, indent=2))
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
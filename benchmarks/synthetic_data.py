@@ -0,0 +1,153 @@
+"""
+Deterministic synthetic CSV (and Excel) generator for benchmarks.
+
+The same DatasetSpec and seed always produce the same data, so timings
+from different runs (and different machines) are comparable.
+"""
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Relative weights of each generated column type
+DEFAULT_DTYPE_MIX: Dict[str, float] = {
+    "int": 0.3,
+    "float": 0.3,
+    "category": 0.2,
+    "text": 0.1,
+    "bool": 0.05,
+    "date": 0.05,
+}
+
+# Rows generated per batch; each batch has its own seeded generator so memory
+# stays bounded for huge files without affecting the output
+_BLOCK_ROWS = 100_000
+
+_WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+]
+
+
+@dataclass
+class DatasetSpec:
+    """Shape of a synthetic dataset: rows x columns x cardinality x dtype mix"""
+    rows: int
+    columns: int
+    cardinality: int = 50
+    dtype_mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_DTYPE_MIX))
+    null_fraction: float = 0.02
+    seed: int = 42
+
+    @property
+    def name(self) -> str:
+        name = f"r{self.rows}_c{self.columns}_k{self.cardinality}"
+        if self.dtype_mix != DEFAULT_DTYPE_MIX:
+            name += "_" + "_".join(f"{k}{int(v * 100)}" for k, v in sorted(self.dtype_mix.items()) if v)
+        return name
+
+
+def column_types(spec: DatasetSpec) -> List[str]:
+    """Assign a type to every column, proportionally to the dtype mix"""
+    kinds = [k for k, v in spec.dtype_mix.items() if v > 0]
+    weights = np.array([spec.dtype_mix[k] for k in kinds], dtype=float)
+    counts = np.floor(weights / weights.sum() * spec.columns).astype(int)
+    # Hand out the remainder to the heaviest types first
+    for i in np.argsort(-weights)[: spec.columns - counts.sum()]:
+        counts[i] += 1
+    types = [k for k, n in zip(kinds, counts) for _ in range(n)]
+    return types
+
+
+def _generate_column(kind: str, rows: int, spec: DatasetSpec, rng: np.random.Generator) -> np.ndarray:
+    if kind == "int":
+        values = rng.integers(0, max(spec.cardinality, 1), size=rows).astype(object)
+    elif kind == "float":
+        values = np.round(rng.normal(1000.0, 250.0, size=rows), 2).astype(object)
+    elif kind == "category":
+        labels = np.array([f"{_WORDS[i % len(_WORDS)]}_{i}" for i in range(max(spec.cardinality, 1))], dtype=object)
+        values = labels[rng.integers(0, len(labels), size=rows)]
+    elif kind == "text":
+        first = rng.integers(0, len(_WORDS), size=rows)
+        second = rng.integers(0, 1_000_000, size=rows)
+        values = np.array([f"{_WORDS[a]} {b}" for a, b in zip(first, second)], dtype=object)
+    elif kind == "bool":
+        values = rng.random(size=rows) < 0.5
+        values = values.astype(object)
+    elif kind == "date":
+        days = rng.integers(0, 3650, size=rows)
+        values = (np.datetime64("2015-01-01") + days.astype("timedelta64[D]")).astype(str).astype(object)
+    else:
+        raise ValueError(f"Unknown column type: {kind}")
+
+    if spec.null_fraction > 0:
+        values[rng.random(size=rows) < spec.null_fraction] = ""
+    return values
+
+
+def generate_csv(spec: DatasetSpec, output_path: str) -> Path:
+    """
+    Write a synthetic CSV file for the given spec
+
+    Args:
+        spec: Dataset shape and seed
+        output_path: Destination file
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    types = column_types(spec)
+    header = [f"{kind}_{i}" for i, kind in enumerate(types)]
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        written = 0
+        while written < spec.rows:
+            n = min(_BLOCK_ROWS, spec.rows - written)
+            rng = np.random.default_rng([spec.seed, written // _BLOCK_ROWS])
+            columns = [_generate_column(kind, n, spec, rng) for kind in types]
+            writer.writerows(zip(*columns))
+            written += n
+    return path
+
+
+def generate_xlsx(spec: DatasetSpec, output_path: str, sheets: int = 1) -> Path:
+    """
+    Write a synthetic workbook for the given spec, one copy of the data per sheet
+
+    Rows are written in openpyxl's write-only mode, so memory stays bounded.
+    Nulls are empty cells.
+
+    Args:
+        spec: Dataset shape and seed
+        output_path: Destination .xlsx file
+        sheets: Number of worksheets (named data_1, data_2, ...)
+
+    Returns:
+        Path of the written file
+    """
+    from openpyxl import Workbook
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    types = column_types(spec)
+    header = [f"{kind}_{i}" for i, kind in enumerate(types)]
+
+    workbook = Workbook(write_only=True)
+    for index in range(sheets):
+        worksheet = workbook.create_sheet(f"data_{index + 1}")
+        worksheet.append(header)
+        written = 0
+        while written < spec.rows:
+            n = min(_BLOCK_ROWS, spec.rows - written)
+            rng = np.random.default_rng([spec.seed, written // _BLOCK_ROWS])
+            columns = [_generate_column(kind, n, spec, rng) for kind in types]
+            for row in zip(*columns):
+                worksheet.append([None if value == "" else value for value in row])
+            written += n
+    workbook.save(path)
+    return path
@@ -9,14 +9,28 @@ class Config:
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o")
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL")  # e.g. a local stub server
+    # Model routing: each pipeline stage is served by a tier, "small" (fast, cheap) or "large"
+    LLM_SMALL_MODEL: str = os.getenv("LLM_SMALL_MODEL", "gpt-4o-mini")
+    LLM_LARGE_MODEL: str = os.getenv("LLM_LARGE_MODEL", OPENAI_MODEL)
+    LLM_STAGE_TIERS: str = os.getenv("LLM_STAGE_TIERS", "describe=small,answer=small,sql=large,rerank=large")
+    LLM_STAGE_SLOS: str = os.getenv("LLM_STAGE_SLOS", "describe=5,answer=5,sql=15,rerank=10")  # seconds; slower calls fall back to a faster tier
     
     # Application Configuration
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "50"))  # MB
     MAX_ROWS: int = int(os.getenv("MAX_ROWS", "1000"))
+    MEMORY_BUDGET_MB: int = int(os.getenv("MEMORY_BUDGET_MB", "1024"))  # process-wide, across all sessions
+    SPILL_DIR: Optional[str] = os.getenv("SPILL_DIR")  # where cold data is spilled; default is a temp directory
     
     # SQL Configuration
     SQL_TIMEOUT: int = int(os.getenv("SQL_TIMEOUT", "30"))  # seconds
     MAX_SQL_CANDIDATES: int = int(os.getenv("MAX_SQL_CANDIDATES", "3"))
+    ADAPTIVE_STRATEGIES: bool = os.getenv("ADAPTIVE_STRATEGIES", "true").lower() == "true"  # escalate strategies only on failure
+    STRATEGY_POLICY_PATH: str = os.getenv("STRATEGY_POLICY_PATH", os.path.join(os.path.expanduser("~"), ".csv_nlp_sql", "strategy_policy.json"))
+    APPROX_SAMPLE_FRACTION: float = float(os.getenv("APPROX_SAMPLE_FRACTION", "0.01"))
+    # Smaller tables are always queried exactly; by default never above MAX_ROWS, so capped uploads can use approximate mode
+    APPROX_MIN_ROWS: int = int(os.getenv("APPROX_MIN_ROWS", str(min(100_000, MAX_ROWS))))
+    RESULT_PAGE_SIZE: int = int(os.getenv("RESULT_PAGE_SIZE", "1000"))  # rows fetched per results page
     
     # Streamlit Configuration
     STREAMLIT_PORT: int = int(os.getenv("STREAMLIT_PORT", "8000"))
@@ -29,6 +29,7 @@ setup(
         "advanced": [
             "duckdb>=0.9.0",
             "polars>=0.19.0",
+            "orjson>=3.9.0",
         ],
     },
     classifiers=[
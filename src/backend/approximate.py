@@ -0,0 +1,302 @@
+"""
+Approximate query answering on pre-built samples.
+
+For a resident table, ApproximateExecutor keeps a uniform Bernoulli sample and
+one stratified sample per low-cardinality column, each row carrying its
+inverse inclusion probability in a weight column. Supported aggregate queries
+(COUNT/SUM/AVG over one table, with optional WHERE, GROUP BY, ORDER BY and
+LIMIT) are rewritten to Horvitz-Thompson estimates on a sample, with a 95%
+confidence half-width next to every estimate. Anything else runs exactly.
+
+Variances use the Poisson-sampling formula on the uniform sample and the
+simple-random-sampling formula (with finite population correction) within a
+stratum on the stratified samples, which are only used when the query groups
+by the stratum column.
+"""
+import logging
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .single_flight import content_key
+from .sql_executor import SQLEngine
+logger = logging.getLogger(__name__)
+
+WEIGHT_COLUMN = "__w"
+STRATUM_SIZE_COLUMN = "__m"
+CI_SUFFIX = "_ci95"
+Z_95 = 1.959964
+
+_CLAUSES = re.compile(r"\b(SELECT|FROM|WHERE|GROUP\s+BY|HAVING|ORDER\s+BY|LIMIT|JOIN|UNION|INTERSECT|EXCEPT|WINDOW|OVER)\b", re.IGNORECASE)
+_AGGREGATE = re.compile(r"^(COUNT|SUM|AVG)\s*\(\s*(DISTINCT\s+)?(.*?)\s*\)$", re.IGNORECASE | re.DOTALL)
+_ANY_FUNCTION_CALL = re.compile(r"\b(COUNT|SUM|AVG|MIN|MAX|TOTAL|GROUP_CONCAT)\s*\(", re.IGNORECASE)
+_ALIAS = re.compile(r"^(.*?)\s+(?:AS\s+)?(\"[^\"]+\"|\w+)$", re.IGNORECASE | re.DOTALL)
+_IDENTIFIER = re.compile(r"^(\"[^\"]+\"|\w+)$")
+
+
+def _mask_literals(sql: str) -> str:
+    """Blank out string literals and quoted identifiers so keywords and commas inside them are ignored"""
+    return re.sub(r"'(?:[^']|'')*'|\"[^\"]*\"", lambda m: m.group(0)[0] + " " * (len(m.group(0)) - 2) + m.group(0)[-1], sql)
+
+
+def _depths(masked: str) -> List[int]:
+    depths, depth = [], 0
+    for char in masked:
+        if char == "(":
+            depth += 1
+        depths.append(depth)
+        if char == ")":
+            depth -= 1
+    return depths
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split a select list (or GROUP BY list) on commas outside parentheses and quotes"""
+    masked = _mask_literals(text)
+    depths = _depths(masked)
+    parts, start = [], 0
+    for i, char in enumerate(masked):
+        if char == "," and depths[i] == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [p for p in parts if p]
+
+
+def parse_clauses(sql: str) -> Optional[Dict[str, str]]:
+    """Top-level clauses of a single SELECT, or None when the statement has no simple SELECT shape"""
+    sql = sql.strip().rstrip(";").strip()
+    masked = _mask_literals(sql)
+    depths = _depths(masked)
+    found = [(m.start(), m.end(), re.sub(r"\s+", " ", m.group(1).upper())) for m in _CLAUSES.finditer(masked) if depths[m.start()] == 0]
+    if not found or found[0][0] != 0 or found[0][2] != "SELECT":
+        return None
+    clauses: Dict[str, str] = {}
+    for (start, end, keyword), nxt in zip(found, found[1:] + [(len(sql), None, None)]):
+        if keyword in clauses:
+            return None
+        clauses[keyword] = sql[end:nxt[0]].strip()
+    return clauses
+
+
+@dataclass
+class SelectItem:
+    expression: str
+    alias: str
+    aggregate: Optional[str] = None  # COUNT, SUM or AVG
+    argument: Optional[str] = None
+
+
+def _balanced(text: str) -> bool:
+    depth = 0
+    for char in _mask_literals(text):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def _parse_item(item: str) -> SelectItem:
+    expression, alias = item, None
+    if not _AGGREGATE.match(item) and not _IDENTIFIER.match(item):
+        match = _ALIAS.match(item)
+        if match:
+            expression, alias = match.group(1).strip(), match.group(2).strip('"')
+    aggregate = _AGGREGATE.match(expression)
+    if aggregate and not _balanced(aggregate.group(3)):
+        # e.g. SUM(a) + SUM(b): the outer parentheses are not one call
+        raise ValueError(f"Unsupported aggregate expression: {expression}")
+    if aggregate:
+        if aggregate.group(2):
+            raise ValueError("DISTINCT aggregates cannot be estimated from a sample")
+        return SelectItem(expression, alias or expression, aggregate.group(1).upper(), aggregate.group(3))
+    if _ANY_FUNCTION_CALL.search(expression):
+        raise ValueError(f"Unsupported aggregate expression: {expression}")
+    return SelectItem(expression, alias or expression.strip('"'))
+
+
+def _estimate_columns(item: SelectItem, stratified: bool) -> List[str]:
+    """SQL for the estimate and its 95% half-width"""
+    w = WEIGHT_COLUMN
+    x = item.argument
+    ci = f'"{item.alias}{CI_SUFFIX}"'
+    indicator = "1" if x == "*" else f"({x} IS NOT NULL)"
+    if item.aggregate == "AVG":
+        # Ratio estimator sum(w x) / sum(w) over rows where x is not null
+        estimate = f"(SUM({w} * {x}) / SUM({w} * {indicator}))"
+    elif item.aggregate == "COUNT":
+        estimate = f"SUM({w} * {indicator})"
+    else:
+        estimate = f"SUM({w} * {x})"
+
+    y = indicator if item.aggregate == "COUNT" else f"({x})"
+    k = f"SUM({indicator})"
+    if stratified:
+        # Every group lies in one stratum: simple random sample of m = __m rows with constant weight w,
+        # rows outside the group's WHERE domain count as zeros. var(total) = w (w - 1) m s^2
+        wc, m = f"MAX({w})", f"MAX({STRATUM_SIZE_COLUMN})"
+        s1, s2 = f"SUM({y})", f"SUM({y} * {y})"
+        if item.aggregate == "AVG":
+            # Linearized: deviations from the ratio sum to zero over the domain
+            spread = f"({s2} - {s1} * {s1} / {k})"
+            variance = f"{wc} * ({wc} - 1) * {m} * {spread} / MAX({m} - 1, 1) / (({wc} * {k}) * ({wc} * {k}))"
+        else:
+            spread = f"({s2} - {s1} * {s1} / {m})"
+            variance = f"{wc} * ({wc} - 1) * {m} * {spread} / MAX({m} - 1, 1)"
+    else:
+        # Poisson (Bernoulli) sampling: var(total) = sum(w (w - 1) y^2)
+        if item.aggregate == "AVG":
+            # Linearized around the estimate r: sum(w (w - 1) (x - r)^2) / n^2, expanded into single-pass sums
+            n = f"SUM({w} * {indicator})"
+            a0 = f"SUM({w} * ({w} - 1) * {indicator})"
+            a1 = f"SUM({w} * ({w} - 1) * {y})"
+            a2 = f"SUM({w} * ({w} - 1) * {y} * {y})"
+            variance = f"({a2} - 2 * {estimate} * {a1} + {estimate} * {estimate} * {a0}) / ({n} * {n})"
+        else:
+            variance = f"SUM({w} * ({w} - 1) * {y} * {y})"
+    return [f'{estimate} AS "{item.alias}"', f"{Z_95} * SQRT(MAX(0, {variance})) AS {ci}"]
+
+
+@dataclass
+class _Samples:
+    rows: int
+    uniform: str
+    strata: Dict[str, str] = field(default_factory=dict)
+
+
+class ApproximateExecutor:
+    """Keeps weighted samples of resident tables and answers aggregates from them"""
+
+    def __init__(self, engine: SQLEngine, fraction: float = 0.01, min_rows_per_stratum: int = 100,
+                 max_strata: int = 50, min_table_rows: int = 100_000):
+        """
+        Args:
+            engine: Engine holding the full tables
+            fraction: Sampling fraction of the uniform sample (and per stratum)
+            min_rows_per_stratum: Every stratum keeps at least this many rows (all, if it has fewer)
+            max_strata: Columns with more distinct values than this are not used as strata
+            min_table_rows: Smaller tables are always queried exactly
+        """
+        self.engine = engine
+        self.fraction = fraction
+        self.min_rows_per_stratum = min_rows_per_stratum
+        self.max_strata = max_strata
+        self.min_table_rows = min_table_rows
+        self.samples: Dict[str, _Samples] = {}
+
+    def build(self, table_name: str, strata: Sequence[str] = ()) -> None:
+        """
+        Build the uniform sample and one stratified sample per strata column
+
+        Args:
+            table_name: Resident table to sample
+            strata: Candidate columns to stratify on (e.g. the profile's categorical columns)
+        """
+        with self.engine.writing() as connection:
+            rows = connection.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+            uniform = f"{table_name}__sample"
+            weight = 1.0 / self.fraction
+            connection.execute(f'DROP TABLE IF EXISTS "{uniform}"')
+            # Bernoulli sample: each row is kept independently with probability fraction
+            threshold = int(self.fraction * 2 ** 63)
+            connection.execute(
+                f'CREATE TABLE "{uniform}" AS SELECT *, {weight} AS {WEIGHT_COLUMN} FROM "{table_name}" '
+                f"WHERE (random() & 9223372036854775807) < {threshold}"
+            )
+            # Samples are random, so they are only identical to themselves
+            self.engine.set_fingerprint(uniform, content_key(self.engine.db_path, uniform, uuid.uuid4().hex))
+            samples = _Samples(rows=rows, uniform=uniform)
+            for column in strata:
+                groups = connection.execute(f'SELECT COUNT(DISTINCT "{column}") FROM "{table_name}"').fetchone()[0]
+                if groups == 0 or groups > self.max_strata:
+                    continue
+                name = f"{table_name}__sample_by_{column}"
+                connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+                # Simple random sample of max(min_rows, fraction * N_h) rows per stratum, weight N_h / m_h
+                per_stratum = f"MIN(__n, MAX({self.min_rows_per_stratum}, CAST(ROUND({self.fraction} * __n) AS INTEGER)))"
+                connection.execute(
+                    f'CREATE TABLE "{name}" AS SELECT {", ".join(self._quoted_columns(table_name))}, '
+                    f"CAST(__n AS REAL) / {per_stratum} AS {WEIGHT_COLUMN}, {per_stratum} AS {STRATUM_SIZE_COLUMN} FROM ("
+                    f'SELECT *, ROW_NUMBER() OVER (PARTITION BY "{column}" ORDER BY random()) AS __rn, '
+                    f'COUNT(*) OVER (PARTITION BY "{column}") AS __n FROM "{table_name}"'
+                    f") WHERE __rn <= {per_stratum}"
+                )
+                self.engine.set_fingerprint(name, content_key(self.engine.db_path, name, uuid.uuid4().hex))
+                samples.strata[column] = name
+        self.samples[table_name] = samples
+        logger.info(f"Built samples of {table_name}: uniform and {len(samples.strata)} stratified")
+
+    def refresh(self, table_name: str) -> None:
+        """Rebuild the samples of a table whose rows changed, keeping its strata columns"""
+        samples = self.samples.get(table_name)
+        if samples is not None:
+            self.build(table_name, strata=list(samples.strata))
+
+    def _quoted_columns(self, table_name: str) -> List[str]:
+        return [f'"{c}"' for c in self.engine.tables[table_name]]
+
+    def rewrite(self, sql: str) -> Tuple[Optional[str], str]:
+        """
+        Rewrite an aggregate query to run on a sample
+
+        Returns:
+            (rewritten SQL, sample table), or (None, reason) when the query must run exactly
+        """
+        clauses = parse_clauses(sql)
+        if clauses is None:
+            return None, "not a single SELECT"
+        for unsupported in ("JOIN", "HAVING", "UNION", "INTERSECT", "EXCEPT", "WINDOW", "OVER"):
+            if unsupported in clauses:
+                return None, f"{unsupported} is not supported"
+        table = clauses.get("FROM", "").strip('"')
+        if table not in self.samples:
+            return None, f"no samples for {table or 'this query'}"
+        if self.samples[table].rows < self.min_table_rows:
+            return None, "table is small enough to query exactly"
+        if re.match(r"DISTINCT\b", clauses["SELECT"], re.IGNORECASE):
+            return None, "SELECT DISTINCT is not supported"
+        try:
+            items = [_parse_item(item) for item in split_top_level(clauses["SELECT"])]
+        except ValueError as e:
+            return None, str(e)
+        if not any(item.aggregate for item in items):
+            return None, "no COUNT/SUM/AVG to estimate"
+        groups = split_top_level(clauses.get("GROUP BY", ""))
+        if any(item.aggregate is None and item.expression not in groups and item.alias not in groups for item in items):
+            return None, "non-aggregated column outside GROUP BY"
+
+        samples = self.samples[table]
+        sample_table, stratified = samples.uniform, False
+        for group in groups:
+            if group.strip('"') in samples.strata:
+                # Grouping by the stratum column: every group is one stratum, small ones included
+                sample_table, stratified = samples.strata[group.strip('"')], True
+                break
+
+        select = []
+        for item in items:
+            if item.aggregate is None:
+                select.append(item.expression if item.alias == item.expression.strip('"') else f'{item.expression} AS "{item.alias}"')
+            else:
+                select.extend(_estimate_columns(item, stratified))
+        rewritten = f'SELECT {", ".join(select)} FROM "{sample_table}"'
+        if "WHERE" in clauses:
+            rewritten += f" WHERE {clauses['WHERE']}"
+        if groups:
+            rewritten += f" GROUP BY {clauses['GROUP BY']}"
+        if "ORDER BY" in clauses:
+            order_by = clauses["ORDER BY"]
+            for item in items:
+                if item.aggregate:
+                    # Order by the weighted estimate, not the raw sample aggregate
+                    order_by = order_by.replace(item.expression, f'"{item.alias}"')
+            rewritten += f" ORDER BY {order_by}"
+        if "LIMIT" in clauses:
+            rewritten += f" LIMIT {clauses['LIMIT']}"
+        return rewritten, sample_table
+
+    def prepare(self, sql: str) -> str:
+        """SQL to run in approximate mode: the sampled rewrite when supported, else sql unchanged"""
+        rewritten, _ = self.rewrite(sql)
+        return rewritten or sql
@@ -1,7 +1,5 @@
 import logging
-import sqlparse
-from typing import List, Dict, Any, Tuple
-from openai import OpenAI
+from typing import Any, Callable, Dict, List, Optional
 from config.config import Config
 from .prompts import DIRECT_TRANSLATION_PROMPT, TEMPLATE_BASED_PROMPT, SEMANTIC_PARSING_PROMPT
 
@@ -12,7 +10,8 @@ class CHASESQLGenerator:
     
     def __init__(self, schema: Dict[str, Any], api_key: str = None):
         self.schema = schema
-        self.client = OpenAI(api_key=api_key or Config.OPENAI_API_KEY)
+        from .llm import get_client
+        self.client = get_client(api_key or Config.OPENAI_API_KEY, Config.OPENAI_BASE_URL)
         self.model = Config.OPENAI_MODEL
         self.max_candidates = Config.MAX_SQL_CANDIDATES
     
@@ -49,6 +48,48 @@ class CHASESQLGenerator:
             logger.error(f"Error generating SQL candidates: {str(e)}")
             return []
     
+    STRATEGIES = ["direct_translation", "template_based", "semantic_parsing"]
+    
+    def generate_sql_adaptive(self, natural_query: str, policy, validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Run strategies in the policy's order and stop at the first valid SQL
+        
+        Args:
+            natural_query: Natural language query
+            policy: StrategyPolicy over STRATEGIES; outcomes are recorded into it
+            validate: Returns True when the SQL is acceptable (e.g. it executes);
+                defaults to a syntax check
+            
+        Returns:
+            Best SQL query, or an empty string when every strategy failed
+        """
+        from .strategy_policy import dataset_key, question_type
+        validate = validate or self._is_valid_select
+        strategies = {
+            "direct_translation": self._direct_translation,
+            "template_based": self._template_based_approach,
+            "semantic_parsing": self._semantic_parsing_approach,
+        }
+        dataset, qtype = dataset_key(self.schema), question_type(natural_query)
+        candidates = []
+        for name in policy.order(dataset, qtype):
+            sql = strategies[name](natural_query)
+            valid = bool(sql) and validate(sql)
+            policy.record(dataset, qtype, name, valid)
+            if valid:
+                logger.info(f"Strategy {name} produced valid SQL after {len(candidates) + 1} calls")
+                return sql
+            if sql:
+                candidates.append(sql)
+        # Nothing validated: fall back to scoring whatever was generated
+        return self.assess_candidates(candidates)
+    
+    def _is_valid_select(self, sql: str) -> bool:
+        import sqlparse
+        from src.utils.helpers import clean_sql
+        statements = sqlparse.parse(clean_sql(sql))
+        return len(statements) == 1 and statements[0].get_type() == 'SELECT'
+    
     def assess_candidates(self, candidates: List[str]) -> str:
         """
         Assess SQL candidates and return the best one
@@ -117,6 +158,7 @@ class CHASESQLGenerator:
     
     def  _score_sql_candidate(self, sql: str) -> float:
         """Score a SQL candidate based on various criteria"""
+        import sqlparse
         score = 0.0
         
         # Check syntax validity
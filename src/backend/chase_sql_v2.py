@@ -1,75 +1,166 @@
 import logging
-from typing import List, Dict, Any, Optional
-from config.config import Config
+from typing import Callable, List, Dict, Any, Optional
 from .prompts import ZERO_SHOT_PROMPT, COT_PROMPT, FEW_SHOT_PROMPT, SCHEMA_AWARE_PROMPT , RERANK_PROMPT
-from .schemas import SQLGenerationResponse
-from .llm import llm_generate_content
+from .llm import STAGE_RERANK, STAGE_SQL, llm_generate_content
+from .prompt_context import PromptContext, format_prior_results
 logger = logging.getLogger(__name__)
 
 class ChaseSQL:
-    def __init__(self, schema: dict, question: str, api_key: Optional[str] = None):
+    def __init__(self, schema: dict, question: str, api_key: Optional[str] = None, prior_results: Optional[List[Any]] = None,
+                 context: Optional[PromptContext] = None):
+        """
+        Args:
+            schema: Table schema with a list of columns
+            question: User question
+            api_key: Unused; kept for backwards compatibility
+            prior_results: PriorResult tables from earlier turns that follow-ups may query
+            context: Prompt context precomputed for this dataset; built from schema when omitted
+        """
         self.schema = schema
         self.question = question
+        self.prior_results = prior_results or []
+        self.context = context or PromptContext.from_schema(schema)
         self.candidates: List[Dict[str, str]] = []
         self.best_sql: Optional[str] = None
 
     def serialize_schema(self) -> str:
-        lines = [f"Schema:\nTable: {self.schema['table_name']}"]
-        for col in self.schema['columns']:
-            desc = col.get('description', col.get('type', ''))
-            lines.append(f"- {col['name']}: {desc} ({col.get('type', '')})")
-        return '\n'.join(lines)
+        return self.context.schema_text + "\n" + format_prior_results(self.prior_results)
 
-    def generate_candidates(self):
-        schema_text = self.serialize_schema()
-        prompts = [
-            ("zero_shot", ZERO_SHOT_PROMPT.format(schema_text=schema_text, user_question=self.question)),
-            ("cot", COT_PROMPT.format(schema_text=schema_text, user_question=self.question)),
-            ("few_shot", FEW_SHOT_PROMPT.format(schema_text=schema_text, user_question=self.question)),
-            ("schema_aware", SCHEMA_AWARE_PROMPT.format(schema_text=schema_text, user_question=self.question)),
-        ]
-        self.candidates = []
-        for source, prompt in prompts:
+    STRATEGIES = ["zero_shot", "cot", "few_shot", "schema_aware"]
+    _TEMPLATES = {
+        "zero_shot": ZERO_SHOT_PROMPT,
+        "cot": COT_PROMPT,
+        "few_shot": FEW_SHOT_PROMPT,
+        "schema_aware": SCHEMA_AWARE_PROMPT,
+    }
+
+    def _generate(self, source: str) -> Optional[Dict[str, str]]:
+        """One candidate from one prompt strategy, or None when the LLM call fails"""
+        from .schemas import SQLGenerationResponse
+        prompt = self.context.build(self._TEMPLATES[source], self.prior_results, user_question=self.question)
+        try:
+            response = llm_generate_content(
+                prompt=prompt,
+                pydantic_model=SQLGenerationResponse,
+                stage=STAGE_SQL
+            )
+            llm_content = response
             try:
-                response = llm_generate_content(
-                    prompt=prompt,
-                    pydantic_model=SQLGenerationResponse
-                )
-                llm_content = response
-                try:
-                    parsed = SQLGenerationResponse.parse_raw(llm_content)
-                    sql = parsed.sql
-                except Exception:
-                    sql = llm_content.strip()
-                self.candidates.append({"source": source, "sql": sql})
-            except Exception as e:
-                logger.error(f"Error generating SQL for {source}: {str(e)}")
+                parsed = SQLGenerationResponse.parse_raw(llm_content)
+                sql = parsed.sql
+            except Exception:
+                sql = llm_content.strip()
+            return {"source": source, "sql": sql}
+        except Exception as e:
+            logger.error(f"Error generating SQL for {source}: {str(e)}")
+            return None
 
-    def rank_candidates(self, rerank_with_llm: bool = False, db_executor=None, sample_df=None) -> None:
+    def generate_candidates(self, on_candidate: Optional[Callable[[Dict[str, str]], None]] = None):
+        """
+        Generate one SQL candidate per prompt strategy
+        
+        Args:
+            on_candidate: Called with each candidate as soon as it is generated,
+                e.g. to start executing it speculatively
+        """
+        self.candidates = []
+        for source in self.STRATEGIES:
+            candidate = self._generate(source)
+            if candidate is not None:
+                self.candidates.append(candidate)
+                if on_candidate is not None:
+                    on_candidate(candidate)
+
+    def generate_adaptive(self, policy, validate: Callable[[str], bool],
+                          on_candidate: Optional[Callable[[Dict[str, str]], None]] = None) -> Optional[str]:
+        """
+        Run strategies in the policy's order, stopping at the first candidate that validates
+        
+        Args:
+            policy: StrategyPolicy over STRATEGIES; outcomes are recorded into it
+            validate: Returns True when a candidate's SQL executes (e.g. SpeculativeExecutor.succeeded)
+            on_candidate: Called with each candidate before it is validated
+            
+        Returns:
+            The selected SQL (also stored in best_sql), or None when no strategy produced any
+        """
+        from .strategy_policy import dataset_key, question_type
+        dataset, qtype = dataset_key(self.schema), question_type(self.question)
+        self.candidates = []
+        self.best_sql = None
+        for source in policy.order(dataset, qtype):
+            candidate = self._generate(source)
+            if candidate is None:
+                policy.record(dataset, qtype, source, False)
+                continue
+            self.candidates.append(candidate)
+            if on_candidate is not None:
+                on_candidate(candidate)
+            valid = validate(candidate['sql'])
+            policy.record(dataset, qtype, source, valid)
+            if valid:
+                self.best_sql = candidate['sql']
+                break
+            logger.info(f"Candidate from {source} failed validation, escalating")
+        if self.best_sql is None and self.candidates:
+            self.best_sql = self.candidates[0]['sql']
+        logger.info(f"Adaptive generation used {len(self.candidates)} of {len(self.STRATEGIES)} strategies")
+        return self.best_sql
+
+    def rank_candidates(self, rerank_with_llm: bool = False, db_executor=None, sample_df=None, speculative=None) -> None:
+        """
+        Select the best candidate into best_sql
+        
+        Args:
+            rerank_with_llm: Ask the LLM to pick the best candidate
+            db_executor: SQLExecutor used with sample_df to check candidates execute
+            sample_df: Data to test candidates against
+            speculative: SpeculativeExecutor already running the candidates; its
+                outcomes are used instead of re-executing
+        """
+        if not self.candidates:
+            self.best_sql = None
+            return
         if rerank_with_llm and len(self.candidates) > 1:
+            from .schemas import SQLGenerationResponse
             # LLM reranker
             queries = '\n'.join([f"SQL {i+1}: {c['sql']}" for i, c in enumerate(self.candidates)])
-            rerank_prompt = RERANK_PROMPT.format(
+            rerank_prompt = self.context.build(
+                RERANK_PROMPT,
+                self.prior_results,
                 question=self.question,
                 len=len(self.candidates),
-                queries=queries,
-                table_name=self.schema['table_name'],
-                columns=', '.join([col['name'] for col in self.schema['columns']])
+                queries=queries
             )
             logger.info(f"Rerank prompt: {rerank_prompt}")
             try:
                 response = llm_generate_content(
                     prompt=rerank_prompt,
-                    pydantic_model=SQLGenerationResponse
+                    pydantic_model=SQLGenerationResponse,
+                    stage=STAGE_RERANK
                 )
                 logger.info(f"Rerank response: {response}")
-                # Use the first choice as the best SQL
-                self.best_sql = response
+                try:
+                    self.best_sql = SQLGenerationResponse.parse_raw(response).sql
+                except Exception:
+                    self.best_sql = response.strip()
                 return
             except Exception as e:
                 logger.error(f"Error reranking SQL candidates: {str(e)}")
-        # Rule-based: try executing on sample data if provided
-    
+        # Rule-based: first candidate (in strategy order) that executes successfully
+        for candidate in self.candidates:
+            if speculative is not None:
+                if speculative.succeeded(candidate['sql']):
+                    self.best_sql = candidate['sql']
+                    return
+            elif db_executor is not None and sample_df is not None:
+                try:
+                    db_executor.execute_query(sample_df, candidate['sql'], self.schema['table_name'])
+                    self.best_sql = candidate['sql']
+                    return
+                except Exception:
+                    continue
+        self.best_sql = self.candidates[0]['sql']
 
     def get_best_sql(self) -> str:
         return self.best_sql
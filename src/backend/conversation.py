@@ -0,0 +1,102 @@
+"""
+Conversation state that keeps recent query results queryable.
+
+Each answered question's result is registered as a small table
+(prev_result_1, prev_result_2, ...) in the session's SQLEngine, so a follow-up
+such as "now only for 2023" can filter or aggregate the prior result instead
+of rescanning the whole dataset. Results live in the engine's database rather
+than in Python memory; the history is bounded by both count and size, and
+evicted results are dropped from the engine.
+"""
+from __future__ import annotations
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, TYPE_CHECKING
+
+from .sql_executor import SQLEngine
+if TYPE_CHECKING:
+    import pandas as pd
+logger = logging.getLogger(__name__)
+
+RESULT_TABLE_PREFIX = "prev_result"
+
+
+@dataclass
+class PriorResult:
+    """A previous answer registered as a table"""
+    table_name: str
+    question: str
+    sql: str
+    columns: List[str] = field(default_factory=list)
+    row_count: int = 0
+    nbytes: int = 0
+
+
+class ConversationState:
+    """Last N result sets of a conversation, registered as tables in an SQLEngine"""
+
+    def __init__(self, engine: SQLEngine, max_results: int = 5, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            engine: Engine holding the dataset; prior results are added next to it
+            max_results: Number of results to keep
+            max_bytes: Total in-memory size (as pandas measures it) of the kept results
+        """
+        self.engine = engine
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self.results: Deque[PriorResult] = deque()
+        self._counter = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(r.nbytes for r in self.results)
+
+    def add(self, question: str, sql: str, result: pd.DataFrame) -> Optional[PriorResult]:
+        """
+        Register a result so follow-up questions can query it
+
+        Args:
+            question: Question the result answers
+            sql: SQL that produced it
+            result: Result rows
+
+        Returns:
+            The registered PriorResult, or None when the result is empty or too large to keep
+        """
+        if self.results and self.results[-1].sql == sql and self.results[-1].question == question:
+            # Streamlit reruns re-submit the same answer
+            return self.results[-1]
+        nbytes = int(result.memory_usage(index=False, deep=True).sum())
+        if result.empty or nbytes > self.max_bytes:
+            logger.info(f"Not keeping result of '{question}' ({len(result)} rows, {nbytes} bytes)")
+            return None
+        self._counter += 1
+        prior = PriorResult(
+            table_name=f"{RESULT_TABLE_PREFIX}_{self._counter}",
+            question=question,
+            sql=sql,
+            columns=[str(c) for c in result.columns],
+            row_count=len(result),
+            nbytes=nbytes,
+        )
+        self.engine.load_table(result, prior.table_name)
+        self.results.append(prior)
+        self._evict()
+        return prior
+
+    def _evict(self) -> None:
+        while self.results and (len(self.results) > self.max_results or self.total_bytes > self.max_bytes):
+            oldest = self.results.popleft()
+            self.engine.drop_table(oldest.table_name)
+            logger.info(f"Evicted prior result {oldest.table_name}")
+
+    def recent(self) -> List[PriorResult]:
+        """Kept results, most recent first"""
+        return list(reversed(self.results))
+
+    def clear(self) -> None:
+        for prior in self.results:
+            self.engine.drop_table(prior.table_name)
+        self.results.clear()
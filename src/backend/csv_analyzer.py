@@ -1,15 +1,35 @@
-import pandas as pd
-import json
+from __future__ import annotations
+import copy
 import logging
-from typing import Dict, List, Any, Optional
+import os
+from typing import Dict, Iterable, Any, Optional, TYPE_CHECKING
 from pathlib import Path
+from .schema_model import TableSchema
+if TYPE_CHECKING:
+    import pandas as pd
+    from .profiling import TableStats
 logger = logging.getLogger(__name__)
 
 class CSVAnalyzer:
     """Analyzes CSV files and generates schema information"""
     
-    def __init__(self, max_rows: int = 10000):
+    def __init__(self, max_rows: Optional[int] = None, sample_size: int = 10000, chunk_size: int = 100_000, seed: int = 0, workers: int = 1):
+        """
+        Args:
+            max_rows: Optional cap on rows read; None streams the whole file
+            sample_size: Size of the per-column uniform sample behind sample_values
+            chunk_size: Rows parsed per chunk, bounds memory use for large files
+            seed: Seed for the samplers, makes profiles reproducible
+            workers: Processes used to profile whole files (see ParallelProfiler);
+                ignored when max_rows is set, since capped reads are a single prefix pass
+        """
         self.max_rows = max_rows
+        self.sample_size = sample_size
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.workers = workers
+        if workers > 1 and max_rows is not None:
+            logger.info(f"Ignoring workers={workers}: capped profiles (max_rows={max_rows}) run in one process")
         self.schema = {}
     
     def analyze_csv(self, file_path: str) -> Dict[str, Any]:
@@ -22,24 +42,44 @@ class CSVAnalyzer:
         Returns:
             Dictionary containing schema information
         """
+        return self.profile_csv(file_path).to_dict()
+    
+    def profile_csv(self, file_path: str) -> TableSchema:
+        """
+        Profile a CSV file in a single streaming pass
+        
+        Statistics are exact for counts, nulls, min/max and mean, and come from
+        bounded-memory sketches for distinct counts, quantiles and sample values.
+        
+        Args:
+            file_path: Path to the CSV file
+            
+        Returns:
+            TableSchema with native Python values only
+        """
+        from .single_flight import DATASET_FLIGHTS, content_key
+        stat = os.stat(file_path)
+        key = content_key(
+            "profile", os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns,
+            self.max_rows, self.sample_size, self.chunk_size, self.seed, self.workers
+        )
+        # Concurrent profiles of the same file share one pass; each caller gets its own copy
+        return copy.deepcopy(DATASET_FLIGHTS.do(key, lambda: self._profile_csv(file_path)))
+    
+    def _profile_csv(self, file_path: str) -> TableSchema:
+        import pandas as pd
         try:
-            # Read CSV with row limit
-            df = pd.read_csv(file_path, nrows=self.max_rows)
+            if self.workers > 1 and self.max_rows is None:
+                from .parallel_profiler import ParallelProfiler
+                profiler = ParallelProfiler(workers=self.workers, chunk_size=self.chunk_size, sample_size=self.sample_size, seed=self.seed)
+                schema = profiler.profile_csv(file_path)
+                logger.info(f"Successfully analyzed CSV: {schema.file_name}")
+                return schema
             
+            chunks = pd.read_csv(file_path, chunksize=self.chunk_size, nrows=self.max_rows)
             file_name = Path(file_path).name
-            table_name = file_name.replace('.csv', '').replace(' ', '_').lower()
-            
-            schema = {
-                "file_name": file_name,
-                "table_name": table_name,
-                "columns": {},
-                "row_count": len(df),
-                "sample_data": df.head(3).to_dict('records')
-            }
-            
-            # Analyze each column
-            for column in df.columns:
-                schema["columns"][column] = self._analyze_column(df[column])
+            with chunks:
+                schema = self.profile_chunks(chunks, file_name)
             
             logger.info(f"Successfully analyzed CSV: {file_name}")
             return schema
@@ -48,23 +88,36 @@ class CSVAnalyzer:
             logger.error(f"Error analyzing CSV {file_path}: {str(e)}")
             raise
     
-    def _analyze_column(self, series: pd.Series) -> Dict[str, Any]:
-        """Analyze a single column and return metadata"""
-        return {
-            "data_type": str(series.dtype),
-            "unique_values": series.nunique(),
-            "sample_values": series.dropna().unique()[:10].tolist(),
-            "null_count": series.isnull().sum(),
-            "is_numeric": pd.api.types.is_numeric_dtype(series),
-            "is_categorical": series.nunique() < len(series) * 0.5 and series.nunique() < 20,
-            "min_value": series.min() if pd.api.types.is_numeric_dtype(series) else None,
-            "max_value": series.max() if pd.api.types.is_numeric_dtype(series) else None,
-            "mean_value": series.mean() if pd.api.types.is_numeric_dtype(series) else None
-        }
+    def profile_dataframe(self, df: pd.DataFrame, file_name: str) -> TableSchema:
+        """Profile an in-memory DataFrame without writing it back to disk"""
+        return self.profile_chunks(self.chunks_of(df), file_name)
     
-    def save_schema(self, schema: Dict[str, Any], output_path: str) -> None:
+    def chunks_of(self, df: pd.DataFrame) -> Iterable[pd.DataFrame]:
+        """Split an in-memory DataFrame into chunk_size slices (at least one, possibly empty)"""
+        return (df.iloc[start:start + self.chunk_size] for start in range(0, max(len(df), 1), self.chunk_size))
+    
+    def new_stats(self) -> TableStats:
+        """Empty streaming statistics with this analyzer's sample size and seed"""
+        from .profiling import TableStats
+        return TableStats(sample_size=self.sample_size, seed=self.seed)
+    
+    def profile_chunks(self, chunks: Iterable[pd.DataFrame], file_name: str) -> TableSchema:
+        """Feed DataFrame chunks of one table through the streaming statistics"""
+        stats = self.new_stats()
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats.finalize(file_name, table_name_for(file_name))
+    
+    def save_schema(self, schema: Dict[str, Any] | TableSchema, output_path: str) -> None:
         """Save schema to JSON file"""
+        if not isinstance(schema, TableSchema):
+            schema = TableSchema.from_dict(schema)
         with open(output_path, 'w') as f:
-            json.dump(schema, f, indent=2, default=str)
+            f.write(schema.to_json())
         
-        logger.info(f"Schema saved to {output_path}")
\ No newline at end of file
+        logger.info(f"Schema saved to {output_path}")
+
+
+def table_name_for(file_name: str) -> str:
+    """SQL table name derived from an uploaded file name"""
+    return file_name.replace('.csv', '').replace(' ', '_').lower()
@@ -0,0 +1,136 @@
+"""
+Streaming reader for Excel workbooks.
+
+Worksheets are read row by row (openpyxl's read-only mode for .xlsx/.xlsm,
+xlrd for legacy .xls) and handed out as DataFrame chunks, so a workbook goes
+through the same chunked TableStats / SQLEngine path as a CSV without a full
+workbook object being built in memory. Every sheet becomes its own table.
+"""
+from __future__ import annotations
+import io
+import logging
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, TYPE_CHECKING
+from xml.etree import ElementTree
+
+if TYPE_CHECKING:
+    import pandas as pd
+logger = logging.getLogger(__name__)
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def is_excel_file(file_name: str) -> bool:
+    return Path(file_name).suffix.lower() in EXCEL_EXTENSIONS
+
+
+def _is_legacy(file_name: str) -> bool:
+    return Path(file_name).suffix.lower() == ".xls"
+
+
+def sheet_table_name(file_name: str, sheet: str) -> str:
+    """SQL table name for one sheet of a workbook"""
+    name = f"{Path(file_name).stem}_{sheet}"
+    return re.sub(r"\W+", "_", name).strip("_").lower()
+
+
+def _header(row: Sequence[Any]) -> List[str]:
+    """Column names from the header row; blank cells get positional names, duplicates a suffix"""
+    names, seen = [], {}
+    for index, value in enumerate(row):
+        name = str(value).strip() if value is not None and str(value).strip() else f"column_{index + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _chunks(rows: Iterable[Sequence[Any]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Group rows (the first non-empty one is the header) into DataFrames of chunk_size rows"""
+    import pandas as pd
+    columns: Optional[List[str]] = None
+    batch: List[Sequence[Any]] = []
+    yielded = False
+    for row in rows:
+        if all(value is None or value == "" for value in row):
+            continue
+        if columns is None:
+            # Trailing blank header cells only come from formatting
+            row = list(row)
+            while row and (row[-1] is None or row[-1] == ""):
+                row.pop()
+            columns = _header(row)
+            continue
+        row = list(row[:len(columns)])
+        batch.append(row + [None] * (len(columns) - len(row)))
+        if len(batch) == chunk_size:
+            yield pd.DataFrame.from_records(batch, columns=columns).infer_objects()
+            batch, yielded = [], True
+    if columns is not None and (batch or not yielded):
+        # A header-only sheet still yields one empty chunk carrying the columns
+        yield pd.DataFrame.from_records(batch, columns=columns).infer_objects()
+
+
+def sheet_names(data: bytes, file_name: str) -> List[str]:
+    """
+    Names of the worksheets in a workbook, in workbook order
+
+    For .xlsx/.xlsm only the workbook part is read: opening the workbook with
+    openpyxl would scan every sheet that lacks a dimension record. Chart
+    sheets are left out, they hold no rows.
+    """
+    if _is_legacy(file_name):
+        import xlrd
+        book = xlrd.open_workbook(file_contents=data, on_demand=True)
+        try:
+            return book.sheet_names()
+        finally:
+            book.release_resources()
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    worksheets = {rel.get("Id") for rel in relations if rel.get("Type", "").endswith("/worksheet")}
+    return [
+        sheet.get("name") for sheet in workbook.iter(f"{{{_MAIN_NS}}}sheet")
+        if sheet.get(f"{{{_REL_NS}}}id") in worksheets
+    ]
+
+
+def iter_sheet_chunks(data: bytes, file_name: str, sheet: str, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream one worksheet as DataFrame chunks
+
+    Args:
+        data: Workbook content
+        file_name: Name of the workbook (the extension selects the reader)
+        sheet: Worksheet name
+        chunk_size: Rows per chunk
+
+    Returns:
+        Iterator of DataFrames sharing the header row's column names
+    """
+    if _is_legacy(file_name):
+        # xlrd parses .xls files whole, but rows are still converted a chunk at a time
+        import xlrd
+        book = xlrd.open_workbook(file_contents=data, on_demand=True)
+        try:
+            worksheet = book.sheet_by_name(sheet)
+            rows = (worksheet.row_values(index) for index in range(worksheet.nrows))
+            yield from _chunks(rows, chunk_size)
+        finally:
+            book.release_resources()
+        return
+    from openpyxl import load_workbook
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        yield from _chunks(workbook[sheet].iter_rows(values_only=True), chunk_size)
+    finally:
+        workbook.close()
+    logger.info(f"Streamed sheet {sheet} of {file_name}")
@@ -0,0 +1,242 @@
+"""
+LLM-free answers for questions the dataset profile can answer directly.
+
+A small regex intent matcher recognizes common profile questions ("how many
+rows", "missing values", "numeric columns and their averages", "different
+values in column X", ...). Matching questions are answered from the cached
+CSVAnalyzer profile, or one vectorized pass over the DataFrame, in
+milliseconds. Anything else returns None and goes through the full pipeline.
+"""
+from __future__ import annotations
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    import pandas as pd
+logger = logging.getLogger(__name__)
+
+MAX_LISTED_VALUES = 50
+
+
+@dataclass
+class FastAnswer:
+    """Answer produced without the LLM, with the table it is based on"""
+    intent: str
+    answer: str
+    result: pd.DataFrame
+    sql: Optional[str] = None
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"[?!.]+$", "", text.strip())
+    return re.sub(r"\s+", " ", text)
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def find_column(mention: str, columns: List[str]) -> Optional[str]:
+    """Schema column matching a user mention, ignoring case, quotes, spaces and underscores"""
+    wanted = _key(mention)
+    for column in columns:
+        if _key(column) == wanted:
+            return column
+    return None
+
+
+_ROW_COUNT = re.compile(
+    r"^(how many (rows|records|entries|lines)( are there)?( in (total|the (dataset|table|data|file)))?( in total)?"
+    r"|what is the (total )?(number of (rows|records)|row count)( in the (dataset|table|data|file))?"
+    r"|(total )?(row|record) count)$"
+)
+_MISSING = re.compile(
+    r"^(are there any|are there|do we have any|which columns have|show( me)?( the)?|how many) "
+    r"(missing|null|empty) (values|data|cells)( in the (dataset|table|data|file))?$"
+)
+_NUMERIC_AVERAGES = re.compile(
+    r"^(which|what) columns are numeric( and what are their (averages|means|average values))?$"
+    r"|^what are the (averages|means) of (the |all |each )?(numeric|number) columns$"
+)
+_DISTINCT = re.compile(
+    r"^what are the (different|distinct|unique|possible) values (in|of) (the )?['\"`]?(?P<column>[\w ]+?)['\"`]?( column)?$"
+)
+_RANGE = re.compile(
+    r"^what(?:'s| is) the range (of values )?(in|of|for) (the )?['\"`]?(?P<column>[\w ]+?)['\"`]?( column)?$"
+)
+_SAMPLE_ROWS = re.compile(r"^(can you )?(show|give)( me)? (some )?(sample|example) (rows|records|data)$")
+_SUMMARY = re.compile(
+    r"^(what does this (dataset|table|data|file) contain|can you summarize the columns( for me)?"
+    r"|(summarize|describe|list) the columns)$"
+)
+_MOST_FREQUENT = re.compile(r"^what(?:'s| is) the most (frequent|common) value in each column$")
+
+
+def _row_count(schema, df, match) -> FastAnswer:
+    import pandas as pd
+    loaded = len(df) if df is not None else schema["row_count"]
+    rows = max(schema.get("total_rows") or loaded, loaded)
+    if rows > loaded:
+        # The table only holds the rows under the cap, so COUNT(*) would not give this answer
+        return FastAnswer(
+            intent="row_count",
+            answer=f"The file has **{rows:,}** rows; the first **{loaded:,}** are loaded for analysis.",
+            result=pd.DataFrame({"row_count": [rows], "loaded_rows": [loaded]}),
+            sql=None,
+        )
+    return FastAnswer(
+        intent="row_count",
+        answer=f"The dataset has **{rows:,}** rows.",
+        result=pd.DataFrame({"row_count": [rows]}),
+        sql=f"SELECT COUNT(*) AS row_count FROM {schema['table_name']}",
+    )
+
+
+def _missing_values(schema, df, match) -> FastAnswer:
+    import pandas as pd
+    nulls = {name: col["null_count"] for name, col in schema["columns"].items()}
+    result = pd.DataFrame({"column": list(nulls), "missing_values": list(nulls.values())})
+    missing = result[result["missing_values"] > 0]
+    if missing.empty:
+        answer = "There are no missing values in the dataset."
+    else:
+        listed = ", ".join(f"`{r.column}` ({r.missing_values:,})" for r in missing.itertuples())
+        answer = f"{len(missing)} of {len(result)} columns have missing values: {listed}."
+    return FastAnswer(intent="missing_values", answer=answer, result=result)
+
+
+def _numeric_averages(schema, df, match) -> FastAnswer:
+    import pandas as pd
+    numeric = {name: col.get("mean_value") for name, col in schema["columns"].items() if col.get("is_numeric")}
+    result = pd.DataFrame({"column": list(numeric), "average": list(numeric.values())})
+    if result.empty:
+        answer = "None of the columns are numeric."
+    else:
+        listed = ", ".join(f"`{r.column}` (average {r.average:,.4g})" for r in result.itertuples() if r.average is not None)
+        answer = f"{len(result)} columns are numeric: {listed}."
+    return FastAnswer(intent="numeric_averages", answer=answer, result=result)
+
+
+def _distinct_values(schema, df, match) -> Optional[FastAnswer]:
+    import pandas as pd
+    column = find_column(match.group("column"), list(schema["columns"]))
+    if column is None:
+        return None
+    if df is not None:
+        counts = df[column].value_counts(dropna=True)
+        result = counts.head(MAX_LISTED_VALUES).rename_axis(column).reset_index(name="count")
+        total = len(counts)
+    else:
+        info = schema["columns"][column]
+        result = pd.DataFrame({column: info["sample_values"]})
+        total = info["unique_values"]
+    shown = ", ".join(f"`{v}`" for v in result[column].tolist()[:20])
+    more = f" (showing the {len(result)} most frequent)" if total > len(result) else ""
+    return FastAnswer(
+        intent="distinct_values",
+        answer=f"`{column}` has **{total:,}** distinct values{more}: {shown}.",
+        result=result,
+        sql=f"SELECT {column}, COUNT(*) AS count FROM {schema['table_name']} GROUP BY {column} ORDER BY count DESC",
+    )
+
+
+def _value_range(schema, df, match) -> Optional[FastAnswer]:
+    import pandas as pd
+    column = find_column(match.group("column"), list(schema["columns"]))
+    if column is None:
+        return None
+    info = schema["columns"][column]
+    if info.get("min_value") is None:
+        if df is None:
+            return None
+        values = df[column].dropna()
+        low, high = (values.min(), values.max()) if len(values) else (None, None)
+    else:
+        low, high = info["min_value"], info["max_value"]
+    return FastAnswer(
+        intent="value_range",
+        answer=f"`{column}` ranges from **{low}** to **{high}**.",
+        result=pd.DataFrame({"column": [column], "min": [low], "max": [high]}),
+        sql=f"SELECT MIN({column}) AS min, MAX({column}) AS max FROM {schema['table_name']}",
+    )
+
+
+def _sample_rows(schema, df, match) -> FastAnswer:
+    import pandas as pd
+    result = df.head(5) if df is not None else pd.DataFrame(schema["sample_data"])
+    return FastAnswer(
+        intent="sample_rows",
+        answer=f"Here are {len(result)} sample rows from `{schema['table_name']}`.",
+        result=result,
+        sql=f"SELECT * FROM {schema['table_name']} LIMIT 5",
+    )
+
+
+def _summary(schema, df, match) -> FastAnswer:
+    import pandas as pd
+    rows = [{
+        "column": name,
+        "type": col["data_type"],
+        "distinct_values": col["unique_values"],
+        "missing_values": col["null_count"],
+        "description": col.get("description", ""),
+    } for name, col in schema["columns"].items()]
+    result = pd.DataFrame(rows)
+    lines = [f"- **{r['column']}** ({r['type']}): {r['description'] or 'no description'}" for r in rows]
+    answer = f"`{schema['table_name']}` has {schema['row_count']:,} rows and {len(rows)} columns:\n" + "\n".join(lines)
+    return FastAnswer(intent="summary", answer=answer, result=result)
+
+
+def _most_frequent(schema, df, match) -> Optional[FastAnswer]:
+    import pandas as pd
+    if df is None:
+        return None
+    rows = []
+    for column in df.columns:
+        counts = df[column].value_counts(dropna=True)
+        if len(counts):
+            rows.append({"column": column, "most_frequent": counts.index[0], "count": int(counts.iloc[0])})
+    result = pd.DataFrame(rows)
+    listed = ", ".join(f"`{r['column']}`: {r['most_frequent']} ({r['count']:,})" for r in rows)
+    return FastAnswer(intent="most_frequent", answer=f"Most frequent values — {listed}.", result=result)
+
+
+INTENTS: List[tuple] = [
+    (_ROW_COUNT, _row_count),
+    (_MISSING, _missing_values),
+    (_NUMERIC_AVERAGES, _numeric_averages),
+    (_DISTINCT, _distinct_values),
+    (_RANGE, _value_range),
+    (_SAMPLE_ROWS, _sample_rows),
+    (_SUMMARY, _summary),
+    (_MOST_FREQUENT, _most_frequent),
+]
+
+
+def answer_from_profile(question: str, schema: Dict[str, Any], df: Optional[pd.DataFrame] = None,
+                        total_rows: Optional[int] = None) -> Optional[FastAnswer]:
+    """
+    Answer a question from the dataset profile when it matches a known question class
+
+    Args:
+        question: Natural language question
+        schema: Schema produced by CSVAnalyzer (optionally with descriptions)
+        df: The loaded data, used for the few answers that need one vectorized pass
+        total_rows: Rows in the file when df holds only the first MAX_ROWS of them
+
+    Returns:
+        FastAnswer, or None when the question needs the full LLM pipeline
+    """
+    normalized = _normalize(question)
+    if total_rows is not None:
+        schema = {**schema, "total_rows": total_rows}
+    for pattern, handler in INTENTS:
+        match = pattern.match(normalized)
+        if match:
+            answer = handler(schema, df, match)
+            if answer is not None:
+                logger.info(f"Answered '{question}' on the fast path ({answer.intent})")
+                return answer
+    return None
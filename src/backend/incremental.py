@@ -0,0 +1,301 @@
+"""
+Append-aware refresh of uploaded CSV datasets.
+
+Daily exports only grow, so a re-upload usually shares its leading bytes with
+the previous version. A Manifest records a hash per fixed-size block of the
+file; when the new upload still matches every block, only the bytes past the
+old end are parsed, folded into the running TableStats and appended to the
+resident table. Column descriptions survive a refresh unless the column's
+profile changes materially.
+"""
+from __future__ import annotations
+import copy
+import hashlib
+import io
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, TYPE_CHECKING
+
+from .csv_analyzer import CSVAnalyzer, table_name_for
+from .excel_reader import iter_sheet_chunks, sheet_table_name
+from .memory_manager import Managed, MemoryManager, get_memory_manager
+from .schema_model import ColumnProfile, TableSchema
+from .single_flight import DATASET_FLIGHTS, content_key
+if TYPE_CHECKING:
+    import pandas as pd
+    from .profiling import TableStats
+logger = logging.getLogger(__name__)
+
+BLOCK_BYTES = 1 << 20
+# Absolute change in a column's null share that counts as material
+NULL_SHARE_TOLERANCE = 0.05
+# Growth of a numeric column's range, relative to the old range, that counts as material
+RANGE_TOLERANCE = 0.5
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def dataset_id(file_name: str, data: bytes) -> str:
+    """Key for a dataset that stays the same as the file grows (file name and header line)"""
+    header = data.split(b"\n", 1)[0]
+    return hashlib.sha1(file_name.encode() + b"\0" + header).hexdigest()[:12]
+
+
+@dataclass
+class Manifest:
+    """Block hashes of a file's content; the last block may be partial"""
+    size: int
+    hashes: List[str]
+    block_bytes: int = BLOCK_BYTES
+    ends_with_newline: bool = True
+
+    @classmethod
+    def from_bytes(cls, data: bytes, block_bytes: int = BLOCK_BYTES) -> "Manifest":
+        hashes = [_digest(data[start:start + block_bytes]) for start in range(0, len(data), block_bytes)]
+        return cls(len(data), hashes, block_bytes, data.endswith(b"\n"))
+
+    def extended(self, data: bytes) -> "Manifest":
+        """Manifest of data, which extends this manifest's content; complete blocks are not rehashed"""
+        full = self.size // self.block_bytes
+        start = full * self.block_bytes
+        tail = [_digest(data[i:i + self.block_bytes]) for i in range(start, len(data), self.block_bytes)]
+        return Manifest(len(data), self.hashes[:full] + tail, self.block_bytes, data.endswith(b"\n"))
+
+    def appended_offset(self, data: bytes) -> Optional[int]:
+        """
+        Offset of the bytes appended to this manifest's content
+
+        Returns:
+            The old size when data starts with exactly the old content and the
+            old content ended on a row boundary, else None
+        """
+        if len(data) < self.size:
+            return None
+        if not self.ends_with_newline and data[self.size:self.size + 1] not in (b"\r", b"\n", b""):
+            # The old last row had no line break, so the new bytes continue (and change) it
+            return None
+        for index, expected in enumerate(self.hashes):
+            start = index * self.block_bytes
+            if _digest(data[start:min(start + self.block_bytes, self.size)]) != expected:
+                return None
+        return self.size
+
+
+def materially_changed(old: ColumnProfile, new: ColumnProfile, old_rows: int, new_rows: int) -> bool:
+    """Whether a column's new profile differs enough that its description may be stale"""
+    if (old.data_type, old.is_numeric, old.is_categorical) != (new.data_type, new.is_numeric, new.is_categorical):
+        return True
+    if abs(new.null_count / max(new_rows, 1) - old.null_count / max(old_rows, 1)) > NULL_SHARE_TOLERANCE:
+        return True
+    if new.is_categorical and new.unique_values != old.unique_values:
+        return True
+    if new.is_numeric and old.min_value is not None and new.min_value is not None:
+        try:
+            span = old.max_value - old.min_value
+            slack = RANGE_TOLERANCE * span
+            return new.min_value < old.min_value - slack or new.max_value > old.max_value + slack
+        except TypeError:
+            # bool columns are numeric but have no meaningful span
+            return new.min_value != old.min_value or new.max_value != old.max_value
+    return False
+
+
+@dataclass
+class _Loaded:
+    df: pd.DataFrame
+    stats: TableStats
+    raw_columns: List[str]
+    total_rows: int
+
+
+@dataclass
+class RefreshResult:
+    """What a refresh changed"""
+    appended: Optional[pd.DataFrame]  # rows added to the table, None after a full reload
+    changed_columns: List[str] = field(default_factory=list)  # columns whose descriptions were dropped
+
+    @property
+    def reloaded(self) -> bool:
+        return self.appended is None
+
+
+class IncrementalDataset:
+    """A CSV upload (or one workbook sheet) kept current by ingesting only the rows appended since the last load"""
+
+    def __init__(self, file_name: str, analyzer: Optional[CSVAnalyzer] = None, max_rows: Optional[int] = None,
+                 transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                 memory: Optional[MemoryManager] = None, sheet: Optional[str] = None):
+        """
+        Args:
+            file_name: Name of the uploaded file (determines the table name)
+            analyzer: Profiling settings (sample size, chunk size, seed)
+            max_rows: Cap on the rows kept; rows past it are counted but not loaded
+            transform: Applied to every parsed frame, e.g. clean_column_names
+            memory: Budget the frame and statistics are held under (the process-wide one by default)
+            sheet: Worksheet to load when the file is an Excel workbook (one table per sheet)
+        """
+        self.file_name = file_name
+        self.sheet = sheet
+        self.table_name = table_name_for(file_name) if sheet is None else sheet_table_name(file_name, sheet)
+        self.analyzer = analyzer or CSVAnalyzer()
+        self.max_rows = max_rows
+        self.transform = transform
+        self.memory = memory or get_memory_manager()
+        self._frame: Optional[Managed] = None
+        self._stats: Optional[Managed] = None
+        self.schema: Optional[TableSchema] = None
+        self.manifest: Optional[Manifest] = None
+        self.total_rows = 0  # rows in the file, including those past max_rows
+        self.version = 0  # bumped whenever the data changes
+        self._raw_columns: List[str] = []
+
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        """The loaded rows (reloaded from disk if the memory manager spilled them)"""
+        return self._frame.get() if self._frame is not None else None
+
+    @df.setter
+    def df(self, value: Optional[pd.DataFrame]) -> None:
+        self._frame = None if value is None else self.memory.register(value, "dataset")
+
+    @property
+    def stats(self) -> Optional[TableStats]:
+        return self._stats.get() if self._stats is not None else None
+
+    @stats.setter
+    def stats(self, value: Optional[TableStats]) -> None:
+        self._stats = None if value is None else self.memory.register(value, "stats")
+
+    @property
+    def truncated(self) -> bool:
+        return self.df is not None and self.total_rows > len(self.df)
+
+    def _parse_appended(self, data: bytes) -> pd.DataFrame:
+        import pandas as pd
+        room = None if self.max_rows is None else max(0, self.max_rows - len(self.df))
+        kept: List[pd.DataFrame] = []
+        reader = pd.read_csv(io.BytesIO(data), header=None, names=self._raw_columns, chunksize=self.analyzer.chunk_size)
+        for chunk in reader:
+            self.total_rows += len(chunk)
+            if room is None or room > 0:
+                chunk = chunk if room is None else chunk.head(room)
+                room = None if room is None else room - len(chunk)
+                kept.append(chunk)
+        df = pd.concat(kept, ignore_index=True) if kept else pd.DataFrame(columns=self._raw_columns)
+        return self.transform(df) if self.transform else df
+
+    def _ingest(self, df: pd.DataFrame) -> None:
+        stats = self.stats
+        for chunk in self.analyzer.chunks_of(df):
+            stats.update(chunk)
+        # Registered again so the budget accounts for the grown statistics
+        self.stats = stats
+
+    def _profile(self, chunks: Iterable[pd.DataFrame]) -> _Loaded:
+        """Cap, transform and profile chunks of one table, keeping the rows under max_rows"""
+        import pandas as pd
+        stats = self.analyzer.new_stats()
+        kept: List[pd.DataFrame] = []
+        raw_columns: Optional[List[str]] = None
+        total_rows = kept_rows = 0
+        for chunk in chunks:
+            if raw_columns is None:
+                raw_columns = list(chunk.columns)
+            total_rows += len(chunk)
+            if self.max_rows is not None:
+                if kept and kept_rows >= self.max_rows:
+                    # Past the cap rows are only counted
+                    continue
+                chunk = chunk.head(self.max_rows - kept_rows)
+            if self.transform:
+                chunk = self.transform(chunk)
+            stats.update(chunk)
+            kept.append(chunk)
+            kept_rows += len(chunk)
+        df = pd.concat(kept, ignore_index=True) if len(kept) > 1 else (kept[0] if kept else pd.DataFrame())
+        return _Loaded(df, stats, raw_columns or [], total_rows)
+
+    def _load(self, key: str, read_chunks: Callable[[], Iterable[pd.DataFrame]]) -> _Loaded:
+        analyzer = self.analyzer
+        key = content_key(
+            key, self.table_name, self.max_rows, analyzer.sample_size, analyzer.chunk_size, analyzer.seed,
+            getattr(self.transform, "__qualname__", None)
+        )
+        loaded = DATASET_FLIGHTS.do(key, lambda: self._profile(read_chunks()))
+        # Sessions loading the same content share one frame under the budget
+        self._frame = self.memory.register(loaded.df, "dataset", key=key)
+        self._raw_columns, self.total_rows = loaded.raw_columns, loaded.total_rows
+        # Refreshes keep updating the statistics, so each dataset owns a copy of the shared ones
+        self.stats = copy.deepcopy(loaded.stats)
+        self.schema = self.stats.finalize(self.file_name, self.table_name)
+        self.version += 1
+        logger.info(f"Loaded {self.table_name}: {len(loaded.df)} rows")
+        return loaded
+
+    def load(self, data: bytes) -> TableSchema:
+        """Parse and profile the whole file (shared with concurrent loads of the same content)"""
+        import pandas as pd
+        if self.sheet is not None:
+            # Workbooks are streamed sheet by sheet; they have no byte manifest, so refresh() reloads them
+            self._load(
+                content_key("excel", self.file_name, self.sheet, data),
+                lambda: iter_sheet_chunks(data, self.file_name, self.sheet, self.analyzer.chunk_size)
+            )
+            self.manifest = None
+            return self.schema
+        # Parsed chunk by chunk: rows past max_rows are counted but never held in memory
+        self._load(
+            content_key("csv", self.file_name, data),
+            lambda: pd.read_csv(io.BytesIO(data), chunksize=self.analyzer.chunk_size)
+        )
+        self.manifest = Manifest.from_bytes(data)
+        return self.schema
+
+    def refresh(self, data: bytes) -> RefreshResult:
+        """
+        Bring the dataset up to date with a new upload of the file
+
+        Only the bytes past the previous end are parsed when the upload starts
+        with the previous content; anything else (and any workbook) is
+        reloaded from scratch.
+
+        Args:
+            data: Full content of the new upload
+
+        Returns:
+            RefreshResult with the appended rows (None after a full reload) and
+            the columns whose descriptions were dropped
+        """
+        import pandas as pd
+        offset = self.manifest.appended_offset(data) if self.manifest is not None else None
+        if offset is None:
+            logger.info(f"{self.file_name} does not extend the loaded data, reloading")
+            self.load(data)
+            return RefreshResult(appended=None, changed_columns=list(self.schema.columns))
+        tail = data[offset:]
+        self.manifest = self.manifest.extended(data)
+        if not tail.strip():
+            return RefreshResult(appended=self.df.iloc[0:0])
+
+        appended = self._parse_appended(tail)
+        if appended.empty:
+            # Every new row is past max_rows
+            return RefreshResult(appended=appended)
+        old_rows = self.schema.row_count
+        self._ingest(appended)
+        self.df = pd.concat([self.df, appended], ignore_index=True)
+
+        old = self.schema
+        self.schema = self.stats.finalize(self.file_name, self.table_name)
+        changed = []
+        for name, profile in self.schema.columns.items():
+            previous = old.columns.get(name)
+            if previous is None or materially_changed(previous, profile, old_rows, self.schema.row_count):
+                changed.append(name)
+            elif previous.description:
+                profile.description = previous.description
+        self.version += 1
+        logger.info(f"Appended {len(appended)} rows to {self.table_name}; profile changed for {changed or 'no columns'}")
+        return RefreshResult(appended=appended, changed_columns=changed)
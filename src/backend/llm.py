@@ -1,39 +1,294 @@
-from typing import Any, Dict
+"""
+LLM access for the pipeline, routed per stage.
+
+Each pipeline stage (column descriptions, SQL generation, rerank, answer
+summaries) is served by a model tier from Config: the small tier is fast and
+cheap, the large tier is used where quality matters most. A stage with a
+latency SLO falls back to the next faster tier when a call times out at the
+SLO, and keeps using that tier while the stage's recent p90 latency on its own
+tier is over the SLO. Periodic probes of the stage's own tier let it recover:
+a probe that meets the SLO clears the slow history. ROUTER accounts latency,
+tokens and cost per stage.
+"""
 import logging
-from openai import OpenAI
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from config.config import Config
-import logging
-from openai.lib._parsing._completions import type_to_response_format_param
 logger = logging.getLogger(__name__)
-def llm_generate_content(prompt: str ,pydantic_model) -> str:
+
+STAGE_DESCRIBE = "describe"
+STAGE_SQL = "sql"
+STAGE_RERANK = "rerank"
+STAGE_ANSWER = "answer"
+DEFAULT_STAGE = "default"  # untagged calls use Config.OPENAI_MODEL, without routing
+
+# Fastest first
+TIERS = ["small", "large"]
+
+# USD per million (prompt, completion) tokens; models not listed are accounted at zero cost
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+
+@lru_cache(maxsize=8)
+def get_client(api_key: Optional[str], base_url: Optional[str]):
+    """Return a shared OpenAI client; openai is only imported on the first LLM call"""
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
+def _parse_mapping(text: str) -> Dict[str, str]:
+    """'a=1,b=2' -> {'a': '1', 'b': '2'}"""
+    pairs = (item.split("=", 1) for item in text.split(",") if "=" in item)
+    return {key.strip(): value.strip() for key, value in pairs}
+
+
+def stage_tier(stage: str) -> Optional[str]:
+    tier = _parse_mapping(Config.LLM_STAGE_TIERS).get(stage)
+    return tier if tier in TIERS else None
+
+
+def stage_slo(stage: str) -> Optional[float]:
+    slo = _parse_mapping(Config.LLM_STAGE_SLOS).get(stage)
+    return float(slo) if slo else None
+
+
+def tier_model(tier: Optional[str]) -> str:
+    return {"small": Config.LLM_SMALL_MODEL, "large": Config.LLM_LARGE_MODEL}.get(tier, Config.OPENAI_MODEL)
+
+
+def faster_tier(tier: Optional[str]) -> Optional[str]:
+    if tier not in TIERS or TIERS.index(tier) == 0:
+        return None
+    return TIERS[TIERS.index(tier) - 1]
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether an API error is a request timeout (the only error that falls back to a faster tier)"""
+    from openai import APITimeoutError
+    return isinstance(error, APITimeoutError)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether the SDK would retry an API error: connection failures, 409, 429 and 5xx (timeouts excluded)"""
+    from openai import APIConnectionError, APIStatusError
+    if is_timeout(error):
+        return False
+    if isinstance(error, APIStatusError):
+        return error.status_code in (409, 429) or error.status_code >= 500
+    return isinstance(error, APIConnectionError)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class StageStats:
+    """Latency, token and cost totals for one pipeline stage"""
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.models: Dict[str, int] = {}
+        self.latencies: deque = deque(maxlen=window)
+        # Recent latencies per tier, for the SLO check
+        self.tier_latencies: Dict[str, deque] = {tier: deque(maxlen=window) for tier in TIERS}
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = list(self.latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "p50_latency": _percentile(latencies, 0.5),
+            "p90_latency": _percentile(latencies, 0.9),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": self.cost,
+            "models": dict(self.models),
+        }
+
+
+class ModelRouter:
+    """Chooses the model for each stage and accounts what the calls cost"""
+
+    def __init__(self, window: int = 50, probe_every: int = 10, min_samples: int = 3):
+        """
+        Args:
+            window: Recent calls per stage and tier considered for the SLO check
+            probe_every: While degraded, every probe_every-th call still tries the stage's own tier
+            min_samples: Calls needed on a tier before its p90 can degrade the stage
+        """
+        self.window = window
+        self.probe_every = probe_every
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self.stages: Dict[str, StageStats] = {}
+        self._degraded_calls: Dict[str, int] = {}
+
+    def _stats(self, stage: str) -> StageStats:
+        if stage not in self.stages:
+            self.stages[stage] = StageStats(self.window)
+        return self.stages[stage]
+
+    def route(self, stage: str) -> Optional[str]:
+        """Tier for the next call of stage (None means Config.OPENAI_MODEL)"""
+        tier, slo = stage_tier(stage), stage_slo(stage)
+        faster = faster_tier(tier)
+        if faster is None or slo is None:
+            return tier
+        with self._lock:
+            recent = list(self._stats(stage).tier_latencies[tier])
+            if len(recent) < self.min_samples or _percentile(recent, 0.9) < slo:
+                self._degraded_calls.pop(stage, None)
+                return tier
+            calls = self._degraded_calls[stage] = self._degraded_calls.get(stage, 0) + 1
+        # Probe the stage's own tier now and then so it can recover
+        return tier if calls % self.probe_every == 0 else faster
+
+    def record(self, stage: str, tier: Optional[str], model: str, latency: float, usage: Any = None,
+               error: bool = False, fallback: bool = False) -> None:
+        with self._lock:
+            stats = self._stats(stage)
+            if tier in stats.tier_latencies:
+                slo = stage_slo(stage)
+                if stage in self._degraded_calls and tier == stage_tier(stage) and slo is not None and latency < slo:
+                    # A probe met the SLO: the slow samples no longer describe the tier
+                    stats.tier_latencies[tier].clear()
+                    self._degraded_calls.pop(stage, None)
+                stats.tier_latencies[tier].append(latency)
+            if error:
+                stats.errors += 1
+                return
+            stats.calls += 1
+            stats.fallbacks += int(fallback)
+            stats.latencies.append(latency)
+            stats.models[model] = stats.models.get(model, 0) + 1
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost += call_cost(model, prompt_tokens, completion_tokens)
+
+    def complete(self, prompt: str, pydantic_model, stage: Optional[str] = None) -> str:
+        """Run one completion for stage, falling back to a faster tier if the routed one misses its SLO"""
+        stage = stage or DEFAULT_STAGE
+        tier = self.route(stage)
+        faster, slo = faster_tier(tier), stage_slo(stage)
+        model = tier_model(tier)
+        # Only calls that have somewhere to fall back to are cut off at the SLO
+        timeout = slo if faster is not None else None
+        start = time.perf_counter()
+        try:
+            content, usage = _complete(prompt, pydantic_model, model, timeout)
+        except Exception as e:
+            self.record(stage, tier, model, time.perf_counter() - start, error=True)
+            # Auth, 4xx and other errors would fail on every tier, so only timeouts fall back
+            if faster is None or not is_timeout(e):
+                raise
+            logger.warning(f"{stage}: {model} exceeded its {slo}s SLO, falling back to {faster} tier")
+            tier, model = faster, tier_model(faster)
+            start = time.perf_counter()
+            content, usage = _complete(prompt, pydantic_model, model, None)
+            self.record(stage, tier, model, time.perf_counter() - start, usage, fallback=True)
+            return content
+        self.record(stage, tier, model, time.perf_counter() - start, usage, fallback=tier != stage_tier(stage))
+        return content
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {stage: stats.as_dict() for stage, stats in self.stages.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+            self._degraded_calls.clear()
+
+
+ROUTER = ModelRouter()
+
+
+def llm_generate_content(prompt: str ,pydantic_model, stage: Optional[str] = None) -> str:
         """
         Generate content using OpenAI LLM based on the provided prompt.
-        
+
+        The model is chosen by ROUTER from the stage's tier. Identical
+        concurrent requests (same endpoint, stage, configured model, response
+        format and prompt) share one API call.
+
         Args:
             prompt: The input prompt for the LLM.
-            
+            pydantic_model: Structured response format, or None for plain text.
+            stage: Pipeline stage (STAGE_DESCRIBE, STAGE_SQL, ...); None uses Config.OPENAI_MODEL.
+
         Returns:
-            ColumnDescription: The generated content as a ColumnDescription object.
+            The generated content (JSON text when pydantic_model is given).
         """
+        from .single_flight import LLM_FLIGHTS, content_key
+        response_format = None if pydantic_model is None else f"{pydantic_model.__module__}.{pydantic_model.__qualname__}"
+        model = tier_model(stage_tier(stage)) if stage else Config.OPENAI_MODEL
+        key = content_key(Config.OPENAI_BASE_URL, stage, model, response_format, prompt)
+        return LLM_FLIGHTS.do(key, lambda: ROUTER.complete(prompt, pydantic_model, stage))
+
+
+def _create(client, prompt: str, pydantic_model, model: str):
+    # Call OpenAI API to generate content
+    if pydantic_model is None:
+        # If no Pydantic model is provided, use a simple string response
+        return client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.0)
+    from openai.lib._parsing._completions import type_to_response_format_param
+    return client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.0,
+                response_format= type_to_response_format_param(pydantic_model))
+
+
+def _complete(prompt: str, pydantic_model, model: str, timeout: Optional[float] = None) -> Tuple[str, Any]:
+        """One chat completion; returns (content, usage)"""
         try:
-            client = OpenAI(api_key=Config.OPENAI_API_KEY)
-            model = Config.OPENAI_MODEL 
-            # Call OpenAI API to generate content
-            if pydantic_model is None:
-                # If no Pydantic model is provided, use a simple string response
-                response = client.chat.completions.create(
-                            model=model,
-                            messages=[{"role": "user", "content": prompt}],
-                            temperature=0.0)
-            else:
-                response = client.chat.completions.create(
-                            model=model,
-                            messages=[{"role": "user", "content": prompt}],
-                            temperature=0.0,
-                            response_format= type_to_response_format_param(pydantic_model))
-            return response.choices[0].message.content.strip()
+            client = get_client(Config.OPENAI_API_KEY, Config.OPENAI_BASE_URL)
+            retries = 0
+            if timeout is not None:
+                # A missed SLO falls back to another tier instead of being retried, so the
+                # SDK retries are off and every other retryable error is retried here
+                retries, client = client.max_retries, client.with_options(timeout=timeout, max_retries=0)
+            for attempt in range(retries + 1):
+                try:
+                    response = _create(client, prompt, pydantic_model, model)
+                    break
+                except Exception as e:
+                    if attempt == retries or not is_retryable(e):
+                        raise
+                    delay = min(0.5 * 2 ** attempt, 8.0)
+                    logger.warning(f"Retrying {model} in {delay}s after: {e}")
+                    time.sleep(delay)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                from .prompt_context import PROMPT_METRICS
+                PROMPT_METRICS.record_usage(usage)
+            return response.choices[0].message.content.strip(), usage
         except Exception as e:
             logger.error(f"Error generating content: {str(e)}")
             raise
-       
-                
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Process-wide memory budget for session data.
+
+Every Streamlit session keeps its dataset and profiling state in memory, and
+all sessions share one process. Objects registered with the MemoryManager are
+accounted against a single byte budget; when it is exceeded the least
+recently used objects are spilled to disk (Parquet for DataFrames when
+pyarrow is installed, pickle otherwise) and reloaded on their next access.
+"""
+from __future__ import annotations
+import importlib.util
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Approximate in-memory size: deep memory usage for pandas objects, pickled size otherwise"""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except TypeError:
+            pass
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _is_dataframe(value: Any) -> bool:
+    return type(value).__name__ == "DataFrame" and type(value).__module__.startswith("pandas")
+
+
+class Managed:
+    """Handle to an object under the memory budget; get() reloads it if it was spilled"""
+
+    def __init__(self, manager: MemoryManager, key: str, value: Any, kind: str):
+        self._manager = manager
+        self.key = key
+        self.kind = kind
+        self.nbytes = estimate_nbytes(value)
+        self._value = value
+        self._path: Optional[str] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._value is None
+
+    def get(self) -> Any:
+        return self._manager._access(self)
+
+    def _spill(self, directory: str) -> None:
+        value = self._value
+        if _is_dataframe(value) and importlib.util.find_spec("pyarrow") is not None:
+            path = os.path.join(directory, f"{self.key}.parquet")
+            try:
+                value.to_parquet(path, index=True)
+                self._path, self._value = path, None
+                return
+            except Exception as e:
+                # e.g. mixed-type object columns Arrow can't represent
+                logger.info(f"Falling back to pickle for {self.key}: {str(e)}")
+                if os.path.exists(path):
+                    os.unlink(path)
+        path = os.path.join(directory, f"{self.key}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._path, self._value = path, None
+
+    def _reload(self) -> None:
+        if self._path.endswith(".parquet"):
+            import pandas as pd
+            self._value = pd.read_parquet(self._path)
+        else:
+            with open(self._path, "rb") as f:
+                self._value = pickle.load(f)
+        os.unlink(self._path)
+        self._path = None
+
+
+class MemoryManager:
+    """Tracks registered objects across sessions and spills the coldest ones past the budget"""
+
+    def __init__(self, budget_bytes: int, spill_dir: Optional[str] = None):
+        """
+        Args:
+            budget_bytes: Bytes of registered objects kept in memory before spilling
+            spill_dir: Directory for spilled objects (a fresh temp directory by default)
+        """
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="csv_nlp_sql_spill_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        # key -> handle, least recently used first; handles go away with their last user
+        self._handles: "OrderedDict[str, weakref.ref]" = OrderedDict()
+        self.spills = 0
+        self.reloads = 0
+
+    def register(self, value: Any, kind: str = "object", key: Optional[str] = None) -> Managed:
+        """
+        Put an object under the budget
+
+        Args:
+            value: Object to manage (treated as immutable; register a new one instead of mutating)
+            kind: Category reported in usage(), e.g. "dataset" or "stats"
+            key: Content key; registering the same key again returns the existing handle
+
+        Returns:
+            Handle whose get() returns the object
+        """
+        with self._lock:
+            if key is not None and key in self._handles:
+                existing = self._handles[key]()
+                if existing is not None:
+                    self._handles.move_to_end(key)
+                    return existing
+            key = key or uuid.uuid4().hex
+            handle = Managed(self, key, value, kind)
+            self._handles[key] = weakref.ref(handle)
+            # Passing the handle's __dict__ (not the handle) lets the finalizer find its spill file
+            weakref.finalize(handle, self._forget, key, handle.__dict__)
+            self._enforce(keep=handle)
+            return handle
+
+    def _forget(self, key: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            ref = self._handles.get(key)
+            if ref is not None and ref() is None:
+                self._handles.pop(key, None)
+        path = state.get("_path")
+        if path and os.path.exists(path):
+            os.unlink(path)
+
+    def export_file(self, suffix: str = "") -> ExportFile:
+        """New download file under the spill directory; see ExportFile"""
+        return ExportFile(self.spill_dir, suffix)
+
+    def _access(self, handle: Managed) -> Any:
+        with self._lock:
+            if handle.key in self._handles:
+                self._handles.move_to_end(handle.key)
+            if handle.spilled:
+                handle._reload()
+                self.reloads += 1
+                logger.info(f"Reloaded spilled {handle.kind} {handle.key} ({handle.nbytes / 2**20:.1f} MB)")
+                self._enforce(keep=handle)
+            return handle._value
+
+    def _live(self):
+        for key, ref in list(self._handles.items()):
+            handle = ref()
+            if handle is None:
+                self._handles.pop(key, None)
+            else:
+                yield handle
+
+    def _enforce(self, keep: Optional[Managed] = None) -> None:
+        resident = sum(h.nbytes for h in self._live() if not h.spilled)
+        for handle in list(self._live()):
+            if resident <= self.budget_bytes:
+                break
+            if handle is keep or handle.spilled:
+                continue
+            handle._spill(self.spill_dir)
+            resident -= handle.nbytes
+            self.spills += 1
+            logger.info(f"Spilled {handle.kind} {handle.key} ({handle.nbytes / 2**20:.1f} MB) to disk")
+
+    def usage(self) -> Dict[str, Any]:
+        """Current accounting, for monitoring"""
+        with self._lock:
+            handles = list(self._live())
+            by_kind: Dict[str, Dict[str, int]] = {}
+            for handle in handles:
+                entry = by_kind.setdefault(handle.kind, {"objects": 0, "resident_bytes": 0, "spilled_bytes": 0})
+                entry["objects"] += 1
+                entry["spilled_bytes" if handle.spilled else "resident_bytes"] += handle.nbytes
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": sum(k["resident_bytes"] for k in by_kind.values()),
+                "spilled_bytes": sum(k["spilled_bytes"] for k in by_kind.values()),
+                "objects": len(handles),
+                "spills": self.spills,
+                "reloads": self.reloads,
+                "by_kind": by_kind,
+            }
+
+
+class ExportFile:
+    """
+    A file written for download, kept under the manager's spill directory
+
+    The file is deleted by remove(), or when the object is garbage collected
+    (e.g. with the session state holding it) or the process exits.
+    """
+
+    def __init__(self, directory: str, suffix: str = ""):
+        exports = os.path.join(directory, "exports")
+        os.makedirs(exports, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=exports)
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+
+    def remove(self) -> None:
+        self._finalizer()
+
+
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+@lru_cache(maxsize=1)
+def get_memory_manager() -> MemoryManager:
+    """The process-wide manager, sized from Config"""
+    from config.config import Config
+    return MemoryManager(Config.MEMORY_BUDGET_MB * 2**20, Config.SPILL_DIR)
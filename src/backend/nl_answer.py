@@ -1,6 +1,5 @@
-import openai
 from .prompts import NATURAL_LANGUAGE_ANSWER_PROMPT
-from .llm import llm_generate_content
+from .llm import STAGE_ANSWER, llm_generate_content
 def generate_natural_language_answer(question: str, sql: str, result_df):
     """
     Generate a natural language answer to a user's question based on the SQL query and its result DataFrame.
@@ -16,4 +15,5 @@ def generate_natural_language_answer(question: str, sql: str, result_df):
     # Call OpenAI API to generate the answer
     return llm_generate_content(
         prompt=prompt,
-        pydantic_model= None)
\ No newline at end of file
+        pydantic_model= None,
+        stage=STAGE_ANSWER)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Multi-process CSV profiling.
+
+The file is split into byte ranges aligned to line boundaries and the columns
+into groups; each (range, group) pair is profiled by a worker that reads its
+slice straight from the file, so row data never crosses a process boundary
+(the OS page cache is the only thing the workers share). Only the bounded,
+mergeable TableStats are sent back and combined.
+
+Byte-range splitting assumes records contain no quoted newlines. When a shard
+boundary lands inside a quoted field the shard fails to parse, and the file is
+re-profiled as a single whole-file task instead.
+"""
+import io
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .profiling import TableStats
+from .schema_model import TableSchema
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of bytes [start, end) of an open binary file"""
+
+    def __init__(self, f, start: int, end: int):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+@dataclass
+class ShardTask:
+    """One unit of work: a line-aligned byte range and the columns to profile in it"""
+    path: str
+    index: int
+    start: int
+    end: int
+    names: List[str]
+    usecols: List[str]
+    chunk_size: int
+    sample_size: int
+    seed: int
+
+
+def _profile_shard(task: ShardTask) -> Tuple[int, TableStats]:
+    import pandas as pd
+    stats = TableStats(sample_size=task.sample_size, seed=[task.seed, task.index])
+    if task.end <= task.start:
+        return task.index, stats
+    with open(task.path, "rb") as f:
+        reader = io.BufferedReader(_RangeReader(f, task.start, task.end), buffer_size=1024 * 1024)
+        try:
+            chunks = pd.read_csv(reader, header=None, names=task.names, usecols=task.usecols, chunksize=task.chunk_size)
+            with chunks:
+                for chunk in chunks:
+                    stats.update(chunk)
+        except pd.errors.EmptyDataError:
+            pass
+    return task.index, stats
+
+
+def read_header(file_path: str) -> Tuple[List[str], int]:
+    """Column names (as pandas would name them) and the byte offset where data starts"""
+    import pandas as pd
+    with open(file_path, "rb") as f:
+        line = f.readline()
+        names = pd.read_csv(io.BytesIO(line), nrows=0).columns.tolist()
+        return names, f.tell()
+
+
+def line_aligned_offsets(file_path: str, start: int, shard_bytes: int) -> List[int]:
+    """Boundaries that split [start, EOF) into ranges of roughly shard_bytes, each ending on a newline"""
+    size = os.path.getsize(file_path)
+    offsets = [start]
+    with open(file_path, "rb") as f:
+        target = start + shard_bytes
+        while target < size:
+            f.seek(target - 1)
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            offsets.append(position)
+            target = position + shard_bytes
+    offsets.append(size)
+    return offsets
+
+
+class ParallelProfiler:
+    """Profiles a CSV on a process pool, sharded by row ranges and column groups"""
+
+    def __init__(self, workers: Optional[int] = None, shard_bytes: int = DEFAULT_SHARD_BYTES,
+                 column_group_size: Optional[int] = None, chunk_size: int = 100_000,
+                 sample_size: int = 10000, seed: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_bytes = shard_bytes
+        self.column_group_size = column_group_size
+        self.chunk_size = chunk_size
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def plan(self, file_path: str) -> List[ShardTask]:
+        """Split the file into (byte range x column group) tasks, at least one per worker when possible"""
+        names, data_start = read_header(file_path)
+        offsets = line_aligned_offsets(file_path, data_start, self.shard_bytes)
+        row_shards = len(offsets) - 1
+
+        group_size = self.column_group_size
+        if group_size is None:
+            # Few row shards (small or wide files): give the spare workers column groups instead
+            groups = max(1, min(len(names), math.ceil(self.workers / row_shards)))
+            group_size = math.ceil(len(names) / groups)
+        column_groups = [names[i:i + group_size] for i in range(0, len(names), group_size)] or [[]]
+
+        tasks = []
+        for shard, (start, end) in enumerate(zip(offsets, offsets[1:])):
+            for usecols in column_groups:
+                tasks.append(ShardTask(
+                    path=str(file_path), index=shard, start=start, end=end, names=names, usecols=usecols,
+                    chunk_size=self.chunk_size, sample_size=self.sample_size, seed=self.seed,
+                ))
+        return tasks
+
+    def profile_csv(self, file_path: str, table_name: Optional[str] = None) -> TableSchema:
+        """
+        Profile a CSV file using all workers
+
+        Args:
+            file_path: Path to the CSV file
+            table_name: Table name; derived from the file name when omitted
+
+        Returns:
+            TableSchema equivalent to CSVAnalyzer.profile_csv (up to sampling randomness)
+        """
+        import pandas as pd
+        from .csv_analyzer import table_name_for
+        tasks = self.plan(file_path)
+        logger.info(f"Profiling {file_path} with {self.workers} workers over {len(tasks)} shards")
+
+        try:
+            if self.workers == 1 or len(tasks) == 1:
+                results = [_profile_shard(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    results = list(pool.map(_profile_shard, tasks))
+        except pd.errors.ParserError as e:
+            # A shard boundary split a quoted multi-line field; only a single pass can parse it
+            logger.warning(f"Sharded profile of {file_path} failed ({e}); profiling serially")
+            tasks = [replace(tasks[0], index=0, end=os.path.getsize(file_path), usecols=tasks[0].names)]
+            results = [_profile_shard(tasks[0])]
+
+        stats = merge_shards(tasks, [r for _, r in results])
+        file_name = Path(file_path).name
+        schema = stats.finalize(file_name, table_name or table_name_for(file_name))
+        # Keep the header's column order regardless of how shards were grouped
+        names = tasks[0].names if tasks else []
+        schema.columns = {name: schema.columns[name] for name in names if name in schema.columns}
+        return schema
+
+
+def merge_shards(tasks: Sequence[ShardTask], results: Sequence[TableStats]) -> TableStats:
+    """Merge row shards per column group (in file order), then join the column groups"""
+    by_group = {}
+    for task, stats in sorted(zip(tasks, results), key=lambda pair: pair[0].index):
+        key = tuple(task.usecols)
+        if key in by_group:
+            by_group[key].merge(stats)
+        else:
+            by_group[key] = stats
+
+    combined: Optional[TableStats] = None
+    for stats in by_group.values():
+        if combined is None:
+            combined = stats
+        else:
+            combined.combine_columns(stats)
+    return combined or TableStats()
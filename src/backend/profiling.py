@@ -0,0 +1,198 @@
+"""
+Streaming, mergeable column statistics.
+
+TableStats consumes a table one chunk at a time and keeps bounded state per
+column, so profiling cost in memory does not depend on the file size. Two
+TableStats built over different parts of the same table can be merged.
+"""
+from __future__ import annotations
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING, Union
+
+import numpy as np
+
+from .schema_model import ColumnProfile, TableSchema, to_native
+from .sketches import DistinctCounter, FrequentItems, KLLSketch, ReservoirSample
+if TYPE_CHECKING:
+    import pandas as pd
+logger = logging.getLogger(__name__)
+
+SAMPLE_VALUE_COUNT = 10
+SAMPLE_ROW_COUNT = 3
+
+
+def merge_dtypes(left: Optional[str], right: Optional[str]) -> Optional[str]:
+    """dtype pandas would infer for the concatenation of two chunks"""
+    if left is None or left == right:
+        return right
+    if right is None:
+        return left
+    try:
+        a, b = np.dtype(left), np.dtype(right)
+    except TypeError:
+        return "object"
+    if a.kind in "iuf" and b.kind in "iuf":
+        return str(np.result_type(a, b))
+    return "object"
+
+
+def is_numeric_dtype_name(dtype: Optional[str]) -> bool:
+    import pandas as pd
+    if dtype is None:
+        return False
+    try:
+        return bool(pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)))
+    except TypeError:
+        return False
+
+
+class ColumnStats:
+    """Mergeable statistics for one column"""
+
+    def __init__(self, sample_size: int = 10000, seed: Any = 0):
+        self.rows = 0
+        self.null_count = 0
+        self.dtype: Optional[str] = None
+        self.numeric_count = 0
+        self.numeric_sum = 0.0
+        self.min_value: Any = None
+        self.max_value: Any = None
+        self.quantiles = KLLSketch(seed=seed)
+        self.distinct = DistinctCounter()
+        self.frequent = FrequentItems()
+        self.reservoir = ReservoirSample(sample_size, seed=seed)
+
+    def update(self, series: pd.Series) -> None:
+        import pandas as pd
+        self.rows += len(series)
+        values = series.dropna()
+        self.null_count += len(series) - len(values)
+        if values.empty:
+            # An all-null chunk reads as float64 and must not change the column type
+            return
+        self.dtype = merge_dtypes(self.dtype, str(series.dtype))
+
+        if pd.api.types.is_numeric_dtype(series):
+            numbers = values.to_numpy(dtype=np.float64)
+            self.numeric_count += len(numbers)
+            self.numeric_sum += float(numbers.sum())
+            low, high = to_native(values.min()), to_native(values.max())
+            self.min_value = low if self.min_value is None else min(self.min_value, low)
+            self.max_value = high if self.max_value is None else max(self.max_value, high)
+            self.quantiles.update(numbers)
+            # Hash as float so 1 and 1.0 from differently-typed chunks count once
+            hashes = pd.util.hash_array(numbers)
+        else:
+            hashes = pd.util.hash_array(values.to_numpy(dtype=object))
+
+        self.distinct.update(hashes)
+        self.frequent.update(values.value_counts(sort=False))
+        self.reservoir.update(values.to_numpy())
+
+    def merge(self, other: ColumnStats) -> None:
+        self.rows += other.rows
+        self.null_count += other.null_count
+        self.dtype = merge_dtypes(self.dtype, other.dtype)
+        self.numeric_count += other.numeric_count
+        self.numeric_sum += other.numeric_sum
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+            self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        self.reservoir.merge(other.reservoir)
+
+    def _sample_values(self) -> List[Any]:
+        """Heavy hitters first, then distinct values from the uniform sample"""
+        samples: List[Any] = []
+        seen = set()
+        candidates = self.frequent.top(SAMPLE_VALUE_COUNT)
+        if len(candidates) < SAMPLE_VALUE_COUNT and len(self.reservoir.values):
+            import pandas as pd
+            candidates += pd.Series(self.reservoir.values).value_counts().index.tolist()
+        for value in candidates:
+            value = to_native(value)
+            if value is not None and value not in seen:
+                seen.add(value)
+                samples.append(value)
+            if len(samples) == SAMPLE_VALUE_COUNT:
+                break
+        return samples
+
+    def finalize(self) -> ColumnProfile:
+        dtype = self.dtype or "float64"
+        is_numeric = is_numeric_dtype_name(dtype)
+        unique_values = self.distinct.estimate()
+        profile = ColumnProfile(
+            data_type=dtype,
+            unique_values=unique_values,
+            sample_values=self._sample_values(),
+            null_count=self.null_count,
+            is_numeric=is_numeric,
+            is_categorical=unique_values < self.rows * 0.5 and unique_values < 20,
+        )
+        if is_numeric and self.numeric_count:
+            profile.min_value = self.min_value
+            profile.max_value = self.max_value
+            profile.mean_value = self.numeric_sum / self.numeric_count
+            p25, p50, p75 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+            profile.quantiles = {"p25": p25, "p50": p50, "p75": p75}
+        return profile
+
+
+class TableStats:
+    """Mergeable statistics for a whole table, fed chunk by chunk"""
+
+    def __init__(self, sample_size: int = 10000, seed: Union[int, Sequence[int]] = 0):
+        self.sample_size = sample_size
+        self.seed = list(np.atleast_1d(seed).tolist())
+        self.rows = 0
+        self.columns: Dict[str, ColumnStats] = {}
+        self.sample_rows: List[Dict[str, Any]] = []
+
+    def _column(self, name: str) -> ColumnStats:
+        if name not in self.columns:
+            # Seeded by name so results don't depend on how columns are grouped into shards
+            seed = [*self.seed, zlib.crc32(str(name).encode())]
+            self.columns[name] = ColumnStats(self.sample_size, seed=seed)
+        return self.columns[name]
+
+    def update(self, df: pd.DataFrame) -> None:
+        if len(self.sample_rows) < SAMPLE_ROW_COUNT:
+            head = df.head(SAMPLE_ROW_COUNT - len(self.sample_rows)).to_dict("records")
+            self.sample_rows += [{k: to_native(v) for k, v in row.items()} for row in head]
+        for name in df.columns:
+            self._column(name).update(df[name])
+        self.rows += len(df)
+
+    def merge(self, other: TableStats) -> None:
+        """Merge statistics of other rows of the same table"""
+        if len(self.sample_rows) < SAMPLE_ROW_COUNT:
+            self.sample_rows += other.sample_rows[:SAMPLE_ROW_COUNT - len(self.sample_rows)]
+        for name, stats in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(stats)
+            else:
+                self.columns[name] = stats
+        self.rows += other.rows
+
+    def combine_columns(self, other: TableStats) -> None:
+        """Add statistics of other columns computed over the same rows"""
+        self.columns.update(other.columns)
+        self.rows = max(self.rows, other.rows)
+        if not self.sample_rows:
+            self.sample_rows = [dict(row) for row in other.sample_rows]
+        else:
+            for row, extra in zip(self.sample_rows, other.sample_rows):
+                row.update(extra)
+
+    def finalize(self, file_name: str, table_name: str) -> TableSchema:
+        return TableSchema(
+            file_name=file_name,
+            table_name=table_name,
+            row_count=self.rows,
+            columns={name: stats.finalize() for name, stats in self.columns.items()},
+            sample_data=self.sample_rows,
+        )
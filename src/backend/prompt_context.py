@@ -0,0 +1,150 @@
+"""
+Per-dataset prompt context.
+
+The schema block of the SQL generation prompts only depends on the dataset,
+so it is rendered once (when the schema is enhanced) and reused as the
+identical leading prefix of every strategy's prompt. Keeping it byte-identical
+is what lets the provider's prompt cache serve it; PromptMetrics tracks how
+much of the prompt traffic is that shared prefix.
+"""
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+
+from .prompts import SQL_SCHEMA_PREFIX
+logger = logging.getLogger(__name__)
+
+SAMPLE_VALUES_IN_SCHEMA = 5
+
+
+def format_schema(schema: Dict[str, Any]) -> str:
+    """Render a schema (columns as dict or list) as the text block used in prompts"""
+    columns = schema["columns"]
+    if isinstance(columns, dict):
+        columns = [{"name": name, **info} for name, info in columns.items()]
+    header = f"Table: {schema['table_name']}"
+    if schema.get("row_count") is not None:
+        header += f" ({schema['row_count']} rows)"
+    lines = [header, "Columns:"]
+    for col in columns:
+        line = f"- {col['name']} ({col.get('data_type', '')})"
+        if col.get("description"):
+            line += f": {col['description']}"
+        if col.get("is_categorical") and col.get("sample_values"):
+            values = ", ".join(str(v) for v in col["sample_values"][:SAMPLE_VALUES_IN_SCHEMA])
+            line += f" Values include: {values}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_prior_results(prior_results: Optional[Sequence[Any]]) -> str:
+    """Describe PriorResult tables from earlier turns; empty when there are none"""
+    if not prior_results:
+        return ""
+    lines = [
+        "\nPrevious results (most recent first). If the question follows up on one of them, "
+        "query that table instead of the full table:"
+    ]
+    for prior in prior_results:
+        lines.append(f"Table: {prior.table_name} ({prior.row_count} rows) -- answer to \"{prior.question}\"")
+        lines.extend(f"- {column}" for column in prior.columns)
+    return "\n".join(lines) + "\n"
+
+
+@dataclass(frozen=True)
+class PromptContext:
+    """Dataset-dependent part of the SQL prompts, rendered once"""
+    table_name: str
+    schema_text: str
+    prefix: str
+    prefix_tokens: int
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, Any]) -> "PromptContext":
+        schema_text = format_schema(schema)
+        prefix = SQL_SCHEMA_PREFIX.format(schema_text=schema_text)
+        return cls(
+            table_name=schema["table_name"],
+            schema_text=schema_text,
+            prefix=prefix,
+            prefix_tokens=estimate_tokens(prefix),
+        )
+
+    def build(self, template: str, prior_results: Optional[Sequence[Any]] = None, **fields: Any) -> str:
+        """
+        Full prompt: shared prefix, then prior-result tables, then the strategy template
+
+        Args:
+            template: Strategy template (without the schema)
+            prior_results: PriorResult tables the question may follow up on
+            **fields: Values for the template's placeholders
+
+        Returns:
+            Prompt text
+        """
+        suffix = format_prior_results(prior_results) + template.format(**fields)
+        PROMPT_METRICS.record(self.prefix_tokens, estimate_tokens(suffix))
+        return self.prefix + suffix
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the usual ~4 characters per token"""
+    encoder = _encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+class PromptMetrics:
+    """Running prompt-token totals and the share that is the cacheable dataset prefix"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.prefix_tokens = 0
+        self.cached_tokens = 0  # as reported by the provider
+
+    def record(self, prefix_tokens: int, suffix_tokens: int) -> None:
+        with self._lock:
+            self.prompts += 1
+            self.prompt_tokens += prefix_tokens + suffix_tokens
+            self.prefix_tokens += prefix_tokens
+
+    def record_usage(self, usage: Any) -> None:
+        """Add provider-reported cached prompt tokens from a completion's usage block"""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        with self._lock:
+            self.cached_tokens += cached
+
+    @property
+    def prefix_share(self) -> float:
+        return self.prefix_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "prompts": self.prompts,
+            "prompt_tokens": self.prompt_tokens,
+            "prefix_tokens": self.prefix_tokens,
+            "prefix_share": self.prefix_share,
+            "cached_tokens": self.cached_tokens,
+        }
+
+
+PROMPT_METRICS = PromptMetrics()
@@ -67,8 +67,19 @@ Return a JSON object "description" as key and description value as value.
 
 """
 
+# Leading block shared by every SQL generation prompt. It depends only on the
+# dataset, so it is byte-identical across strategies and questions and can be
+# served from the provider's prompt cache. Strategy templates below are appended
+# after it (and after any prior-result tables) and must not repeat the schema.
+SQL_SCHEMA_PREFIX = """You are an expert SQL developer working with a SQLite database.
+All SQL you write must only reference the tables and columns described here.
+
+Schema Information:
+{schema_text}
+"""
+
 ZERO_SHOT_PROMPT = """
-You are an expert SQL developer. Generate ONLY valid, executable SQL queries.
+Generate ONLY valid, executable SQL queries.
 
 CRITICAL REQUIREMENTS:
 - Use :parameter_name syntax for any dynamic values
@@ -76,15 +87,14 @@ CRITICAL REQUIREMENTS:
 - Return only the SQL query without explanations
 - Ensure query is compatible with SQLAlchemy execution
 
-Schema: {schema_text}
-
 Question: {user_question}
 
 Write a valid SQL query using this schema (use parameterized queries for safety):
 """
 
 FEW_SHOT_PROMPT = """
-Schema: 
+Examples on a different table:
+
 Table: students
 - name: name of the student
 - grade: grade level  
@@ -97,9 +107,7 @@ SQL: SELECT subject, AVG(marks) FROM students GROUP BY subject;
 Q: What is the average marks for a specific grade?
 SQL: SELECT AVG(marks) FROM students WHERE grade = :grade_level;
 
-Now use this schema:
-
-{schema_text}
+Now answer using the schema above.
 
 REQUIREMENTS:
 - Generate only valid SQL queries
@@ -112,7 +120,7 @@ SQL:
 """
 
 SCHEMA_AWARE_PROMPT = """
-You are a data assistant. Use the following schema to write a SQL query that answers the user's question.
+Use the schema above to write a SQL query that answers the user's question.
 
 MANDATORY RULES:
 1. Generate ONLY executable SQL queries
@@ -122,9 +130,6 @@ MANDATORY RULES:
 5. Optimize for performance where possible
 6. Ensure compatibility with SQLAlchemy execution
 
-Schema Information:
-{schema_text}
-
 Question: {user_question}
 
 Validation Checklist:
@@ -137,9 +142,7 @@ Validation Checklist:
 SQL Query:
 """
 COT_PROMPT = """
-You are an expert SQL analyst. Think step-by-step to solve the user's question using SQL.
-
-Schema: {schema_text}
+Think step-by-step to solve the user's question using SQL.
 
 Question: {user_question}
 
@@ -168,10 +171,11 @@ The result of the query is:
 
 Based on the above, provide a clear and concise natural language answer to the user's question. If the result is a table, summarize the key findings. Always use the table as the citation for your answer.
 """
+# Appended to SQL_SCHEMA_PREFIX like the generation strategies
 RERANK_PROMPT= """
 Question: {question}
 
-Here are {len} SQL queries and table information {table_schema}:
+Here are {len} SQL queries:
 
 {queries}
 
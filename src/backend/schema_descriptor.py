@@ -1,52 +1,42 @@
 import json
 import logging
-from typing import Dict, Any
-from openai import OpenAI
-from config.config import Config
+from typing import Any, Dict, Iterable, Optional
 from .prompts import SCHEMA_DESCRIPTION_PROMPT
-from .schemas import ColumnDescription
-from .llm import llm_generate_content
-import numpy as np
-import asyncio
+from .llm import STAGE_DESCRIBE, llm_generate_content
 logger = logging.getLogger(__name__)
 
 class SchemaDescriptor:
     """Generates semantic descriptions for CSV schemas using OpenAI"""
     
     
-    def generate_descriptions(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_descriptions(self, schema: Dict[str, Any], columns: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Generate semantic descriptions for the schema using OpenAI
         
         Args:
             schema: Dictionary containing schema information
+            columns: Only describe these columns (others keep their descriptions); None describes all
             
         Returns:
             Enhanced schema with descriptions
         """
         try:
+            from .schemas import ColumnDescription
             descriptions =  {}
+            wanted = None if columns is None else set(columns)
             for k, v in schema["columns"].items():
-                # Convert all numpy types to native Python types for JSON serialization
-                def convert_types(obj):
-                    if isinstance(obj, dict):
-                        return {kk: convert_types(vv) for kk, vv in obj.items()}
-                    elif isinstance(obj, list):
-                        return [convert_types(i) for i in obj]
-                    elif isinstance(obj, (np.integer, np.floating, np.bool_)):
-                        return obj.item()
-                    else:
-                        return obj
-                v_native = convert_types(v)
+                if wanted is not None and k not in wanted:
+                    continue
+                # CSVAnalyzer profiles hold native Python values, so no conversion pass is needed
                 prompt = SCHEMA_DESCRIPTION_PROMPT.format(
                     table_name=schema['table_name'],
                     table_schema=schema,
-                    columns_json=k + " : " + json.dumps(v_native, indent=2)
+                    columns_json=k + " : " + json.dumps(v, indent=2, default=str)
                 )
-                asyncio.sleep(0.5)  # Small delay to avoid rate limiting
                 response = llm_generate_content(
                     prompt=prompt,
-                    pydantic_model=ColumnDescription)
+                    pydantic_model=ColumnDescription,
+                    stage=STAGE_DESCRIBE)
                 description = response
                 print(f"Description for {k}: {description}")
                 
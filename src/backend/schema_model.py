@@ -0,0 +1,125 @@
+"""
+Typed schema model for profiled tables.
+
+Values are converted to native Python types once, when the profile is built,
+so serialization never has to walk the structure looking for numpy scalars.
+Each column's JSON is cached and only rebuilt when that column changes.
+"""
+import json
+import math
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def to_native(value: Any) -> Any:
+    """Convert numpy/pandas scalars to plain Python values; NaN and NaT become None"""
+    if type(value).__module__ == "numpy" and hasattr(value, "item"):
+        # Checked first: numpy.float64 subclasses float
+        value = value.item()
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if type(value).__name__ in ("NaTType", "NAType"):
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def dumps(obj: Any) -> str:
+    """Compact, key-sorted JSON; uses orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@dataclass(slots=True)
+class ColumnProfile:
+    """Profile of a single column, holding native Python values only"""
+    data_type: str
+    unique_values: int
+    sample_values: List[Any]
+    null_count: int
+    is_numeric: bool
+    is_categorical: bool
+    min_value: Any = None
+    max_value: Any = None
+    mean_value: Optional[float] = None
+    quantiles: Optional[Dict[str, float]] = None
+    description: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        for optional in ("quantiles", "description"):
+            if data[optional] is None:
+                del data[optional]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnProfile":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+@dataclass(slots=True)
+class TableSchema:
+    """Profiled table: metadata, per-column profiles and a few sample rows"""
+    file_name: str
+    table_name: str
+    row_count: int
+    columns: Dict[str, ColumnProfile]
+    sample_data: List[Dict[str, Any]] = field(default_factory=list)
+    _column_json: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict form used throughout the pipeline (prompts, ChaseSQL, frontend)"""
+        return {
+            "file_name": self.file_name,
+            "table_name": self.table_name,
+            "columns": {name: col.to_dict() for name, col in self.columns.items()},
+            "row_count": self.row_count,
+            "sample_data": self.sample_data,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TableSchema":
+        columns = data["columns"]
+        if isinstance(columns, list):
+            columns = {c["name"]: {k: v for k, v in c.items() if k != "name"} for c in columns}
+        return cls(
+            file_name=data.get("file_name", ""),
+            table_name=data["table_name"],
+            row_count=data.get("row_count", 0),
+            columns={name: ColumnProfile.from_dict(col) for name, col in columns.items()},
+            sample_data=[{k: to_native(v) for k, v in row.items()} for row in data.get("sample_data", [])],
+        )
+
+    def column_json(self, name: str) -> str:
+        cached = self._column_json.get(name)
+        if cached is None:
+            cached = dumps(self.columns[name].to_dict())
+            self._column_json[name] = cached
+        return cached
+
+    def to_json(self) -> str:
+        """Serialize the schema, reusing the cached JSON of unchanged columns"""
+        columns = ",".join(f"{dumps(name)}:{self.column_json(name)}" for name in sorted(self.columns))
+        head = dumps({
+            "file_name": self.file_name,
+            "row_count": self.row_count,
+            "sample_data": self.sample_data,
+            "table_name": self.table_name,
+        })
+        return '{"columns":{' + columns + "}," + head[1:]
+
+    def set_descriptions(self, descriptions: Dict[str, str]) -> None:
+        for name, description in descriptions.items():
+            if name in self.columns:
+                self.columns[name].description = description
+                self._column_json.pop(name, None)
@@ -0,0 +1,98 @@
+"""
+Coalescing of identical concurrent work.
+
+Streamlit serves every session from threads of one process, so when several
+people open the same dataset or ask the same question at once, each session
+would parse, profile, prompt and query independently. A SingleFlight group
+runs one computation per key at a time: callers that arrive while it is in
+flight wait for it and share its result (or its exception). Nothing is cached
+once the computation finishes; keys are content hashes, so only genuinely
+identical work is shared.
+"""
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def content_key(*parts: Any) -> str:
+    """Hash of the given parts (bytes are hashed as-is, anything else by its repr)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, (bytes, bytearray, memoryview)) else repr(part).encode()
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its outcome"""
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Return fn(), or the result of an identical in-flight call
+
+        Args:
+            key: Identity of the work, e.g. from content_key()
+            fn: Computation to run if no call with this key is in flight
+
+        Returns:
+            The computation's result; its exception is raised in every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.executed += 1
+            else:
+                call.waiters += 1
+                leader = False
+                self.shared += 1
+        if not leader:
+            logger.info(f"{self.name}: waiting for in-flight call {key[:12]}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "shared": self.shared}
+
+
+# Process-wide groups, shared by every session
+DATASET_FLIGHTS = SingleFlight("dataset")
+LLM_FLIGHTS = SingleFlight("llm")
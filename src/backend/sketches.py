@@ -0,0 +1,204 @@
+"""
+Bounded-memory, mergeable sketches used by the streaming profiler.
+
+Every sketch accepts data in vectorized batches (one CSV chunk at a time) and
+supports merge(), so partial results from different chunks, shards or
+processes can be combined without revisiting the data.
+"""
+import math
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+
+class ReservoirSample:
+    """Uniform sample of fixed capacity over a stream (Algorithm R, vectorized)"""
+
+    def __init__(self, capacity: int, seed: Any = 0):
+        self.capacity = capacity
+        self.seen = 0
+        self.values = np.empty(0, dtype=object)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        n = len(values)
+        fill = min(self.capacity - len(self.values), n)
+        if fill > 0:
+            self.values = np.concatenate([self.values, np.asarray(values[:fill], dtype=object)])
+        if n > fill:
+            # Item i (0-based over the stream) replaces slot j ~ U[0, i] when j < capacity.
+            # Repeated slots keep the last assignment, exactly as the sequential algorithm would.
+            positions = np.arange(self.seen + fill, self.seen + n)
+            slots = self._rng.integers(0, positions + 1)
+            accepted = slots < self.capacity
+            if accepted.any():
+                self.values[slots[accepted]] = np.asarray(values[fill:][accepted], dtype=object)
+        self.seen += n
+
+    def merge(self, other: "ReservoirSample") -> None:
+        """Combine two reservoirs into a uniform sample of the union of both streams"""
+        total = self.seen + other.seen
+        size = min(self.capacity, total)
+        if size == 0:
+            return
+        from_self = self._rng.hypergeometric(self.seen, other.seen, size) if self.seen and other.seen else (size if self.seen else 0)
+        mine = self._rng.choice(len(self.values), from_self, replace=False) if from_self else np.empty(0, dtype=int)
+        theirs = self._rng.choice(len(other.values), size - from_self, replace=False) if size - from_self else np.empty(0, dtype=int)
+        self.values = np.concatenate([self.values[mine], other.values[theirs]])
+        self.seen = total
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Keeps O(k log(n/k)) floats; rank error is roughly 1.7 / k.
+    """
+
+    def __init__(self, k: int = 200, seed: Any = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self) -> None:
+        while True:
+            for level in range(len(self.levels)):
+                if len(self.levels[level]) > self._capacity(level):
+                    self._compact(level)
+                    break
+            else:
+                return
+
+    def _compact(self, level: int) -> None:
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        items = np.sort(self.levels[level])
+        leftover = items[:0]
+        if len(items) % 2:
+            leftover, items = items[-1:], items[:-1]
+        promoted = items[self._rng.integers(2)::2]
+        self.levels[level] = leftover
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        if self.n == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2 ** level, dtype=float) for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=float) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, targets, side="left"), len(items) - 1)
+        return [float(v) for v in items[idx]]
+
+
+class FrequentItems:
+    """Misra-Gries heavy hitters; any item with frequency > n / (capacity + 1) is retained"""
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts = None  # pandas Series: item -> (lower-bound) count
+
+    def update(self, counts) -> None:
+        """Add a batch of exact counts (e.g. series.value_counts())"""
+        # Reducing the batch first keeps the alignment below small; summaries stay mergeable
+        counts = self._reduce(counts)
+        merged = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        self.counts = self._reduce(merged)
+
+    def _reduce(self, counts):
+        if len(counts) <= self.capacity:
+            return counts
+        values = counts.to_numpy()
+        threshold = np.partition(values, len(values) - self.capacity - 1)[len(values) - self.capacity - 1]
+        return counts[values > threshold] - threshold
+
+    def merge(self, other: "FrequentItems") -> None:
+        if other.counts is not None:
+            self.update(other.counts)
+
+    def top(self, n: int) -> List[Any]:
+        if self.counts is None:
+            return []
+        counts = self.counts[self.counts > 0]
+        order = np.argsort(-counts.to_numpy(), kind="stable")[:n]
+        return counts.index[order].tolist()
+
+
+class DistinctCounter:
+    """Exact distinct count up to exact_limit values, HyperLogLog beyond that"""
+
+    def __init__(self, precision: int = 14, exact_limit: int = 4096):
+        self.precision = precision
+        self.exact_limit = exact_limit
+        self.exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+        self.registers: Optional[np.ndarray] = None
+
+    def update(self, hashes: np.ndarray) -> None:
+        """Add 64-bit hashes (e.g. from pandas.util.hash_array)"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if self.exact is not None:
+            self.exact = np.union1d(self.exact, hashes)
+            if len(self.exact) > self.exact_limit:
+                self._to_hll()
+            return
+        self._add_to_registers(hashes)
+
+    def merge(self, other: "DistinctCounter") -> None:
+        if other.exact is not None:
+            self.update(other.exact)
+            return
+        if self.exact is not None:
+            self._to_hll()
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def _to_hll(self) -> None:
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self._add_to_registers(self.exact)
+        self.exact = None
+
+    def _add_to_registers(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # rest < 2**50, so float64 represents it exactly and log2 gives the exact bit length
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        bit_length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def estimate(self) -> int:
+        if self.exact is not None:
+            return len(self.exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            raw = m * math.log(m / zeros)
+        return int(round(raw))
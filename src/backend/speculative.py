@@ -0,0 +1,89 @@
+"""
+Speculative execution of SQL candidates.
+
+Candidates are executed on the resident dataset as soon as they are generated,
+while the remaining strategies and the reranker are still running. When the
+winner is chosen its result is usually already materialized; executions of
+the losing candidates are cancelled, or kept when they already finished.
+"""
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .sql_executor import QueryHandle, SQLEngine
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeExecutor:
+    """Runs SQL candidates on an SQLEngine ahead of selection"""
+    
+    def __init__(self, engine: SQLEngine, prepare: Optional[Callable[[str], str]] = None, max_workers: int = 4,
+                 max_rows: Optional[int] = None):
+        """
+        Args:
+            engine: Engine holding the dataset
+            prepare: Turns raw candidate SQL into executable SQL (e.g. clean_sql)
+            max_workers: Concurrent speculative executions
+            max_rows: Fetch at most this many rows per candidate (e.g. the first page);
+                larger results are paged with engine.cursor()
+        """
+        self.engine = engine
+        self.prepare = prepare or (lambda sql: sql.strip())
+        self.max_rows = max_rows
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative-sql")
+        self._futures: Dict[str, Future] = {}
+        self._handles: Dict[str, QueryHandle] = {}
+    
+    def submit(self, sql: str) -> Future:
+        """Start executing a candidate; identical candidates share one execution"""
+        key = self.prepare(sql)
+        if key not in self._futures:
+            handle = QueryHandle()
+            self._handles[key] = handle
+            self._futures[key] = self._pool.submit(self.engine.execute, key, handle, self.max_rows)
+            logger.info(f"Speculatively executing: {key}")
+        return self._futures[key]
+    
+    def succeeded(self, sql: str, wait: bool = True) -> bool:
+        """Whether a submitted candidate executed without error"""
+        future = self._futures.get(self.prepare(sql))
+        if future is None or (not wait and not future.done()):
+            return False
+        try:
+            future.result()
+            return True
+        except Exception:
+            return False
+    
+    def result(self, sql: str):
+        """Result of the chosen SQL; executes it now if it was never speculated"""
+        return self.submit(sql).result()
+    
+    def cancel_others(self, winner: str) -> List[str]:
+        """Cancel every unfinished execution except the winner's; finished results stay cached"""
+        winner_key = self.prepare(winner)
+        cancelled = []
+        for key, future in self._futures.items():
+            if key != winner_key and not future.done():
+                future.cancel()
+                self._handles[key].cancel()
+                cancelled.append(key)
+        if cancelled:
+            logger.info(f"Cancelled {len(cancelled)} speculative executions")
+        return cancelled
+    
+    def cached_results(self) -> Dict[str, object]:
+        """Results of all executions that finished successfully"""
+        results = {}
+        for key, future in self._futures.items():
+            if future.done() and not future.cancelled():
+                try:
+                    results[key] = future.result()
+                except Exception:
+                    continue
+        return results
+    
+    def shutdown(self) -> None:
+        for handle in self._handles.values():
+            handle.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
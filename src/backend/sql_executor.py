@@ -1,11 +1,17 @@
+from __future__ import annotations
 import sqlite3
-import pandas as pd
 import logging
-from typing import Any, Dict, List
-from io import StringIO
+import math
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar, TYPE_CHECKING
 import tempfile
 import os
+from .single_flight import SingleFlight, _Call, content_key
+if TYPE_CHECKING:
+    import pandas as pd
 
+T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
 class SQLExecutor:
@@ -32,6 +38,7 @@ class SQLExecutor:
             self._create_temp_db(df, table_name)
             
             # Execute query
+            import pandas as pd
             result_df = pd.read_sql_query(sql_query, self.connection)
             
             logger.info(f"Successfully executed query, returned {len(result_df)} rows")
@@ -87,4 +94,383 @@ class SQLExecutor:
             logger.warning(f"SQL validation failed: {str(e)}")
             return False
         
-        return False
\ No newline at end of file
+        return False
+
+
+class QueryCancelled(Exception):
+    """Raised when a running query is cancelled through its QueryHandle"""
+
+
+class QueryHandle:
+    """Lets another thread cancel a query running on an SQLEngine"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self.cancelled = False
+    
+    def cancel(self) -> None:
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            if self._connection is not None:
+                # sqlite3 allows interrupt() from any thread
+                self._connection.interrupt()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+    
+    def _on_cancel(self, callback: Callable[[], None]) -> None:
+        """Run callback once the handle is cancelled (now, if it already is)"""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def _attach(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("Query was cancelled before it started")
+            self._connection = connection
+    
+    def _detach(self) -> None:
+        with self._lock:
+            self._connection = None
+
+
+class _QueryCall(_Call):
+    def __init__(self):
+        super().__init__()
+        self.handle = QueryHandle()
+        self.live = 0  # callers that have not cancelled
+
+
+class QueryFlight(SingleFlight):
+    """
+    SingleFlight for cancellable queries.
+    
+    The shared run has its own QueryHandle. A caller whose handle is cancelled
+    stops waiting at once, but the run is only interrupted when every caller's
+    handle has been cancelled; callers without a handle never cancel.
+    """
+    
+    def run(self, key: str, execute: Callable[[QueryHandle], T], handle: Optional[QueryHandle] = None) -> T:
+        """
+        Return execute(shared_handle), or the result of an identical in-flight query
+        
+        Args:
+            key: Identity of the query, e.g. from content_key()
+            execute: Runs the query under the given handle
+            handle: The caller's handle; cancelling it raises QueryCancelled in this caller
+        
+        Returns:
+            The query's result; its exception is raised in every caller
+        """
+        if handle is not None and handle.cancelled:
+            raise QueryCancelled("Query was cancelled before it started")
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _QueryCall()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+            call.live += 1
+        if handle is not None:
+            handle._on_cancel(lambda: self._abandon(key, call))
+        if leader:
+            try:
+                call.result = execute(call.handle)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                call.done.set()
+        else:
+            logger.info(f"{self.name}: waiting for in-flight query {key[:12]}")
+            while not call.done.wait(0.05):
+                if handle is not None and handle.cancelled:
+                    break
+        if handle is not None and handle.cancelled:
+            raise QueryCancelled("Query was cancelled")
+        if call.error is not None:
+            raise call.error
+        return call.result
+    
+    def _abandon(self, key: str, call: _QueryCall) -> None:
+        with self._lock:
+            call.live -= 1
+            if call.live > 0:
+                return
+            # Nobody wants the result any more; later callers start a fresh run
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.handle.cancel()
+
+
+# Process-wide, shared by every session
+SQL_FLIGHTS = QueryFlight("sql")
+
+
+class SQLEngine:
+    """
+    Keeps tables resident in one SQLite database so queries don't reload the data.
+
+    Queries run on per-thread connections opened with query_only, so generated
+    SQL cannot modify the tables or leave a write transaction open. Tables are
+    created and dropped through the single write connection (see writing()).
+    """
+    
+    def __init__(self):
+        temp_fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(temp_fd)
+        self.tables: Dict[str, List[str]] = {}
+        # Content hash per table; identical queries over identical tables are coalesced across engines
+        self.fingerprints: Dict[str, str] = {}
+        self._local = threading.local()
+        # Query connections by owning thread; those of finished threads are closed on the next connect()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._writer = self._open()
+        # WAL lets the per-thread connections read while tables are written
+        self._writer.execute("PRAGMA journal_mode=WAL")
+    
+    def _open(self, query_only: bool = False) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            connection.execute("SELECT SQRT(1)")
+        except sqlite3.OperationalError:
+            # SQLite builds without math functions (used by approximate confidence intervals)
+            connection.create_function("SQRT", 1, lambda x: math.sqrt(x) if x is not None and x >= 0 else None, deterministic=True)
+        if query_only:
+            connection.execute("PRAGMA query_only=ON")
+        return connection
+    
+    def connect(self) -> sqlite3.Connection:
+        """Read-only query connection owned by the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._open(query_only=True)
+            self._local.connection = connection
+            with self._lock:
+                finished = [thread for thread in self._connections if not thread.is_alive()]
+                for thread in finished:
+                    # Pool threads exit without closing their connections
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = connection
+        return connection
+    
+    @contextmanager
+    def writing(self) -> Iterator[sqlite3.Connection]:
+        """The write connection, held exclusively; commits on success and rolls back on error"""
+        with self._write_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+    
+    def load_table(self, df: pd.DataFrame, table_name: str, if_exists: str = 'replace') -> None:
+        """Load (or append) a DataFrame as a table"""
+        import pandas as pd
+        with self.writing() as connection:
+            df.to_sql(table_name, connection, index=False, if_exists=if_exists)
+        self.tables[table_name] = [str(c) for c in df.columns]
+        rows = pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+        previous = self.fingerprints.get(table_name) if if_exists == 'append' else None
+        self.fingerprints[table_name] = content_key(previous, [str(c) for c in df.columns], rows)
+        logger.info(f"Loaded {len(df)} rows into resident table: {table_name}")
+
+    def drop_table(self, table_name: str) -> None:
+        """Drop a resident table if it exists"""
+        with self.writing() as connection:
+            connection.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        self.tables.pop(table_name, None)
+        self.fingerprints.pop(table_name, None)
+        logger.info(f"Dropped resident table: {table_name}")
+
+    def set_fingerprint(self, table_name: str, fingerprint: str) -> None:
+        """Record the content identity of a table created directly in SQL"""
+        self.fingerprints[table_name] = fingerprint
+
+    def execute(self, sql_query: str, handle: Optional[QueryHandle] = None, max_rows: Optional[int] = None) -> pd.DataFrame:
+        """
+        Execute SQL against the resident tables
+        
+        A query identical to one already running over the same table contents
+        (in this or another engine) waits for that run and shares its result,
+        which callers must not modify. The shared run is interrupted only when
+        every waiting caller has cancelled its handle (see QueryFlight).
+        
+        Args:
+            sql_query: SQL query to execute
+            handle: Optional handle through which another thread can cancel the query
+            max_rows: Stop fetching after this many rows (use cursor() to page through the rest)
+            
+        Returns:
+            DataFrame with query results
+        """
+        key = content_key(sql_query, max_rows, sorted(self.fingerprints.items()))
+        return SQL_FLIGHTS.run(key, lambda shared: self._execute(sql_query, shared, max_rows), handle)
+
+    def _execute(self, sql_query: str, handle: Optional[QueryHandle], max_rows: Optional[int]) -> pd.DataFrame:
+        import pandas as pd
+        connection = self.connect()
+        if handle is not None:
+            handle._attach(connection)
+        try:
+            cursor = connection.execute(sql_query)
+            columns = [d[0] for d in cursor.description] if cursor.description else []
+            rows = cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows)
+            cursor.close()
+            return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        except sqlite3.OperationalError as e:
+            if handle is not None and handle.cancelled:
+                raise QueryCancelled(str(e)) from e
+            raise
+        finally:
+            if handle is not None:
+                handle._detach()
+    
+    def cursor(self, sql_query: str, page_size: int = 1000) -> ResultCursor:
+        """Paged, streaming access to a query's result"""
+        return ResultCursor(self, sql_query, page_size)
+    
+    def close(self) -> None:
+        """Close every connection and delete the database file"""
+        with self._lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+        with self._write_lock:
+            self._writer.close()
+        self._local = threading.local()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.unlink(self.db_path + suffix)
+        logger.info("Closed resident database")
+
+
+class ResultCursor:
+    """
+    Pages and streams a query result from an SQLEngine without materializing it.
+    
+    Pages are fetched on demand with LIMIT/OFFSET; exports stream the result in
+    chunks straight to disk.
+    """
+    
+    def __init__(self, engine: SQLEngine, sql_query: str, page_size: int = 1000):
+        self.engine = engine
+        self.sql = sql_query.strip().rstrip(';').strip()
+        self.page_size = page_size
+        self._count: Optional[int] = None
+        self._columns: Optional[List[str]] = None
+    
+    @property
+    def columns(self) -> List[str]:
+        if self._columns is None:
+            cursor = self.engine.connect().execute(f"SELECT * FROM ({self.sql}) LIMIT 0")
+            self._columns = [d[0] for d in cursor.description]
+            cursor.close()
+        return self._columns
+    
+    def count(self) -> int:
+        """Number of rows in the result (computed once, without fetching them)"""
+        if self._count is None:
+            self._count = self.engine.connect().execute(f"SELECT COUNT(*) FROM ({self.sql})").fetchone()[0]
+        return self._count
+    
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.count() // self.page_size))
+    
+    def page(self, index: int) -> pd.DataFrame:
+        """Rows of page index (0-based)"""
+        offset = max(0, index) * self.page_size
+        return self.engine.execute(f"SELECT * FROM ({self.sql}) LIMIT {self.page_size} OFFSET {offset}")
+    
+    def iter_chunks(self, chunk_size: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Whole result in DataFrames of at most chunk_size rows, from a single scan"""
+        import pandas as pd
+        cursor = self.engine.connect().execute(self.sql)
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        finally:
+            cursor.close()
+    
+    def to_csv(self, path: str, chunk_size: int = 50_000) -> str:
+        """Stream the result to a CSV file; returns path"""
+        import pandas as pd
+        written = False
+        for chunk in self.iter_chunks(chunk_size):
+            chunk.to_csv(path, mode='a' if written else 'w', header=not written, index=False)
+            written = True
+        if not written:
+            pd.DataFrame(columns=self.columns).to_csv(path, index=False)
+        logger.info(f"Exported query result to {path}")
+        return path
+    
+    def storage_classes(self) -> Dict[str, List[str]]:
+        """
+        SQLite storage classes found in each result column, from one scan
+        
+        Result columns carry no declared type, so this is what the values
+        across the whole result actually are, e.g. {'x': ['null', 'real']}.
+        """
+        columns = self.columns
+        if not columns:
+            return {}
+        selects = ", ".join(
+            'group_concat(DISTINCT typeof("{}"))'.format(name.replace('"', '""')) for name in columns
+        )
+        row = self.engine.connect().execute(f"SELECT {selects} FROM ({self.sql})").fetchone()
+        return {name: sorted((found or '').split(',')) if found else [] for name, found in zip(columns, row)}
+    
+    def arrow_schema(self):
+        """pyarrow schema that fits every chunk of the result (requires pyarrow)"""
+        import pyarrow as pa
+        fields = []
+        for name, classes in self.storage_classes().items():
+            classes = set(classes) - {'null'}
+            if classes == {'integer'}:
+                dtype = pa.int64()
+            elif classes and classes <= {'integer', 'real'}:
+                dtype = pa.float64()
+            elif classes == {'blob'}:
+                dtype = pa.binary()
+            elif classes:
+                dtype = pa.string()
+            else:
+                dtype = pa.null()
+            fields.append(pa.field(name, dtype))
+        return pa.schema(fields)
+    
+    def to_parquet(self, path: str, chunk_size: int = 50_000) -> str:
+        """Stream the result to a Parquet file, one row group per chunk (requires pyarrow); returns path"""
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        # Chunk dtypes vary (an all-NULL or all-integer first chunk), so fix the schema from the whole result
+        schema = self.arrow_schema()
+        strings = [field.name for field in schema if pa.types.is_string(field.type)]
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in self.iter_chunks(chunk_size):
+                for name in strings:
+                    chunk[name] = chunk[name].map(lambda v: None if pd.isna(v) else v if isinstance(v, str) else str(v))
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        logger.info(f"Exported query result to {path}")
+        return path
@@ -0,0 +1,192 @@
+"""
+Adaptive choice of SQL generation strategies.
+
+Every prompt strategy is a bandit arm. For each (dataset, question type) pair
+the policy keeps a Beta posterior over "the strategy's SQL validates and
+executes" and orders strategies by Thompson sampling, so generation can run
+the most likely winner first and only escalate to the others on failure.
+Outcomes are persisted as JSON so the policy keeps learning across sessions:
+sessions in one process share get_strategy_policy(), and saves merge this
+process's new outcomes into the file under a file lock, so outcomes recorded
+by other processes are kept. record() only counts in memory; callers save once
+per question, and the shared policy saves again at exit.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Weight of outcomes pooled over all datasets, used as a prior for a dataset seen for the first time
+POOLED_WEIGHT = 0.5
+
+_QUESTION_TYPES = [
+    ("ranking", r"\b(top|highest|lowest|most|least|best|worst|rank\w*|largest|smallest)\b"),
+    ("grouped", r"\b(by|per|each|every|breakdown|group\w*)\b"),
+    ("aggregate", r"\b(how many|count|total|sum|average|avg|mean|median|max\w*|min\w*)\b"),
+    ("filter", r"\b(where|only|with|without|greater|less|more than|fewer than|between|before|after|in \d{4})\b"),
+]
+
+
+def question_type(question: str) -> str:
+    """Coarse question class used to condition strategy choice"""
+    text = question.lower()
+    for name, pattern in _QUESTION_TYPES:
+        if re.search(pattern, text):
+            return name
+    return "lookup"
+
+
+def dataset_key(schema: Dict[str, Any]) -> str:
+    """Stable key for a dataset's shape (table name and column names)"""
+    columns = schema["columns"]
+    names = [c["name"] for c in columns] if isinstance(columns, list) else list(columns)
+    payload = json.dumps([schema["table_name"], sorted(map(str, names))])
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+class StrategyPolicy:
+    """Thompson-sampling policy over prompt strategies, per dataset and question type"""
+
+    def __init__(self, strategies: Sequence[str], path: Optional[str] = None, seed: Any = None):
+        """
+        Args:
+            strategies: Strategy names (the arms)
+            path: JSON file the outcomes are loaded from and saved to
+            seed: Seed for the sampler
+        """
+        self.strategies = list(strategies)
+        self.path = path
+        # "dataset|question type" -> strategy -> [successes, failures]
+        self.outcomes: Dict[str, Dict[str, List[float]]] = {}
+        # Outcomes recorded since the last save, merged into the file's counts on save
+        self._pending: Dict[str, Dict[str, List[float]]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def _counts(self, key: str, strategy: str) -> List[float]:
+        return self.outcomes.get(key, {}).get(strategy, [0.0, 0.0])
+
+    def order(self, dataset: str, qtype: str) -> List[str]:
+        """Strategies ordered by a posterior sample of their success rate, best first"""
+        key, pooled = f"{dataset}|{qtype}", f"*|{qtype}"
+        draws = {}
+        with self._lock:
+            for strategy in self.strategies:
+                wins, losses = self._counts(key, strategy)
+                pooled_wins, pooled_losses = self._counts(pooled, strategy)
+                # Pooled counts include this dataset's; other datasets' outcomes count at POOLED_WEIGHT
+                alpha = 1 + wins + POOLED_WEIGHT * (pooled_wins - wins)
+                beta = 1 + losses + POOLED_WEIGHT * (pooled_losses - losses)
+                draws[strategy] = self._rng.betavariate(max(alpha, 1e-3), max(beta, 1e-3))
+        return sorted(self.strategies, key=lambda s: -draws[s])
+
+    def record(self, dataset: str, qtype: str, strategy: str, success: bool) -> None:
+        """Record whether a strategy's SQL validated and executed (persisted by the next save())"""
+        delta = {key: {strategy: [1.0, 0.0] if success else [0.0, 1.0]} for key in (f"{dataset}|{qtype}", f"*|{qtype}")}
+        with self._lock:
+            _add(self.outcomes, delta)
+            if self.path:
+                _add(self._pending, delta)
+
+    def success_rate(self, dataset: str, qtype: str, strategy: str) -> float:
+        """Posterior mean success rate"""
+        with self._lock:
+            wins, losses = self._counts(f"{dataset}|{qtype}", strategy)
+        return (1 + wins) / (2 + wins + losses)
+
+    def _read(self) -> Dict[str, Dict[str, List[float]]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load strategy policy from {self.path}: {str(e)}")
+            return {}
+
+    def load(self) -> None:
+        with self._lock:
+            self.outcomes = self._read()
+            # Outcomes not saved yet stay counted
+            _add(self.outcomes, self._pending)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock between processes sharing the file (a no-op where fcntl is unavailable)"""
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """
+        Merge the outcomes recorded since the last save into the file
+
+        The file is re-read under a lock and written atomically, so outcomes
+        saved by other processes are kept and readers never see a partial file.
+        Does nothing when no outcome was recorded since the last save.
+        """
+        with self._lock:
+            if not self.path or not self._pending:
+                return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, self._file_lock():
+            merged = self._read()
+            _add(merged, self._pending)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save strategy policy to {self.path}: {str(e)}")
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                return
+            self.outcomes = merged
+            self._pending = {}
+
+
+def _add(outcomes: Dict[str, Dict[str, List[float]]], delta: Dict[str, Dict[str, List[float]]]) -> None:
+    """Add delta's success/failure counts into outcomes"""
+    for key, strategies in delta.items():
+        for strategy, (wins, losses) in strategies.items():
+            counts = outcomes.setdefault(key, {}).setdefault(strategy, [0.0, 0.0])
+            counts[0] += wins
+            counts[1] += losses
+
+
+@lru_cache(maxsize=None)
+def get_strategy_policy(strategies: Sequence[str], path: Optional[str] = None) -> StrategyPolicy:
+    """
+    The policy shared by every session of this process
+
+    Args:
+        strategies: Strategy names, as a tuple
+        path: JSON file the outcomes are persisted to
+    """
+    policy = StrategyPolicy(strategies, path=path)
+    if path:
+        # Outcomes recorded after the last per-question save are not lost on shutdown
+        atexit.register(policy.save)
+    return policy
@@ -1,18 +1,24 @@
 import streamlit as st
-import pandas as pd
 import logging
-from pathlib import Path
 import sys
 import os
-import re
-import json
-import openai
+import importlib.util
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from src.utils.helpers import clean_column_names
+from src.utils.helpers import clean_column_names, clean_sql
 from src.backend.csv_analyzer import CSVAnalyzer
+from src.backend.incremental import IncrementalDataset, dataset_id
+from src.backend.excel_reader import is_excel_file, sheet_names
+from src.backend.memory_manager import get_memory_manager
+from src.backend.llm import ROUTER
 from src.backend.schema_descriptor import SchemaDescriptor
 from src.backend.chase_sql_v2 import ChaseSQL
-from src.backend.sql_executor import SQLExecutor
+from src.backend.fast_path import answer_from_profile
+from src.backend.sql_executor import SQLEngine
+from src.backend.conversation import ConversationState
+from src.backend.speculative import SpeculativeExecutor
+from src.backend.approximate import CI_SUFFIX, ApproximateExecutor
+from src.backend.strategy_policy import get_strategy_policy
+from src.backend.prompt_context import PROMPT_METRICS, PromptContext
 from src.backend.nl_answer import generate_natural_language_answer
 from config.config import Config
 
@@ -21,35 +27,6 @@ from config.config import Config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def clean_sql(sql: str, table_name: str = None, columns: list = None) -> str:
-    # Extract SQL from markdown code block if present
-    code_block = re.search(r"```sql(.*?)```", sql, re.DOTALL | re.IGNORECASE)
-    if code_block:
-        sql = code_block.group(1).strip()
-    # Fallback: extract first SQL-like statement
-    lines = sql.splitlines()
-    sql_lines = []
-    in_sql = False
-    for line in lines:
-        if re.match(r"^\s*select|^\s*with|^\s*insert|^\s*update|^\s*delete", line, re.IGNORECASE):
-            in_sql = True
-        if in_sql:
-            sql_lines.append(line)
-            if line.strip().endswith(';'):
-                break
-    if sql_lines:
-        sql = '\n'.join(sql_lines).strip()
-    # Remove markdown and explanations
-    sql = re.sub(r'^```sql[\s\n]*', '', sql.strip(), flags=re.IGNORECASE)
-    sql = re.sub(r'^```[\s\n]*', '', sql.strip())
-    sql = re.sub(r'```$', '', sql.strip())
-    sql = re.sub(r'^sql\s+', '', sql.strip(), flags=re.IGNORECASE)
-    # Remove table or alias prefixes from column names if columns are provided
-    if columns:
-        for col in columns:
-            sql = re.sub(rf'\b\w+\.{col}\b', col, sql)
-    return sql.strip()
-
 def main():
     st.set_page_config(
         page_title="CSV Natural Language Query System",
@@ -58,7 +35,7 @@ def main():
     )
     
     st.title("📊 CSV Natural Language Query System")
-    st.markdown("Upload a CSV file and ask questions about your data in natural language!")
+    st.markdown("Upload a CSV or Excel file and ask questions about your data in natural language!")
     
     # Sidebar for configuration
     with st.sidebar:
@@ -71,26 +48,72 @@ def main():
         else:
             st.success("✅ OpenAI API key configured")
         
-        st.info(f"Model: {Config.OPENAI_MODEL}")
+        st.info(f"Models: {Config.LLM_SMALL_MODEL} (small), {Config.LLM_LARGE_MODEL} (large)")
         st.info(f"Max file size: {Config.MAX_FILE_SIZE}MB")
+        approximate_mode = st.checkbox(
+            "⚡ Approximate answers",
+            help=(
+                f"Estimate COUNT/SUM/AVG from a {Config.APPROX_SAMPLE_FRACTION:.0%} sample with 95% confidence intervals. "
+                f"Tables under {Config.APPROX_MIN_ROWS:,} rows are always queried exactly"
+                + (f"; uploads are capped at MAX_ROWS={Config.MAX_ROWS:,}, so raise it to use this."
+                   if Config.MAX_ROWS < Config.APPROX_MIN_ROWS else ".")
+            )
+        )
     
     # File upload
     uploaded_file = st.file_uploader(
-        "Upload CSV file",
-        type=['csv'],
-        help=f"Maximum file size: {Config.MAX_FILE_SIZE}MB"
+        "Upload CSV or Excel file",
+        type=['csv', 'xlsx', 'xlsm', 'xls'],
+        help=f"Maximum file size: {Config.MAX_FILE_SIZE}MB. Each sheet of a workbook is its own table."
     )
     
     if uploaded_file is not None:
         try:
-            # Load and display data
-            df = pd.read_csv(uploaded_file)
-            df = clean_column_names(df)  # Clean column names
-            # df = df.iloc[:, :5]
-            # Check file size
-            if len(df) > Config.MAX_ROWS:
-                st.warning(f"File has {len(df)} rows. Only first {Config.MAX_ROWS} rows will be processed.")
-                df = df.head(Config.MAX_ROWS)
+            # Load and display data; a re-upload that only appends rows ingests just the new ones
+            data = uploaded_file.getvalue()
+            sheet = None
+            if is_excel_file(uploaded_file.name):
+                sheets = sheet_names(data, uploaded_file.name)
+                sheet = st.selectbox("Sheet", sheets) if len(sheets) > 1 else sheets[0]
+                dataset_key = f"dataset_{dataset_id(f'{uploaded_file.name}:{sheet}', b'')}"
+            else:
+                dataset_key = f"dataset_{dataset_id(uploaded_file.name, data)}"
+            schema_key = f"enhanced_schema_{dataset_key}"
+            engine_key = f"engine_{schema_key}"
+            approx_key = f"approx_{schema_key}"
+            dataset = st.session_state.get(dataset_key)
+            if dataset is None:
+                with st.spinner("Analyzing file structure..."):
+                    dataset = IncrementalDataset(
+                        uploaded_file.name,
+                        CSVAnalyzer(max_rows=Config.MAX_ROWS),
+                        max_rows=Config.MAX_ROWS,
+                        transform=clean_column_names,
+                        sheet=sheet
+                    )
+                    dataset.load(data)
+                    st.session_state[dataset_key] = dataset
+                    st.session_state[f"{dataset_key}_upload"] = uploaded_file.file_id
+            elif st.session_state.get(f"{dataset_key}_upload") != uploaded_file.file_id:
+                with st.spinner("Checking for appended rows..."):
+                    refresh = dataset.refresh(data)
+                    st.session_state[f"{dataset_key}_upload"] = uploaded_file.file_id
+                if refresh.reloaded:
+                    # Not an append: derived state is rebuilt from the reloaded data
+                    engine = st.session_state.pop(engine_key, None)
+                    if engine is not None:
+                        engine.close()
+                    st.session_state.pop(f"conversation_{schema_key}", None)
+                    st.session_state.pop(approx_key, None)
+                elif len(refresh.appended):
+                    if engine_key in st.session_state:
+                        st.session_state[engine_key].load_table(refresh.appended, dataset.table_name, if_exists='append')
+                    if approx_key in st.session_state:
+                        st.session_state[approx_key].refresh(dataset.table_name)
+                    st.info(f"Appended {len(refresh.appended)} new rows")
+            df = dataset.df
+            if dataset.truncated:
+                st.warning(f"File has {dataset.total_rows} rows. Only first {Config.MAX_ROWS} rows will be processed.")
 
             # Display data preview
             st.subheader("📋 Data Preview")
@@ -105,32 +128,31 @@ def main():
             with col3:
                 st.metric("Size", f"{uploaded_file.size / 1024:.1f} KB")
             
-            # Generate schema
-            with st.spinner("Analyzing CSV structure..."):
-                analyzer = CSVAnalyzer(max_rows=Config.MAX_ROWS)
-                # Save uploaded file temporarily
-                temp_path = f"temp_{uploaded_file.name}"
-                df.to_csv(temp_path, index=False)
-                
-                try:
-                    schema = analyzer.analyze_csv(temp_path)
-                finally:
-                    # Clean up temp file
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-            
-            # Generate semantic descriptions (only once per file)
-            schema_key = f"enhanced_schema_{uploaded_file.name}_{uploaded_file.size}"
-            if schema_key not in st.session_state:
-                with st.spinner("Generating semantic descriptions..."):
-                    descriptor = SchemaDescriptor()
-                    enhanced_schema = descriptor.generate_descriptions(schema)
-                    st.session_state[schema_key] = enhanced_schema
+            # Generate semantic descriptions once per dataset, and after a refresh only for
+            # columns whose profile changed materially
+            if st.session_state.get(f"{schema_key}_version") != dataset.version:
+                profile = dataset.schema
+                pending = [name for name, col in profile.columns.items() if not col.description]
+                if pending:
+                    with st.spinner("Generating semantic descriptions..."):
+                        descriptor = SchemaDescriptor()
+                        described = descriptor.generate_descriptions(profile.to_dict(), columns=pending)
+                        profile.set_descriptions({
+                            name: described["columns"][name]["description"]
+                            for name in pending if "description" in described["columns"][name]
+                        })
+                enhanced_schema = profile.to_dict()
+                st.session_state[schema_key] = enhanced_schema
+                # Serialize once; reruns reuse the JSON string instead of re-walking the schema
+                st.session_state[f"{schema_key}_json"] = profile.to_json()
+                # Render the prompt schema block once; every SQL prompt starts with it
+                st.session_state[f"{schema_key}_prompt_context"] = PromptContext.from_schema(enhanced_schema)
+                st.session_state[f"{schema_key}_version"] = dataset.version
             else:
                 enhanced_schema = st.session_state[schema_key]
             # Display schema information
             with st.expander("🔍 Schema Information"):
-                st.json(enhanced_schema)
+                st.json(st.session_state[f"{schema_key}_json"], expanded=False)
             
             # Query interface
             st.subheader("💬 Ask Questions About Your Data")
@@ -168,72 +190,206 @@ def main():
                 placeholder="e.g., What is the average age by department?"
             )
             
-            if query:
-                st.subheader("🔄 Processing Query")
-                # Ensure columns is a list of dicts for ChaseSQL
-                schema_for_chase = enhanced_schema.copy()
-                if isinstance(schema_for_chase['columns'], dict):
-                    schema_for_chase['columns'] = [
-                        {'name': k, **v} for k, v in schema_for_chase['columns'].items()
-                    ]
-                # Generate SQL candidates using new ChaseSQL class
-                with st.spinner("Generating SQL queries..."):
-                    chase = ChaseSQL(schema_for_chase, query)
-                    chase.generate_candidates()
-                candidates = chase.get_all_candidates()
-                if candidates:
+            # Profile questions (row counts, missing values, ranges, ...) skip the LLM entirely
+            fast_answer = answer_from_profile(query, enhanced_schema, df, total_rows=dataset.total_rows) if query else None
+            if fast_answer is not None:
+                st.subheader("⚡ Answered from the dataset profile")
+                if fast_answer.sql:
+                    st.code(fast_answer.sql, language='sql')
+                st.dataframe(fast_answer.result, use_container_width=True)
+                st.subheader("📝 Natural Language Answer")
+                st.markdown(fast_answer.answer)
+                st.caption("The above answer is based on the table shown as the citation.")
+                st.session_state['chat_history'].append({
+                    'question': query,
+                    'sql': fast_answer.sql,
+                    'summary': f"Q: {query}\nAnswered from profile ({fast_answer.intent})"
+                })
+                st.session_state['chat_history'] = st.session_state['chat_history'][-5:]
+            elif query:
+                # Paging, export and "Run exact" rerun the script; the answer to the current
+                # question is kept per dataset and reused instead of generating it again
+                answer_key = f"answer_{schema_key}"
+                answer = st.session_state.get(answer_key)
+                if answer is not None and (answer['question'], answer['version']) != (query, dataset.version):
+                    answer = None
+                if answer is None or answer.get('pending'):
+                    st.subheader("🔄 Processing Query")
+                    # Ensure columns is a list of dicts for ChaseSQL
+                    schema_for_chase = enhanced_schema.copy()
+                    if isinstance(schema_for_chase['columns'], dict):
+                        schema_for_chase['columns'] = [
+                            {'name': k, **v} for k, v in schema_for_chase['columns'].items()
+                        ]
+                    # Keep the dataset resident so candidates can run while generation is in flight
+                    if engine_key not in st.session_state:
+                        engine = SQLEngine()
+                        engine.load_table(df, enhanced_schema['table_name'])
+                        st.session_state[engine_key] = engine
+                        # Recent results stay queryable as prev_result_N tables for follow-up questions
+                        st.session_state[f"conversation_{schema_key}"] = ConversationState(engine)
+                    conversation = st.session_state[f"conversation_{schema_key}"]
+                    columns = [col['name'] for col in schema_for_chase['columns']]
+                    prepare = lambda sql: clean_sql(sql, table_name=enhanced_schema['table_name'], columns=columns)
+                    # "Run exact" on an approximate answer reruns its SQL on the full table without regenerating it
+                    exact = answer is not None and answer.get('exact', False)
+                    if approximate_mode and not exact:
+                        if approx_key not in st.session_state:
+                            with st.spinner("Building samples..."):
+                                approx = ApproximateExecutor(
+                                    st.session_state[engine_key],
+                                    fraction=Config.APPROX_SAMPLE_FRACTION,
+                                    min_table_rows=Config.APPROX_MIN_ROWS
+                                )
+                                approx.build(enhanced_schema['table_name'], strata=[
+                                    name for name, col in enhanced_schema['columns'].items() if col.get('is_categorical')
+                                ])
+                                st.session_state[approx_key] = approx
+                        # Candidates run on the samples when their aggregates can be estimated
+                        exact_prepare = prepare
+                        prepare = lambda sql: st.session_state[approx_key].prepare(exact_prepare(sql))
+                    speculative = SpeculativeExecutor(
+                        st.session_state[engine_key],
+                        prepare=prepare,
+                        max_rows=Config.RESULT_PAGE_SIZE
+                    )
+                    answer = {
+                        'question': query, 'version': dataset.version, 'exact': exact,
+                        'candidates': answer['candidates'] if exact else [], 'best_sql': answer['best_sql'] if exact else None
+                    }
+                    if not exact:
+                        # Generate SQL candidates using new ChaseSQL class, executing each as it arrives
+                        with st.spinner("Generating SQL queries..."):
+                            chase = ChaseSQL(
+                                schema_for_chase, query, prior_results=conversation.recent(),
+                                context=st.session_state[f"{schema_key}_prompt_context"]
+                            )
+                            if Config.ADAPTIVE_STRATEGIES:
+                                # Run the strategy most likely to win first; escalate only if its SQL fails
+                                policy = get_strategy_policy(tuple(ChaseSQL.STRATEGIES), Config.STRATEGY_POLICY_PATH)
+                                chase.generate_adaptive(
+                                    policy,
+                                    validate=speculative.succeeded,
+                                    on_candidate=lambda c: speculative.submit(c['sql'])
+                                )
+                                # Answers are cached per question, so this question's outcomes are saved once
+                                policy.save()
+                            else:
+                                chase.generate_candidates(on_candidate=lambda c: speculative.submit(c['sql']))
+                        answer['candidates'] = chase.get_all_candidates()
+                        if answer['candidates']:
+                            # Select best candidate
+                            if not Config.ADAPTIVE_STRATEGIES:
+                                chase.rank_candidates(speculative=speculative)
+                            answer['best_sql'] = chase.get_best_sql()
+                    best_sql = answer['best_sql']
+                    try:
+                        if best_sql:
+                            with st.spinner("Executing query..."):
+                                # Remove table/alias prefixes from column names
+                                cleaned_sql = clean_sql(best_sql, table_name=enhanced_schema['table_name'], columns=columns)
+                                logger.info(f"Executing cleaned SQL: {cleaned_sql}")
+                                executed_sql = speculative.prepare(best_sql)
+                                if exact:
+                                    result = st.session_state[engine_key].execute(cleaned_sql, max_rows=Config.RESULT_PAGE_SIZE)
+                                else:
+                                    # Usually already materialized by the speculative run
+                                    result = speculative.result(best_sql)
+                                speculative.cancel_others(best_sql)
+                            # Only the first page was fetched; other pages and exports stream from the engine
+                            page_size = Config.RESULT_PAGE_SIZE
+                            cursor = st.session_state[engine_key].cursor(executed_sql, page_size=page_size)
+                            complete = len(result) < page_size
+                            answer.update(
+                                cleaned_sql=cleaned_sql, executed_sql=executed_sql,
+                                approximate=executed_sql != cleaned_sql, result=result, cursor=cursor,
+                                total_rows=len(result) if complete else cursor.count(), nl_answer=None
+                            )
+                            if len(result) > 0:
+                                # Generate natural language answer
+                                with st.spinner("Generating natural language answer..."):
+                                    answer['nl_answer'] = generate_natural_language_answer(query, executed_sql, result)
+                                # Estimates are not kept as prior results; follow-ups would treat them as exact
+                                if complete and not answer['approximate']:
+                                    conversation.add(query, executed_sql, result)
+                            # Add to chat history (with summary)
+                            summary = f"Q: {query}\nSQL: {best_sql}\nRows: {answer['total_rows']}"
+                            st.session_state['chat_history'].append({
+                                'question': query,
+                                'sql': best_sql,
+                                'summary': summary
+                            })
+                            # Keep only last 5
+                            st.session_state['chat_history'] = st.session_state['chat_history'][-5:]
+                    except Exception as e:
+                        answer['error'] = str(e)
+                    finally:
+                        speculative.shutdown()
+                    st.session_state[answer_key] = answer
+                
+                if answer['candidates']:
                     # Display candidates
                     with st.expander("🎯 SQL Candidates"):
-                        for i, candidate in enumerate(candidates, 1):
+                        for i, candidate in enumerate(answer['candidates'], 1):
                             st.markdown(f"**{candidate['source'].replace('_', ' ').title()} Candidate {i}:**")
                             st.code(candidate['sql'], language='sql')
-                    # Select best candidate
-                    chase.rank_candidates(db_executor=SQLExecutor(), sample_df=df)
-                    best_sql = chase.get_best_sql()
+                best_sql = answer['best_sql']
+                if best_sql:
                     st.subheader("✅ Selected SQL Query")
                     st.code(best_sql, language='sql')
-                    # Execute query
-                    try:
-                        with st.spinner("Executing query..."):
-                            executor = SQLExecutor()
-                            # Remove table/alias prefixes from column names
-                            columns = [col['name'] for col in schema_for_chase['columns']]
-                            cleaned_sql = clean_sql(best_sql, table_name=enhanced_schema['table_name'], columns=columns)
-                            print(f"Executing cleaned SQL: {cleaned_sql}")
-                            # Execute the SQL query
-                            result = executor.execute_query(df, cleaned_sql, enhanced_schema['table_name'])
-                            print(f"Result DataFrame: {result.to_markdown()}")
+                    if 'error' in answer:
+                        st.error(f"Error executing query: {answer['error']}")
+                        st.code(best_sql, language='sql')
+                    else:
                         st.subheader("📊 Query Results")
+                        result, cursor, executed_sql = answer['result'], answer['cursor'], answer['executed_sql']
                         if len(result) > 0:
-                            st.dataframe(result, use_container_width=True)
-                            # Download results
-                            csv_result = result.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Download Results",
-                                data=csv_result,
-                                file_name=f"query_results_{uploaded_file.name}",
-                                mime="text/csv"
-                            )
-                            # Generate and display natural language answer
-                            with st.spinner("Generating natural language answer..."):
-                                nl_answer = generate_natural_language_answer(query, cleaned_sql, result)
+                            page = 0
+                            if answer['total_rows'] > len(result):
+                                page = st.number_input(
+                                    f"Page (of {cursor.page_count})", min_value=1, max_value=cursor.page_count,
+                                    value=1, key=f"page_{executed_sql}"
+                                ) - 1
+                            st.dataframe(result if page == 0 else cursor.page(page), use_container_width=True)
+                            st.caption(f"{answer['total_rows']:,} rows")
+                            if answer['approximate']:
+                                st.caption(
+                                    f"≈ Estimated from a sample; `{CI_SUFFIX}` columns give the 95% confidence "
+                                    "half-width of the estimate next to them."
+                                )
+                                if st.button("🎯 Run exact", key=f"exact_button_{answer['cleaned_sql']}"):
+                                    st.session_state[answer_key] = {**answer, 'exact': True, 'pending': True}
+                                    st.rerun()
+                            # Download results, written to disk chunk by chunk
+                            formats = ["CSV"] + (["Parquet"] if importlib.util.find_spec("pyarrow") else [])
+                            export_format = st.radio("Export format", formats, horizontal=True, key=f"format_{executed_sql}")
+                            export_key = f"export_{export_format}_{executed_sql}"
+                            if st.button("Prepare download", key=f"prepare_{export_key}"):
+                                with st.spinner("Exporting results..."):
+                                    # One export per session; it is deleted when replaced or when the session ends
+                                    previous = st.session_state.pop('export', None)
+                                    if previous is not None:
+                                        previous[1].remove()
+                                    export = get_memory_manager().export_file('.csv' if export_format == "CSV" else '.parquet')
+                                    if export_format == "CSV":
+                                        cursor.to_csv(export.path)
+                                    else:
+                                        cursor.to_parquet(export.path)
+                                    st.session_state['export'] = (export_key, export)
+                            if st.session_state.get('export', (None,))[0] == export_key:
+                                path = st.session_state['export'][1].path
+                                with open(path, 'rb') as export_file:
+                                    st.download_button(
+                                        label="📥 Download Results",
+                                        data=export_file,
+                                        file_name=f"query_results_{os.path.splitext(uploaded_file.name)[0]}{os.path.splitext(path)[1]}",
+                                        mime="text/csv" if path.endswith('.csv') else "application/octet-stream"
+                                    )
                             st.subheader("📝 Natural Language Answer")
-                            st.markdown(nl_answer)
+                            st.markdown(answer['nl_answer'])
                             st.caption("The above answer is based on the query results shown as the citation.")
                         else:
                             st.info("Query returned no results.")
-                        # Add to chat history (with summary)
-                        summary = f"Q: {query}\nSQL: {best_sql}\nRows: {len(result) if result is not None else 0}"
-                        st.session_state['chat_history'].append({
-                            'question': query,
-                            'sql': best_sql,
-                            'summary': summary
-                        })
-                        # Keep only last 5
-                        st.session_state['chat_history'] = st.session_state['chat_history'][-5:]
-                    except Exception as e:
-                        st.error(f"Error executing query: {str(e)}")
-                        st.code(best_sql, language='sql')
                 else:
                     st.error("Could not generate SQL queries. Please try rephrasing your question.")
             # Display chat history (last 5)
@@ -241,6 +397,47 @@ def main():
                 st.sidebar.markdown("### 🧠 Conversation Memory (Last 5)")
                 for i, chat in enumerate(reversed(st.session_state['chat_history']), 1):
                     st.sidebar.markdown(f"**{i}.** {chat['summary']}")
+            if PROMPT_METRICS.prompts:
+                st.sidebar.markdown("### 🧾 Prompt Tokens")
+                st.sidebar.caption(
+                    f"{PROMPT_METRICS.prompt_tokens:,} prompt tokens over {PROMPT_METRICS.prompts} prompts; "
+                    f"{PROMPT_METRICS.prefix_share:.0%} is the cacheable schema prefix "
+                    f"({PROMPT_METRICS.cached_tokens:,} tokens served from the provider cache)"
+                )
+            conversation = st.session_state.get(f"conversation_{schema_key}")
+            if conversation is not None and conversation.results:
+                st.sidebar.markdown(f"### 🗂️ Queryable Prior Results ({conversation.total_bytes / 1024:.1f} KB)")
+                for prior in conversation.recent():
+                    st.sidebar.markdown(f"`{prior.table_name}` ({prior.row_count} rows): {prior.question}")
+            llm_stages = ROUTER.stats()
+            if llm_stages:
+                st.sidebar.markdown("### 🚦 LLM Calls by Stage")
+                st.sidebar.dataframe(
+                    [
+                        {
+                            "stage": stage,
+                            "calls": stats["calls"],
+                            "fallbacks": stats["fallbacks"],
+                            "p90 s": round(stats["p90_latency"], 2),
+                            "cost $": round(stats["cost_usd"], 4),
+                            "models": ", ".join(stats["models"]),
+                        }
+                        for stage, stats in llm_stages.items()
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+            memory = get_memory_manager().usage()
+            st.sidebar.markdown("### 💾 Memory (all sessions)")
+            st.sidebar.progress(
+                min(1.0, memory['resident_bytes'] / max(memory['budget_bytes'], 1)),
+                text=f"{memory['resident_bytes'] / 2**20:.1f} of {memory['budget_bytes'] / 2**20:.0f} MB in memory"
+            )
+            if memory['spilled_bytes']:
+                st.sidebar.caption(
+                    f"{memory['spilled_bytes'] / 2**20:.1f} MB spilled to disk; "
+                    f"{memory['spills']} spills, {memory['reloads']} reloads"
+                )
         
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
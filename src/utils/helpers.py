@@ -1,5 +1,8 @@
-import pandas as pd
+from __future__ import annotations
 import re
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import pandas as pd
 def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     patterns = [
         r'^\d',           # starts with number
@@ -17,4 +20,33 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
             new_col = 'col_' + new_col
         return new_col
     df = df.rename(columns={col: clean(col) for col in df.columns})
-    return df
\ No newline at end of file
+    return df
+
+def clean_sql(sql: str, table_name: str = None, columns: list = None) -> str:
+    # Extract SQL from markdown code block if present
+    code_block = re.search(r"```sql(.*?)```", sql, re.DOTALL | re.IGNORECASE)
+    if code_block:
+        sql = code_block.group(1).strip()
+    # Fallback: extract first SQL-like statement
+    lines = sql.splitlines()
+    sql_lines = []
+    in_sql = False
+    for line in lines:
+        if re.match(r"^\s*select|^\s*with|^\s*insert|^\s*update|^\s*delete", line, re.IGNORECASE):
+            in_sql = True
+        if in_sql:
+            sql_lines.append(line)
+            if line.strip().endswith(';'):
+                break
+    if sql_lines:
+        sql = '\n'.join(sql_lines).strip()
+    # Remove markdown and explanations
+    sql = re.sub(r'^```sql[\s\n]*', '', sql.strip(), flags=re.IGNORECASE)
+    sql = re.sub(r'^```[\s\n]*', '', sql.strip())
+    sql = re.sub(r'```$', '', sql.strip())
+    sql = re.sub(r'^sql\s+', '', sql.strip(), flags=re.IGNORECASE)
+    # Remove table or alias prefixes from column names if columns are provided
+    if columns:
+        for col in columns:
+            sql = re.sub(rf'\b\w+\.{col}\b', col, sql)
+    return sql.strip()
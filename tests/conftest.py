@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.backend import chase_sql_v2
+from src.backend.sql_executor import SQLEngine
+
+
+def _engines():
+    engines = []
+
+    def make(**tables):
+        # Every engine has its own database file, so tables never leak between engines
+        engine = SQLEngine()
+        engines.append(engine)
+        for name, df in tables.items():
+            engine.load_table(df, name)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.close()
+
+
+@pytest.fixture
+def make_engine():
+    """Factory for SQLEngines with the given tables loaded; every engine is closed after the test"""
+    yield from _engines()
+
+
+@pytest.fixture(scope="module")
+def make_module_engine():
+    """make_engine for module-scoped fixtures; engines are closed after the module"""
+    yield from _engines()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Replace the LLM behind ChaseSQL with a stub; returns the list of prompts it received
+
+    fake_llm(["SELECT 1", ...]) answers the n-th call with the n-th SQL,
+    fake_llm("SELECT ...") answers every call the same and fake_llm() answers
+    "SELECT n" for the n-th call.
+    """
+    def install(responses=None):
+        prompts = []
+
+        def generate(prompt, pydantic_model, stage=None):
+            prompts.append(prompt)
+            if responses is None:
+                sql = f"SELECT {len(prompts)}"
+            elif isinstance(responses, str):
+                sql = responses
+            else:
+                sql = responses[len(prompts) - 1]
+            return json.dumps({"sql": sql, "explanation": None})
+
+        monkeypatch.setattr(chase_sql_v2, "llm_generate_content", generate)
+        return prompts
+
+    return install
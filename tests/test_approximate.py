@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backend.approximate import ApproximateExecutor, parse_clauses
+
+
+@pytest.fixture(scope="module")
+def approx(make_module_engine):
+    rng = np.random.default_rng(0)
+    rows = 50_000
+    df = pd.DataFrame({
+        "region": rng.choice(["north", "south", "east", "tiny"], rows, p=[0.5, 0.3, 0.199, 0.001]),
+        "amount": rng.exponential(10.0, rows),
+        "year": rng.integers(2020, 2025, rows),
+    })
+    approx = ApproximateExecutor(make_module_engine(sales=df), fraction=0.05, min_rows_per_stratum=50, min_table_rows=0)
+    approx.build("sales", strata=["region", "amount"])
+    return approx
+
+
+def test_aggregates_are_estimated_within_their_confidence_intervals(approx):
+    sql = "SELECT COUNT(*) AS n, SUM(amount) AS total, AVG(amount) AS mean FROM sales WHERE year >= 2022"
+    rewritten, sample_table = approx.rewrite(sql)
+    result, exact = approx.engine.execute(rewritten), approx.engine.execute(sql)
+    assert sample_table == "sales__sample"
+    for column in ["n", "total", "mean"]:
+        estimate, half_width = result[column][0], result[f"{column}_ci95"][0]
+        assert half_width > 0
+        # 4 half-widths is ~8 standard errors
+        assert abs(estimate - exact[column][0]) < 4 * half_width
+
+
+def test_grouping_by_a_stratum_column_uses_the_stratified_sample(approx):
+    sql = "SELECT region, COUNT(*), AVG(amount) AS mean FROM sales GROUP BY region ORDER BY COUNT(*) DESC"
+    rewritten, sample_table = approx.rewrite(sql)
+    result, exact = approx.engine.execute(rewritten), approx.engine.execute(sql)
+    assert sample_table == "sales__sample_by_region"
+    assert "ORDER BY \"COUNT(*)\" DESC" in rewritten
+    # Stratum sizes are known, so the counts are exact and every region (even a tiny one) is present
+    assert result["region"].tolist() == exact["region"].tolist()
+    assert result["COUNT(*)"].tolist() == pytest.approx(exact["COUNT(*)"].tolist())
+    assert (result["COUNT(*)_ci95"].abs() < 1e-6).all()
+    # The tiny region is sampled completely, so its mean is exact with a zero-width interval
+    assert (abs(result["mean"] - exact["mean"]) <= 4 * result["mean_ci95"] + 1e-9).all()
+
+
+@pytest.mark.parametrize("sql, reason", [
+    ("SELECT MAX(amount) FROM sales", "Unsupported aggregate"),
+    ("SELECT COUNT(DISTINCT region) FROM sales", "DISTINCT"),
+    ("SELECT region, COUNT(*) FROM sales GROUP BY region HAVING COUNT(*) > 10", "HAVING"),
+    ("SELECT * FROM sales", "no COUNT/SUM/AVG"),
+    ("SELECT SUM(amount) + SUM(year) FROM sales", "Unsupported aggregate"),
+    ("SELECT COUNT(*) FROM sales s", "no samples"),
+])
+def test_unsupported_queries_run_exactly(approx, sql, reason):
+    rewritten, detail = approx.rewrite(sql)
+    assert rewritten is None and reason in detail
+    assert approx.prepare(sql) == sql
+
+
+def test_small_tables_are_queried_exactly(approx):
+    approx.min_table_rows = 10 ** 9
+    try:
+        assert approx.prepare("SELECT COUNT(*) FROM sales") == "SELECT COUNT(*) FROM sales"
+    finally:
+        approx.min_table_rows = 0
+
+
+def test_clause_parser_ignores_keywords_in_literals_and_subexpressions():
+    clauses = parse_clauses("SELECT COUNT(*) FROM sales WHERE note = 'group by, from' AND (year IN (SELECT 1));")
+    assert clauses["FROM"] == "sales"
+    assert clauses["WHERE"] == "note = 'group by, from' AND (year IN (SELECT 1))"
+    assert parse_clauses("WITH x AS (SELECT 1) SELECT * FROM x") is None
@@ -0,0 +1,34 @@
+import hashlib
+
+from benchmarks.run_benchmarks import compare
+from benchmarks.synthetic_data import DatasetSpec, column_types, generate_csv
+
+
+def _digest(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_generate_csv_is_deterministic(tmp_path):
+    spec = DatasetSpec(rows=500, columns=12, cardinality=7, seed=3)
+    first = generate_csv(spec, tmp_path / "a.csv")
+    second = generate_csv(spec, tmp_path / "b.csv")
+    assert _digest(first) == _digest(second)
+
+    lines = first.read_text().splitlines()
+    assert len(lines) == 501
+    assert len(lines[0].split(",")) == 12
+
+
+def test_column_types_follow_dtype_mix():
+    spec = DatasetSpec(rows=1, columns=10, dtype_mix={"int": 0.5, "category": 0.5})
+    types = column_types(spec)
+    assert len(types) == 10
+    assert types.count("int") == 5 and types.count("category") == 5
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "c": {"median_s": 1.0}}
+    results = {"a": {"median_s": 1.1}, "b": {"median_s": 1.5}, "c": {"median_s": 0.5}, "new": {"median_s": 9.0}}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("b:")
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from src.backend.chase_sql_v2 import ChaseSQL
+from src.backend.speculative import SpeculativeExecutor
+
+SCHEMA = {
+    "table_name": "sales",
+    "columns": [
+        {"name": "region", "data_type": "str", "description": "Sales region"},
+        {"name": "amount", "data_type": "float64", "description": "Order value"},
+    ],
+}
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine(sales=pd.DataFrame({"region": ["n", "s", "n"], "amount": [1.0, 2.0, 3.0]}))
+
+
+def test_candidates_are_streamed_to_callback(fake_llm):
+    fake_llm(["SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4"])
+    seen = []
+    chase = ChaseSQL(SCHEMA, "How many?")
+    chase.generate_candidates(on_candidate=seen.append)
+    assert [c["sql"] for c in seen] == ["SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4"]
+    assert seen == chase.get_all_candidates()
+
+
+def test_rank_prefers_first_candidate_that_executes(fake_llm, engine):
+    fake_llm([
+        "SELECT missing_column FROM sales",
+        "SELECT SUM(amount) AS total FROM sales",
+        "SELECT COUNT(*) FROM sales",
+        "SELECT 1",
+    ])
+    speculative = SpeculativeExecutor(engine)
+    chase = ChaseSQL(SCHEMA, "Total amount?")
+    chase.generate_candidates(on_candidate=lambda c: speculative.submit(c["sql"]))
+    chase.rank_candidates(speculative=speculative)
+
+    assert chase.get_best_sql() == "SELECT SUM(amount) AS total FROM sales"
+    assert speculative.result(chase.get_best_sql())["total"].iloc[0] == 6.0
+    speculative.shutdown()
+
+
+def test_llm_rerank_returns_sql_not_json(fake_llm):
+    calls = fake_llm(["SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4", "SELECT 2"])
+    chase = ChaseSQL(SCHEMA, "Pick one")
+    chase.generate_candidates()
+    chase.rank_candidates(rerank_with_llm=True)
+    assert chase.get_best_sql() == "SELECT 2"
+    assert "Sales region" in calls[-1]
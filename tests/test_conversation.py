@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from src.backend.chase_sql_v2 import ChaseSQL
+from src.backend.conversation import ConversationState
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine(sales=pd.DataFrame({
+        "year": [2022, 2023, 2023, 2024],
+        "region": ["n", "s", "n", "s"],
+        "amount": [1.0, 2.0, 3.0, 4.0],
+    }))
+
+
+def test_follow_up_queries_the_prior_result(engine):
+    conversation = ConversationState(engine)
+    by_year = engine.execute("SELECT year, SUM(amount) AS total FROM sales GROUP BY year")
+    prior = conversation.add("Total by year?", "SELECT ...", by_year)
+
+    assert prior.table_name == "prev_result_1" and prior.row_count == 3
+    follow_up = engine.execute(f"SELECT total FROM {prior.table_name} WHERE year = 2023")
+    assert follow_up["total"].tolist() == [5.0]
+
+
+def test_rerun_of_the_same_answer_is_not_registered_twice(engine):
+    conversation = ConversationState(engine)
+    result = engine.execute("SELECT * FROM sales")
+    first = conversation.add("All rows", "SELECT * FROM sales", result)
+    assert conversation.add("All rows", "SELECT * FROM sales", result) is first
+    assert len(conversation.results) == 1
+
+
+def test_eviction_by_count_and_size_drops_tables(engine):
+    conversation = ConversationState(engine, max_results=2)
+    for i in range(3):
+        conversation.add(f"q{i}", f"SELECT {i}", engine.execute(f"SELECT {i} AS value"))
+    assert [p.table_name for p in conversation.recent()] == ["prev_result_3", "prev_result_2"]
+    assert "prev_result_1" not in engine.tables
+    with pytest.raises(Exception):
+        engine.execute("SELECT * FROM prev_result_1")
+
+    one_result = conversation.results[-1].nbytes
+    small = ConversationState(engine, max_bytes=one_result)
+    small.add("a", "SELECT 1", engine.execute("SELECT 1 AS value"))
+    small.add("b", "SELECT 2", engine.execute("SELECT 2 AS value"))
+    assert [p.question for p in small.recent()] == ["b"]
+    assert small.add("big", "SELECT *", engine.execute("SELECT * FROM sales")) is None
+
+
+def test_prior_results_are_offered_in_the_schema_text(engine):
+    conversation = ConversationState(engine)
+    conversation.add("Total by year?", "SELECT ...", engine.execute("SELECT year, SUM(amount) AS total FROM sales GROUP BY year"))
+    schema = {"table_name": "sales", "columns": [{"name": "year"}, {"name": "amount"}]}
+    text = ChaseSQL(schema, "now only for 2023", prior_results=conversation.recent()).serialize_schema()
+    assert "Table: prev_result_1 (3 rows)" in text
+    assert "Total by year?" in text and "- total" in text
+
+
+def test_engines_do_not_share_tables(make_engine):
+    first = make_engine(sales=pd.DataFrame({"amount": [1.0]}))
+    second = make_engine(sales=pd.DataFrame({"amount": [2.0, 3.0]}))
+    first.load_table(pd.DataFrame({"x": [1]}), "prev_result_1")
+    assert first.execute("SELECT COUNT(*) AS n FROM sales")["n"].iloc[0] == 1
+    with pytest.raises(Exception):
+        second.execute("SELECT * FROM prev_result_1")
@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backend.csv_analyzer import CSVAnalyzer
+from src.backend.schema_model import ColumnProfile, TableSchema
+
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    path = tmp_path / "Sales Data.csv"
+    pd.DataFrame({
+        "region": ["north", "south", "north", None, "east", "north"],
+        "amount": [10.5, 20.0, None, 7.25, 3.0, 1.0],
+        "units": [1, 2, 3, 4, 5, 6],
+        "active": [True, False, True, True, False, True],
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_analyze_csv_returns_native_types(sample_csv):
+    schema = CSVAnalyzer().analyze_csv(str(sample_csv))
+
+    assert schema["table_name"] == "sales_data"
+    assert schema["row_count"] == 6
+    units = schema["columns"]["units"]
+    assert units["min_value"] == 1 and type(units["min_value"]) is int
+    assert type(units["unique_values"]) is int
+    assert type(schema["columns"]["region"]["null_count"]) is int
+    assert schema["columns"]["amount"]["is_numeric"] is True
+    # NaN in sample rows becomes null so the schema is strict JSON
+    json.dumps(schema, allow_nan=False)
+
+
+def test_schema_json_matches_plain_dict(sample_csv):
+    profile = CSVAnalyzer().profile_csv(str(sample_csv))
+    assert json.loads(profile.to_json()) == json.loads(json.dumps(profile.to_dict()))
+
+
+def test_json_is_stable_and_tracks_descriptions(sample_csv):
+    first = CSVAnalyzer().profile_csv(str(sample_csv))
+    second = CSVAnalyzer().profile_csv(str(sample_csv))
+    assert first.to_json() == second.to_json()
+
+    second.set_descriptions({"units": "Number of units sold"})
+    assert first.column_json("units") != second.column_json("units")
+    assert first.column_json("amount") == second.column_json("amount")
+    assert json.loads(second.to_json())["columns"]["units"]["description"] == "Number of units sold"
+
+
+def test_table_schema_round_trip_from_list_columns():
+    schema = TableSchema(
+        file_name="t.csv",
+        table_name="t",
+        row_count=1,
+        columns={"a": ColumnProfile("int64", 1, [1], 0, True, True, 1, 1, 1.0)},
+    )
+    as_list = schema.to_dict()
+    as_list["columns"] = [{"name": k, **v} for k, v in as_list["columns"].items()]
+    assert TableSchema.from_dict(as_list).to_json() == schema.to_json()
+
+
+def test_save_schema_writes_json(sample_csv, tmp_path):
+    analyzer = CSVAnalyzer()
+    output = tmp_path / "schema.json"
+    analyzer.save_schema(analyzer.analyze_csv(str(sample_csv)), str(output))
+    assert json.loads(output.read_text())["table_name"] == "sales_data"
+
+
+def test_streaming_profile_is_not_biased_by_sort_order(tmp_path):
+    # A sorted export: the first chunks only ever see one status value
+    n = 30_000
+    df = pd.DataFrame({
+        "status": ["active"] * (n - 300) + ["closed"] * 200 + ["pending"] * 100,
+        "amount": np.arange(n, dtype=float),
+    })
+    path = tmp_path / "sorted.csv"
+    df.to_csv(path, index=False)
+
+    schema = CSVAnalyzer(chunk_size=1_000).analyze_csv(str(path))
+    status, amount = schema["columns"]["status"], schema["columns"]["amount"]
+
+    assert schema["row_count"] == n
+    assert status["unique_values"] == 3
+    assert set(status["sample_values"]) == {"active", "closed", "pending"}
+    assert status["is_categorical"] is True
+    assert amount["min_value"] == 0 and amount["max_value"] == n - 1
+    assert abs(amount["quantiles"]["p50"] - n / 2) < n * 0.02
+
+
+def test_max_rows_caps_rows_read(sample_csv):
+    assert CSVAnalyzer(max_rows=2).analyze_csv(str(sample_csv))["row_count"] == 2
+
+
+def test_profile_dataframe_matches_profile_csv(sample_csv):
+    analyzer = CSVAnalyzer(chunk_size=2)
+    from_file = analyzer.profile_csv(str(sample_csv))
+    from_frame = analyzer.profile_dataframe(pd.read_csv(sample_csv), "Sales Data.csv")
+    assert from_frame.to_json() == from_file.to_json()
@@ -0,0 +1,105 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from benchmarks.synthetic_data import DatasetSpec, generate_xlsx
+from src.backend.csv_analyzer import CSVAnalyzer
+from src.backend.excel_reader import is_excel_file, iter_sheet_chunks, sheet_names, sheet_table_name
+from src.backend.incremental import IncrementalDataset
+from src.backend.memory_manager import MemoryManager
+from src.backend.sql_executor import SQLEngine
+from src.utils.helpers import clean_column_names
+
+
+def _workbook(sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        worksheet = workbook.create_sheet(name)
+        for row in rows:
+            worksheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+SALES = [["Region Name", "amount", "units"]] + [["north" if i % 2 else "south", float(i), i] for i in range(25)]
+STORES = [[None], ["store", None, "store"], ["a", 1, "x"], [None, None, None], ["b", 2, "y"]]
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return MemoryManager(budget_bytes=2**30, spill_dir=str(tmp_path))
+
+
+def test_sheet_names_and_table_names():
+    data = _workbook({"Sales": SALES, "Store list": STORES})
+    assert sheet_names(data, "report.xlsx") == ["Sales", "Store list"]
+    assert sheet_table_name("Q1 report.xlsx", "Store list") == "q1_report_store_list"
+    assert is_excel_file("a.XLSX") and is_excel_file("b.xls") and not is_excel_file("c.csv")
+
+
+def test_sheet_is_streamed_in_chunks():
+    data = _workbook({"Sales": SALES})
+    chunks = list(iter_sheet_chunks(data, "report.xlsx", "Sales", chunk_size=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    df = pd.concat(chunks, ignore_index=True)
+    assert list(df.columns) == ["Region Name", "amount", "units"]
+    assert df["units"].tolist() == list(range(25))
+    assert pd.api.types.is_numeric_dtype(df["amount"])
+
+
+def test_header_row_and_blank_rows():
+    data = _workbook({"Stores": STORES})
+    df = pd.concat(iter_sheet_chunks(data, "report.xlsx", "Stores"))
+    # Leading and embedded empty rows are skipped; blank and repeated names are made unique
+    assert list(df.columns) == ["store", "column_2", "store_1"]
+    assert df["store"].tolist() == ["a", "b"]
+
+    header_only = list(iter_sheet_chunks(_workbook({"Empty": [["a", "b"]]}), "e.xlsx", "Empty"))
+    assert len(header_only) == 1 and header_only[0].empty
+    assert list(header_only[0].columns) == ["a", "b"]
+
+
+def test_each_sheet_becomes_a_table(memory):
+    data = _workbook({"Sales": SALES, "Store list": STORES})
+    engine = SQLEngine()
+    try:
+        for sheet in sheet_names(data, "report.xlsx"):
+            dataset = IncrementalDataset(
+                "report.xlsx", CSVAnalyzer(chunk_size=10), transform=clean_column_names, memory=memory, sheet=sheet
+            )
+            dataset.load(data)
+            engine.load_table(dataset.df, dataset.table_name)
+
+        assert engine.execute("SELECT SUM(units) AS total FROM report_sales")["total"].iloc[0] == sum(range(25))
+        assert engine.execute("SELECT COUNT(*) AS n FROM report_store_list")["n"].iloc[0] == 2
+    finally:
+        engine.close()
+
+
+def test_dataset_caps_rows_and_reloads_on_refresh(memory):
+    data = _workbook({"Sales": SALES})
+    dataset = IncrementalDataset("report.xlsx", CSVAnalyzer(chunk_size=10), max_rows=12, memory=memory, sheet="Sales")
+    schema = dataset.load(data)
+
+    assert len(dataset.df) == 12 and dataset.total_rows == 25 and dataset.truncated
+    assert schema.row_count == 12
+    assert schema.columns["amount"].is_numeric
+
+    refresh = dataset.refresh(_workbook({"Sales": SALES + [["east", 99.0, 99]]}))
+    assert refresh.reloaded
+    assert dataset.total_rows == 26 and dataset.version == 2
+
+
+def test_generated_workbook_matches_spec(tmp_path):
+    spec = DatasetSpec(rows=300, columns=6, cardinality=5, seed=1)
+    path = generate_xlsx(spec, tmp_path / "bench.xlsx", sheets=2)
+    data = path.read_bytes()
+
+    assert sheet_names(data, path.name) == ["data_1", "data_2"]
+    df = pd.concat(iter_sheet_chunks(data, path.name, "data_2", chunk_size=128))
+    assert df.shape == (300, 6)
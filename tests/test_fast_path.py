@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from src.backend.csv_analyzer import CSVAnalyzer
+from src.backend.fast_path import answer_from_profile
+
+
+@pytest.fixture
+def dataset():
+    df = pd.DataFrame({
+        "Status": ["open", "closed", "open", None, "pending", "open"],
+        "Amount": [10.5, 20.0, None, 7.25, 3.0, 1.0],
+        "units": [1, 2, 3, 4, 5, 6],
+    })
+    schema = CSVAnalyzer().profile_dataframe(df, "orders.csv").to_dict()
+    return schema, df
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("How many rows are there in total?", "row_count"),
+    ("Are there any missing values in the dataset?", "missing_values"),
+    ("Which columns are numeric and what are their averages?", "numeric_averages"),
+    ("What are the different values in the 'Status' column?", "distinct_values"),
+    ("What’s the range of values in the 'Amount' column?", "value_range"),
+    ("Can you show me some sample rows?", "sample_rows"),
+    ("Can you summarize the columns for me?", "summary"),
+    ("What’s the most frequent value in each column?", "most_frequent"),
+])
+def test_example_questions_take_the_fast_path(dataset, question, intent):
+    schema, df = dataset
+    answer = answer_from_profile(question, schema, df)
+    assert answer is not None and answer.intent == intent
+    assert len(answer.result) > 0
+
+
+def test_row_count_reports_rows_past_the_cap(dataset):
+    schema, df = dataset
+    answer = answer_from_profile("How many rows are there in total?", schema, df.head(4), total_rows=6)
+    assert answer.result["row_count"][0] == 6 and answer.result["loaded_rows"][0] == 4
+    assert "first **4**" in answer.answer and answer.sql is None
+
+
+def test_answers_match_the_data(dataset):
+    schema, df = dataset
+    assert answer_from_profile("how many rows are there", schema, df).result["row_count"][0] == 6
+
+    missing = answer_from_profile("Are there any missing values?", schema, df).result.set_index("column")
+    assert missing.loc["Status", "missing_values"] == 1 and missing.loc["units", "missing_values"] == 0
+
+    averages = answer_from_profile("Which columns are numeric?", schema, df).result.set_index("column")
+    assert set(averages.index) == {"Amount", "units"}
+    assert averages.loc["units", "average"] == pytest.approx(3.5)
+
+    distinct = answer_from_profile("What are the distinct values of status?", schema, df)
+    assert distinct.result.iloc[0].tolist() == ["open", 3]
+    assert len(distinct.result) == 3
+
+    value_range = answer_from_profile("What is the range of Amount", schema, df).result
+    assert (value_range["min"][0], value_range["max"][0]) == (1.0, 20.0)
+
+
+@pytest.mark.parametrize("question", [
+    "How many rows have status open?",
+    "What is the average amount by status?",
+    "Which category has the highest number of entries?",
+    "What are the different values in the 'Region' column?",
+])
+def test_other_questions_fall_back_to_the_pipeline(dataset, question):
+    schema, df = dataset
+    assert answer_from_profile(question, schema, df) is None
+
+
+def test_profile_only_answers_without_dataframe(dataset):
+    schema, _ = dataset
+    assert answer_from_profile("How many rows are there?", schema).result["row_count"][0] == 6
+    assert answer_from_profile("What's the most frequent value in each column?", schema) is None
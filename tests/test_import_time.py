@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BACKEND_MODULES = [
+    "src.backend.approximate",
+    "src.backend.chase_sql",
+    "src.backend.chase_sql_v2",
+    "src.backend.conversation",
+    "src.backend.csv_analyzer",
+    "src.backend.excel_reader",
+    "src.backend.fast_path",
+    "src.backend.incremental",
+    "src.backend.llm",
+    "src.backend.memory_manager",
+    "src.backend.nl_answer",
+    "src.backend.prompt_context",
+    "src.backend.schema_descriptor",
+    "src.backend.single_flight",
+    "src.backend.sql_executor",
+    "src.backend.strategy_policy",
+    "src.utils.helpers",
+]
+HEAVY_MODULES = ["pandas", "numpy", "openai", "sqlparse", "pydantic", "streamlit"]
+
+# Generous ceiling for a cold interpreter on a slow CI box; the backend currently imports in ~60 ms
+IMPORT_BUDGET_SECONDS = 0.25
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(modules):
+    code = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", BACKEND_MODULES)
+def test_backend_module_does_not_import_heavy_dependencies(module):
+    assert _probe([module])["loaded"] == []
+
+
+def test_backend_import_time_budget():
+    # Best of three to keep the measurement stable under load
+    elapsed = min(_probe(BACKEND_MODULES)["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"backend import took {elapsed:.3f}s"
@@ -0,0 +1,120 @@
+import pandas as pd
+
+from src.backend.csv_analyzer import CSVAnalyzer
+from src.backend.incremental import IncrementalDataset, Manifest, dataset_id, materially_changed
+from src.backend.schema_model import ColumnProfile
+from src.utils.helpers import clean_column_names
+
+
+def _csv(rows):
+    return pd.DataFrame(rows, columns=["Region Name", "amount", "units"]).to_csv(index=False).encode()
+
+
+BASE = [["north", 10.0, 1], ["south", 20.0, 2], ["north", 30.0, 3], ["east", 15.0, 4]]
+MORE = [["south", 12.0, 5], ["east", 18.0, 6]]
+
+
+def test_manifest_detects_append_and_rewrite():
+    old = _csv(BASE)
+    manifest = Manifest.from_bytes(old, block_bytes=16)
+
+    assert manifest.appended_offset(old + b"west,1.0,9\n") == len(old)
+    assert manifest.appended_offset(old) == len(old)
+    assert manifest.appended_offset(old.replace(b"north", b"North", 1)) is None
+    assert manifest.appended_offset(old[:-5]) is None
+
+
+def test_manifest_rejects_continued_last_row():
+    old = _csv(BASE).rstrip(b"\n")
+    manifest = Manifest.from_bytes(old)
+    assert manifest.appended_offset(old + b"5\n") is None
+    assert manifest.appended_offset(old + b"\nwest,1.0,9\n") == len(old)
+
+
+def test_extended_manifest_matches_fresh_one():
+    old, new = _csv(BASE), _csv(BASE + MORE)
+    extended = Manifest.from_bytes(old, block_bytes=16).extended(new)
+    assert extended == Manifest.from_bytes(new, block_bytes=16)
+
+
+def test_dataset_id_ignores_file_growth():
+    assert dataset_id("sales.csv", _csv(BASE)) == dataset_id("sales.csv", _csv(BASE + MORE))
+    assert dataset_id("sales.csv", _csv(BASE)) != dataset_id("other.csv", _csv(BASE))
+
+
+def test_refresh_ingests_only_appended_rows():
+    dataset = IncrementalDataset("Sales.csv", CSVAnalyzer(chunk_size=2), transform=clean_column_names)
+    dataset.load(_csv(BASE))
+    dataset.schema.set_descriptions({"Region_Name": "Sales region", "amount": "Order amount", "units": "Units sold"})
+
+    refresh = dataset.refresh(_csv(BASE + MORE))
+
+    assert not refresh.reloaded
+    assert list(refresh.appended.columns) == ["Region_Name", "amount", "units"]
+    assert refresh.appended["units"].tolist() == [5, 6]
+    assert len(dataset.df) == 6
+    # Merged statistics equal a profile of the whole file
+    full = CSVAnalyzer(chunk_size=2).profile_dataframe(clean_column_names(pd.DataFrame(BASE + MORE, columns=["Region Name", "amount", "units"])), "Sales.csv")
+    assert dataset.schema.row_count == 6
+    for name in full.columns:
+        fresh = full.columns[name].to_dict()
+        merged = dataset.schema.columns[name].to_dict()
+        merged.pop("description", None)
+        assert merged == fresh
+    # Regions and amounts stay within their old profile; units grew past its range
+    assert refresh.changed_columns == ["units"]
+    assert dataset.schema.columns["Region_Name"].description == "Sales region"
+    assert dataset.schema.columns["units"].description is None
+
+
+def test_refresh_reloads_when_prefix_differs():
+    dataset = IncrementalDataset("sales.csv")
+    dataset.load(_csv(BASE))
+    version = dataset.version
+
+    refresh = dataset.refresh(_csv(MORE + BASE))
+
+    assert refresh.reloaded
+    assert dataset.version == version + 1
+    assert dataset.df["units"].tolist() == [5, 6, 1, 2, 3, 4]
+
+
+def test_refresh_respects_max_rows():
+    dataset = IncrementalDataset("sales.csv", max_rows=5)
+    dataset.load(_csv(BASE))
+
+    refresh = dataset.refresh(_csv(BASE + MORE))
+
+    assert len(refresh.appended) == 1
+    assert len(dataset.df) == 5
+    assert dataset.total_rows == 6 and dataset.truncated
+
+
+def test_load_streams_chunks_and_keeps_only_capped_rows(monkeypatch):
+    chunk_sizes = []
+    read_csv = pd.read_csv
+
+    def spy(*args, **kwargs):
+        chunk_sizes.append(kwargs.get("chunksize"))
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", spy)
+    rows = BASE * 10
+    dataset = IncrementalDataset("sales.csv", CSVAnalyzer(chunk_size=3), max_rows=7)
+    dataset.load(_csv(rows))
+    assert chunk_sizes[-1] == 3
+    assert len(dataset.df) == 7 and dataset.total_rows == 40
+    assert dataset.schema.row_count == 7
+
+    refresh = dataset.refresh(_csv(rows + MORE * 4))
+    assert chunk_sizes[-1] == 3
+    assert refresh.appended.empty and dataset.total_rows == 48
+
+
+def test_new_category_is_material():
+    old = ColumnProfile("object", 3, ["a", "b", "c"], 0, False, True)
+    same = ColumnProfile("object", 3, ["b", "a", "c"], 0, False, True)
+    grown = ColumnProfile("object", 4, ["a", "b", "c", "d"], 0, False, True)
+    assert not materially_changed(old, same, 100, 120)
+    assert materially_changed(old, grown, 100, 120)
+    assert materially_changed(old, ColumnProfile("object", 3, ["a", "b", "c"], 30, False, True), 100, 120)
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from benchmarks.fake_llm import FakeLLMServer
+from config.config import Config
+from src.backend import llm
+from src.backend.llm import STAGE_ANSWER, STAGE_DESCRIBE, STAGE_SQL, ModelRouter, call_cost
+from src.backend.schemas import SQLGenerationResponse
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    """Fresh router and routing config pointed at a local stub server"""
+    def start(**server_args):
+        server = FakeLLMServer(**server_args).start()
+        monkeypatch.setattr(Config, "OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setattr(Config, "OPENAI_API_KEY", "test")
+        monkeypatch.setattr(Config, "LLM_SMALL_MODEL", "gpt-4o-mini")
+        monkeypatch.setattr(Config, "LLM_LARGE_MODEL", "gpt-4o")
+        monkeypatch.setattr(Config, "LLM_STAGE_TIERS", "describe=small,answer=small,sql=large")
+        monkeypatch.setattr(Config, "LLM_STAGE_SLOS", "sql=0.5")
+        monkeypatch.setattr(llm, "ROUTER", ModelRouter(probe_every=4))
+        servers.append(server)
+        return server
+
+    servers = []
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_stages_use_their_tier(routed):
+    server = routed(latency=0.0)
+    answer = llm.llm_generate_content("Summarize", None, stage=STAGE_ANSWER)
+    sql = llm.llm_generate_content("Table: sales", SQLGenerationResponse, stage=STAGE_SQL)
+
+    assert answer == "The query returned the requested rows."
+    assert json.loads(sql)["sql"].startswith("SELECT")
+    assert server.model_counts == {"gpt-4o-mini": 1, "gpt-4o": 1}
+    stats = llm.ROUTER.stats()
+    assert stats[STAGE_ANSWER]["models"] == {"gpt-4o-mini": 1}
+    assert stats[STAGE_SQL]["models"] == {"gpt-4o": 1}
+    assert stats[STAGE_SQL]["cost_usd"] == pytest.approx(
+        call_cost("gpt-4o", stats[STAGE_SQL]["prompt_tokens"], stats[STAGE_SQL]["completion_tokens"])
+    )
+    assert stats[STAGE_SQL]["cost_usd"] > 0
+
+
+def test_call_over_slo_falls_back_to_faster_tier(routed):
+    server = routed(latency=0.0, model_latency={"gpt-4o": 2.0})
+
+    sql = llm.llm_generate_content("Table: sales", SQLGenerationResponse, stage=STAGE_SQL)
+
+    assert json.loads(sql)["sql"].startswith("SELECT")
+    stats = llm.ROUTER.stats()[STAGE_SQL]
+    assert stats["errors"] == 1 and stats["fallbacks"] == 1
+    assert stats["models"] == {"gpt-4o-mini": 1}
+    assert stats["p90_latency"] < 0.5
+
+
+def test_slow_tier_is_skipped_until_a_probe_recovers(routed):
+    routed(latency=0.0)
+    router = llm.ROUTER
+    for _ in range(3):
+        router.record(STAGE_SQL, "large", "gpt-4o", 0.8)
+
+    # Degraded: calls go to the small tier, except every probe_every-th call
+    tiers = [router.route(STAGE_SQL) for _ in range(4)]
+    assert tiers == ["small", "small", "small", "large"]
+
+    # The probe met the SLO, so the stage is back on its own tier
+    router.record(STAGE_SQL, "large", "gpt-4o", 0.01)
+    assert router.route(STAGE_SQL) == "large"
+
+
+def test_untagged_calls_keep_the_configured_model(routed, monkeypatch):
+    server = routed(latency=0.0)
+    monkeypatch.setattr(Config, "OPENAI_MODEL", "gpt-4.1")
+    llm.llm_generate_content("hello", None)
+    assert server.model_counts == {"gpt-4.1": 1}
+    # A stage with a tier but no SLO always gets its tier
+    assert llm.ROUTER.route(STAGE_DESCRIBE) == "small"
+
+
+def test_calls_with_an_slo_still_retry_transient_errors(routed, monkeypatch):
+    from openai import APIConnectionError
+    server = routed(latency=0.0)
+    create, failures = llm._create, []
+
+    def flaky(client, *args):
+        if not failures:
+            failures.append(client.max_retries)
+            raise APIConnectionError(request=None)
+        return create(client, *args)
+
+    monkeypatch.setattr(llm, "_create", flaky)
+    monkeypatch.setattr(llm.time, "sleep", lambda seconds: None)
+    sql = llm.llm_generate_content("Table: sales", SQLGenerationResponse, stage=STAGE_SQL)
+
+    assert json.loads(sql)["sql"].startswith("SELECT")
+    assert failures == [0]
+    assert server.model_counts == {"gpt-4o": 1}
+    assert llm.ROUTER.stats()[STAGE_SQL]["fallbacks"] == 0
+
+
+def test_non_timeout_errors_do_not_fall_back(routed, monkeypatch):
+    routed(latency=0.0)
+    calls = []
+
+    def fail(prompt, pydantic_model, model, timeout=None):
+        calls.append(model)
+        raise ValueError("401 unauthorized")
+
+    monkeypatch.setattr(llm, "_complete", fail)
+    with pytest.raises(ValueError):
+        llm.llm_generate_content("Table: sales", SQLGenerationResponse, stage=STAGE_SQL)
+    assert calls == ["gpt-4o"]
+    assert llm.ROUTER.stats()[STAGE_SQL]["fallbacks"] == 0
@@ -0,0 +1,81 @@
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.backend.incremental import IncrementalDataset
+from src.backend.memory_manager import MemoryManager, estimate_nbytes
+
+
+def _frame(rows=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"x": rng.normal(size=rows), "label": rng.choice(["a", "b", "c"], size=rows)})
+
+
+def test_spills_least_recently_used_and_reloads(tmp_path):
+    first, second = _frame(seed=1), _frame(seed=2)
+    manager = MemoryManager(budget_bytes=estimate_nbytes(first) + 1000, spill_dir=str(tmp_path))
+
+    a = manager.register(first, "dataset")
+    b = manager.register(second, "dataset")
+
+    assert a.spilled and not b.spilled
+    assert len(os.listdir(tmp_path)) == 1
+    # Access reloads a transparently and spills b, now the colder one
+    pd.testing.assert_frame_equal(a.get(), first)
+    assert not a.spilled and b.spilled
+    usage = manager.usage()
+    assert usage["resident_bytes"] <= usage["budget_bytes"]
+    assert usage["objects"] == 2 and usage["spills"] == 2 and usage["reloads"] == 1
+    assert usage["by_kind"]["dataset"]["spilled_bytes"] == b.nbytes
+
+
+def test_released_objects_leave_the_accounting(tmp_path):
+    manager = MemoryManager(budget_bytes=1, spill_dir=str(tmp_path))
+    a = manager.register(_frame(), "dataset")
+    manager.register({"schema": "x" * 1000}, "schema")  # spills a
+    assert a.spilled and os.listdir(tmp_path)
+
+    del a
+    gc.collect()
+
+    assert os.listdir(tmp_path) == []
+    assert manager.usage()["objects"] == 0
+
+
+def test_same_key_shares_one_handle(tmp_path):
+    manager = MemoryManager(budget_bytes=2**30, spill_dir=str(tmp_path))
+    frame = _frame()
+    first = manager.register(frame, "dataset", key="k")
+    second = manager.register(frame.copy(), "dataset", key="k")
+    assert first is second
+    assert manager.usage()["resident_bytes"] == first.nbytes
+
+
+def test_dataset_reloads_spilled_frame(tmp_path):
+    manager = MemoryManager(budget_bytes=1, spill_dir=str(tmp_path))
+    data = _frame(rows=200).to_csv(index=False).encode()
+    dataset = IncrementalDataset("spill.csv", memory=manager)
+    dataset.load(data)
+
+    assert dataset._frame.spilled
+    assert len(dataset.df) == 200
+    refresh = dataset.refresh(data + b"1.5,a\n")
+    assert len(refresh.appended) == 1
+    assert len(dataset.df) == 201 and dataset.schema.row_count == 201
+
+
+def test_export_files_are_removed_when_replaced_or_released(tmp_path):
+    manager = MemoryManager(budget_bytes=2**30, spill_dir=str(tmp_path))
+    first = manager.export_file(".csv")
+    assert os.path.dirname(first.path) == str(tmp_path / "exports")
+    second = manager.export_file(".csv")
+
+    first.remove()
+    assert not os.path.exists(first.path) and os.path.exists(second.path)
+    path = second.path
+    del second
+    gc.collect()
+    assert os.listdir(tmp_path / "exports") == []
+    assert not os.path.exists(path)
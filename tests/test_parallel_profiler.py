@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backend.csv_analyzer import CSVAnalyzer
+from src.backend.parallel_profiler import ParallelProfiler, line_aligned_offsets, read_header
+
+
+@pytest.fixture
+def wide_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({f"num_{i}": rng.normal(size=n).round(3) for i in range(6)})
+    df["cat"] = rng.choice(["a", "b", "c"], size=n)
+    df["ints"] = np.arange(n)
+    df.loc[::97, "num_0"] = np.nan
+    path = tmp_path / "wide.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def test_offsets_are_line_aligned(wide_csv):
+    path, _ = wide_csv
+    _, start = read_header(str(path))
+    offsets = line_aligned_offsets(str(path), start, shard_bytes=4_096)
+    data = path.read_bytes()
+    assert offsets[0] == start and offsets[-1] == len(data)
+    assert all(data[o - 1:o] == b"\n" for o in offsets[1:-1])
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_profile_matches_serial(wide_csv, workers):
+    path, df = wide_csv
+    profiler = ParallelProfiler(workers=workers, shard_bytes=16_384, column_group_size=3, chunk_size=500)
+    assert len(profiler.plan(str(path))) > 3
+
+    parallel = profiler.profile_csv(str(path))
+    serial = CSVAnalyzer().profile_csv(str(path))
+
+    assert list(parallel.columns) == list(df.columns)
+    assert parallel.row_count == serial.row_count == len(df)
+    assert parallel.sample_data == serial.sample_data
+    for name in df.columns:
+        p, s = parallel.columns[name], serial.columns[name]
+        assert (p.data_type, p.null_count, p.unique_values) == (s.data_type, s.null_count, s.unique_values)
+        assert p.min_value == s.min_value and p.max_value == s.max_value
+        if p.mean_value is not None:
+            assert p.mean_value == pytest.approx(s.mean_value)
+
+
+def test_csv_analyzer_uses_workers(wide_csv):
+    path, df = wide_csv
+    schema = CSVAnalyzer(workers=2).analyze_csv(str(path))
+    assert schema["row_count"] == len(df)
+    assert schema["columns"]["ints"]["max_value"] == len(df) - 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_quoted_multiline_fields_fall_back_to_serial(tmp_path, workers):
+    n = 2_000
+    df = pd.DataFrame({"id": np.arange(n), "note": [f"line one\nline two {i}" for i in range(n)]})
+    path = tmp_path / "notes.csv"
+    df.to_csv(path, index=False)
+
+    schema = ParallelProfiler(workers=workers, shard_bytes=4_096).profile_csv(str(path))
+
+    assert schema.row_count == n
+    assert list(schema.columns) == ["id", "note"]
+    assert schema.columns["id"].max_value == n - 1
+    assert schema.columns["note"].null_count == 0
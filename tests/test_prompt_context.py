@@ -0,0 +1,44 @@
+from src.backend.chase_sql_v2 import ChaseSQL
+from src.backend.conversation import PriorResult
+from src.backend.prompt_context import PROMPT_METRICS, PromptContext
+
+SCHEMA = {
+    "table_name": "sales",
+    "row_count": 3,
+    "columns": [
+        {"name": "region", "data_type": "str", "description": "Sales region",
+         "is_categorical": True, "sample_values": ["n", "s"]},
+        {"name": "amount", "data_type": "float64", "description": "Order value"},
+    ],
+}
+
+
+def test_schema_block_is_an_identical_prefix_of_every_prompt(fake_llm):
+    prompts = fake_llm()
+    context = PromptContext.from_schema(SCHEMA)
+    prior = [PriorResult("prev_result_1", "Total by region?", "SELECT ...", ["region", "total"], 2)]
+    chase = ChaseSQL(SCHEMA, "Only north", prior_results=prior, context=context)
+    chase.generate_candidates()
+    chase.rank_candidates(rerank_with_llm=True)
+
+    assert len(prompts) == 5
+    assert all(p.startswith(context.prefix) for p in prompts)
+    assert "- region (str): Sales region Values include: n, s" in context.prefix
+    assert "Table: sales (3 rows)" in context.prefix
+    # Per-question parts come after the shared prefix
+    assert all("prev_result_1" not in context.prefix and "prev_result_1" in p for p in prompts)
+
+
+def test_context_matches_for_dict_and_list_columns():
+    as_dict = dict(SCHEMA, columns={c["name"]: {k: v for k, v in c.items() if k != "name"} for c in SCHEMA["columns"]})
+    assert PromptContext.from_schema(as_dict) == PromptContext.from_schema(SCHEMA)
+
+
+def test_metrics_report_prefix_share(fake_llm):
+    fake_llm()
+    PROMPT_METRICS.reset()
+    ChaseSQL(SCHEMA, "How many?").generate_candidates()
+    metrics = PROMPT_METRICS.as_dict()
+    assert metrics["prompts"] == 4
+    assert metrics["prefix_tokens"] == 4 * PromptContext.from_schema(SCHEMA).prefix_tokens
+    assert 0 < metrics["prefix_share"] < 1
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from src.backend.speculative import SpeculativeExecutor
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine(items=pd.DataFrame({"id": range(2500), "value": [i * 0.5 for i in range(2500)]}))
+
+
+def test_pages_are_fetched_on_demand(engine):
+    cursor = engine.cursor("SELECT * FROM items ORDER BY id;", page_size=1000)
+    assert cursor.count() == 2500
+    assert cursor.page_count == 3
+    assert cursor.columns == ["id", "value"]
+    assert cursor.page(0)["id"].tolist() == list(range(1000))
+    assert cursor.page(2)["id"].tolist() == list(range(2000, 2500))
+    assert cursor.page(3).empty
+
+
+def test_chunks_cover_the_result_once(engine):
+    chunks = list(engine.cursor("SELECT id FROM items").iter_chunks(chunk_size=1000))
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    assert pd.concat(chunks)["id"].tolist() == list(range(2500))
+
+
+def test_csv_export_streams_to_disk(engine, tmp_path):
+    path = engine.cursor("SELECT * FROM items").to_csv(str(tmp_path / "out.csv"), chunk_size=700)
+    exported = pd.read_csv(path)
+    assert len(exported) == 2500 and list(exported.columns) == ["id", "value"]
+
+    empty = engine.cursor("SELECT * FROM items WHERE id < 0").to_csv(str(tmp_path / "empty.csv"))
+    assert list(pd.read_csv(empty).columns) == ["id", "value"]
+
+
+def test_parquet_export_round_trips(engine, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = engine.cursor("SELECT * FROM items").to_parquet(str(tmp_path / "out.parquet"), chunk_size=1000)
+    assert pd.read_parquet(path)["id"].tolist() == list(range(2500))
+
+
+def test_storage_classes_cover_the_whole_result(engine):
+    cursor = engine.cursor("SELECT id, CASE WHEN id < 1000 THEN NULL ELSE value END AS late FROM items")
+    assert cursor.storage_classes() == {"id": ["integer"], "late": ["null", "real"]}
+
+
+def test_parquet_export_keeps_types_of_later_chunks(engine, tmp_path):
+    pytest.importorskip("pyarrow")
+    sql = ("SELECT id, CASE WHEN id < 1000 THEN NULL ELSE value END AS late, "
+           "CASE WHEN id < 1000 THEN id ELSE value END AS widened FROM items ORDER BY id")
+    path = engine.cursor(sql).to_parquet(str(tmp_path / "out.parquet"), chunk_size=1000)
+    exported = pd.read_parquet(path)
+    assert exported["late"].isna().sum() == 1000
+    assert exported["late"].iloc[-1] == 2499 * 0.5
+    assert exported["widened"].iloc[-1] == 2499 * 0.5
+
+
+def test_speculative_runs_fetch_only_the_first_page(engine):
+    speculative = SpeculativeExecutor(engine, max_rows=100)
+    try:
+        assert len(speculative.result("SELECT * FROM items")) == 100
+    finally:
+        speculative.shutdown()
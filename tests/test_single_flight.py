@@ -0,0 +1,119 @@
+import threading
+import time
+from unittest import mock
+
+import pandas as pd
+
+from src.backend import llm
+from src.backend.single_flight import LLM_FLIGHTS, SingleFlight, content_key
+from src.backend.sql_executor import SQLEngine
+
+
+def _run_concurrently(group, key, fn, callers=4):
+    """Start callers that all ask for key while the first call is blocked; return their results"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_computation():
+    group = SingleFlight()
+    release, calls = threading.Event(), []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    threads, results, _ = _run_concurrently(group, "k", work)
+    while group.shared < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 4 and all(r is results[0] for r in results)
+    assert group.in_flight() == 0
+
+
+def test_exception_reaches_every_waiter():
+    group = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    threads, results, errors = _run_concurrently(group, "k", fail, callers=3)
+    while group.shared < 2:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [] and len(errors) == 3
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_finished_results_are_not_cached():
+    group = SingleFlight()
+    assert group.do("k", lambda: 1) == 1
+    assert group.do("k", lambda: 2) == 2
+    assert group.stats() == {"executed": 2, "shared": 0}
+
+
+def test_content_key_separates_parts():
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key(b"data", 1) == content_key(b"data", 1)
+
+
+def test_engines_with_same_data_share_query_keys():
+    df = pd.DataFrame({"x": range(10)})
+    first, second, other = SQLEngine(), SQLEngine(), SQLEngine()
+    try:
+        first.load_table(df, "t")
+        second.load_table(df, "t")
+        other.load_table(df.assign(x=df.x + 1), "t")
+        assert first.fingerprints == second.fingerprints != other.fingerprints
+        # Appending changes the identity
+        second.load_table(df, "t", if_exists="append")
+        assert first.fingerprints != second.fingerprints
+        assert second.execute("SELECT COUNT(*) AS n FROM t")["n"].iloc[0] == 20
+    finally:
+        for engine in (first, second, other):
+            engine.close()
+
+
+def test_identical_prompts_share_one_api_call():
+    release, calls = threading.Event(), []
+
+    def complete(prompt, pydantic_model, model, timeout=None):
+        calls.append(prompt)
+        release.wait(5)
+        return "SELECT 1", None
+
+    with mock.patch.object(llm, "_complete", side_effect=complete):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(llm.llm_generate_content("same prompt", None))) for _ in range(3)]
+        shared = LLM_FLIGHTS.shared
+        for thread in threads:
+            thread.start()
+        while LLM_FLIGHTS.shared < shared + 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert calls == ["same prompt"]
+        assert results == ["SELECT 1"] * 3
+        # A different prompt is not coalesced
+        assert llm.llm_generate_content("other prompt", None) == "SELECT 1"
+        assert len(calls) == 2
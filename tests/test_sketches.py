@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from src.backend.sketches import DistinctCounter, FrequentItems, KLLSketch, ReservoirSample
+
+
+def test_kll_quantiles_within_rank_error():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=200_000)
+    sketch = KLLSketch(k=200)
+    for chunk in np.array_split(np.sort(values), 20):  # sorted input is the adversarial case
+        sketch.update(chunk)
+    assert sum(len(level) for level in sketch.levels) < 2_000
+    for q, estimate in zip([0.1, 0.5, 0.9], sketch.quantiles([0.1, 0.5, 0.9])):
+        assert abs((values < estimate).mean() - q) < 0.02
+
+
+def test_kll_merge_matches_single_stream():
+    values = np.arange(100_000, dtype=float)
+    left, right = KLLSketch(seed=1), KLLSketch(seed=2)
+    left.update(values[:30_000])
+    right.update(values[30_000:])
+    left.merge(right)
+    assert left.n == 100_000
+    assert abs(left.quantiles([0.5])[0] - 50_000) < 2_000
+
+
+def test_distinct_counter_exact_then_approximate():
+    counter = DistinctCounter(exact_limit=1_000)
+    counter.update(pd.util.hash_array(np.arange(500)))
+    counter.update(pd.util.hash_array(np.arange(500)))
+    assert counter.estimate() == 500
+
+    big = DistinctCounter(exact_limit=1_000)
+    other = DistinctCounter(exact_limit=1_000)
+    big.update(pd.util.hash_array(np.arange(60_000)))
+    other.update(pd.util.hash_array(np.arange(40_000, 100_000)))
+    big.merge(other)
+    assert abs(big.estimate() - 100_000) / 100_000 < 0.03
+
+
+def test_frequent_items_keeps_heavy_hitters():
+    rng = np.random.default_rng(0)
+    noise = pd.Series(rng.integers(1_000, 1_000_000, size=50_000))
+    heavy = pd.Series([7] * 5_000 + [8] * 3_000)
+    sketch = FrequentItems(capacity=32)
+    stream = pd.concat([noise, heavy]).sample(frac=1, random_state=0)
+    for start in range(0, len(stream), 5_000):
+        sketch.update(stream.iloc[start:start + 5_000].value_counts())
+    assert sketch.top(2) == [7, 8]
+
+
+def test_reservoir_is_uniform_over_stream():
+    hits = np.zeros(10)
+    for seed in range(300):
+        reservoir = ReservoirSample(capacity=10, seed=seed)
+        for chunk in np.array_split(np.arange(1_000), 7):
+            reservoir.update(chunk)
+        hits += np.bincount(reservoir.values.astype(int) // 100, minlength=10)
+    # Every decile of the stream is equally represented (a head sample would only hit the first)
+    assert hits.min() > 0.7 * hits.mean()
+
+
+def test_reservoir_merge_is_proportional():
+    left, right = ReservoirSample(capacity=1_000, seed=1), ReservoirSample(capacity=1_000, seed=2)
+    left.update(np.zeros(90_000))
+    right.update(np.ones(10_000))
+    left.merge(right)
+    assert len(left.values) == 1_000
+    assert 0.05 < left.values.astype(float).mean() < 0.15
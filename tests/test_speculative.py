@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.backend.speculative import SpeculativeExecutor
+from src.backend.sql_executor import SQL_FLIGHTS, QueryCancelled, QueryHandle
+
+SLOW_SQL = (
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50000000) "
+    "SELECT COUNT(*) FROM n"
+)
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine(t=pd.DataFrame({"x": range(100)}))
+
+
+def test_engine_keeps_table_resident(engine):
+    assert engine.execute("SELECT COUNT(*) AS n FROM t")["n"].iloc[0] == 100
+    # Other threads see the same resident data through their own connection
+    out = {}
+    thread = threading.Thread(target=lambda: out.update(n=engine.execute("SELECT SUM(x) AS s FROM t")["s"].iloc[0]))
+    thread.start()
+    thread.join()
+    assert out["n"] == sum(range(100))
+
+
+def test_query_handle_interrupts_running_query(engine):
+    handle = QueryHandle()
+    timer = threading.Timer(0.2, handle.cancel)
+    timer.start()
+    start = time.perf_counter()
+    with pytest.raises(QueryCancelled):
+        engine.execute(SLOW_SQL, handle)
+    assert time.perf_counter() - start < 5
+
+
+def test_speculative_executor_cancels_losers_and_keeps_finished(engine):
+    speculative = SpeculativeExecutor(engine, max_workers=2)
+    fast = "SELECT MAX(x) AS m FROM t"
+    speculative.submit(fast)
+    slow = speculative.submit(SLOW_SQL)
+    assert speculative.result(fast)["m"].iloc[0] == 99
+
+    speculative.submit("  " + fast + "  ")  # same prepared SQL, no second execution
+    assert len(speculative._futures) == 2
+
+    time.sleep(0.1)
+    assert speculative.cancel_others(fast) == [SLOW_SQL]
+    with pytest.raises(Exception):
+        slow.result(timeout=5)
+    assert list(speculative.cached_results()) == [fast]
+    speculative.shutdown()
+
+
+def test_candidates_cannot_write(engine):
+    executor = SpeculativeExecutor(engine)
+    try:
+        assert not executor.succeeded("DELETE FROM t WHERE x > 1")
+    finally:
+        executor.shutdown()
+    assert engine.execute("SELECT COUNT(*) AS n FROM t")["n"].iloc[0] == 100
+    # No write transaction was left open, so tables can still be loaded
+    engine.load_table(pd.DataFrame({"y": [1]}), "u")
+    engine.drop_table("u")
+
+
+def test_connections_of_finished_pool_threads_are_closed(engine):
+    for _ in range(20):
+        executor = SpeculativeExecutor(engine, max_workers=2)
+        executor.submit("SELECT 1")
+        executor.submit("SELECT 2")
+        executor.result("SELECT 1")
+        executor.shutdown()
+        executor._pool.shutdown(wait=True)
+    # The main thread's connection and those of the last pool's two threads
+    assert len(engine._connections) <= 3
+
+
+def _start_shared(engine, sql, handles):
+    """Run sql once per handle on its own thread, all joined to one flight; returns (threads, outcomes)"""
+    outcomes = {}
+
+    def run(name, handle):
+        try:
+            outcomes[name] = engine.execute(sql, handle)
+        except QueryCancelled as e:
+            outcomes[name] = e
+
+    shared = SQL_FLIGHTS.shared
+    threads = {}
+    for name, handle in handles.items():
+        threads[name] = threading.Thread(target=run, args=(name, handle))
+        threads[name].start()
+    deadline = time.monotonic() + 5
+    while SQL_FLIGHTS.shared < shared + len(handles) - 1:
+        assert time.monotonic() < deadline, "callers did not join one flight"
+        time.sleep(0.001)
+    return threads, outcomes
+
+
+def test_shared_query_is_interrupted_only_when_every_waiter_cancels(engine):
+    handles = {"first": QueryHandle(), "second": QueryHandle()}
+    threads, outcomes = _start_shared(engine, SLOW_SQL, handles)
+
+    handles["second"].cancel()
+    threads["second"].join(5)
+    assert isinstance(outcomes["second"], QueryCancelled)
+    assert threads["first"].is_alive() and SQL_FLIGHTS.in_flight() == 1
+
+    handles["first"].cancel()
+    threads["first"].join(5)
+    assert isinstance(outcomes["first"], QueryCancelled)
+    assert SQL_FLIGHTS.in_flight() == 0
+
+
+def test_waiter_gets_the_result_when_another_caller_cancels(engine):
+    sql = SLOW_SQL.replace("50000000", "1000000")
+    handles = {"first": QueryHandle(), "second": QueryHandle()}
+    threads, outcomes = _start_shared(engine, sql, handles)
+
+    handles["first"].cancel()
+    for thread in threads.values():
+        thread.join(10)
+    assert isinstance(outcomes["first"], QueryCancelled)
+    assert outcomes["second"].iloc[0, 0] == 1000000
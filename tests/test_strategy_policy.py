@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+
+import pytest
+
+from src.backend.chase_sql import CHASESQLGenerator
+from src.backend.chase_sql_v2 import ChaseSQL
+from src.backend.strategy_policy import StrategyPolicy, dataset_key, get_strategy_policy, question_type
+
+SCHEMA = {
+    "table_name": "sales",
+    "columns": [{"name": "region", "data_type": "str"}, {"name": "amount", "data_type": "float64"}],
+}
+
+
+@pytest.mark.parametrize("question, qtype", [
+    ("What are the top 5 regions?", "ranking"),
+    ("Total amount by region", "grouped"),
+    ("How many orders are there?", "aggregate"),
+    ("Show orders with amount greater than 10", "filter"),
+    ("Show the orders", "lookup"),
+])
+def test_question_types(question, qtype):
+    assert question_type(question) == qtype
+
+
+def test_dataset_key_ignores_column_form_and_order():
+    as_dict = {"table_name": "sales", "columns": {"amount": {}, "region": {}}}
+    assert dataset_key(SCHEMA) == dataset_key(as_dict)
+
+
+def test_policy_learns_the_winning_strategy(tmp_path):
+    path = str(tmp_path / "policy.json")
+    policy = StrategyPolicy(ChaseSQL.STRATEGIES, path=path, seed=0)
+    for _ in range(30):
+        first = policy.order("ds", "aggregate")[0]
+        policy.record("ds", "aggregate", first, first == "few_shot")
+    assert sum(policy.order("ds", "aggregate")[0] == "few_shot" for _ in range(20)) >= 18
+    # Recording only counts in memory until the next save
+    assert not os.path.exists(path)
+    policy.save()
+
+    reloaded = StrategyPolicy(ChaseSQL.STRATEGIES, path=path, seed=1)
+    assert reloaded.outcomes == json.loads(open(path).read())
+    assert reloaded.success_rate("ds", "aggregate", "few_shot") > 0.8
+    # A new dataset starts from the pooled outcomes of the same question type
+    assert reloaded.order("other", "aggregate")[0] == "few_shot"
+
+
+def test_concurrent_policies_do_not_lose_outcomes(tmp_path):
+    path = str(tmp_path / "policy.json")
+    # E.g. two processes sharing the file
+    first = StrategyPolicy(ChaseSQL.STRATEGIES, path=path, seed=0)
+    second = StrategyPolicy(ChaseSQL.STRATEGIES, path=path, seed=1)
+    shared = get_strategy_policy(tuple(ChaseSQL.STRATEGIES), path)
+    assert get_strategy_policy(tuple(ChaseSQL.STRATEGIES), path) is shared
+
+    threads = [
+        threading.Thread(target=lambda p=p: [
+            (p.record("ds", "aggregate", "few_shot", True), p.save()) for _ in range(10)
+        ])
+        for p in (first, second, shared, shared)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    saved = json.loads(open(path).read())
+    assert saved["ds|aggregate"]["few_shot"] == [40.0, 0.0]
+    assert saved["*|aggregate"]["few_shot"] == [40.0, 0.0]
+    # A later save also brings in what the other policies recorded
+    first.record("ds", "aggregate", "few_shot", False)
+    first.save()
+    assert first.outcomes["ds|aggregate"]["few_shot"] == [40.0, 1.0]
+
+
+def test_adaptive_generation_stops_at_first_valid_candidate(fake_llm):
+    calls = fake_llm("SELECT broken FROM")
+    policy = StrategyPolicy(ChaseSQL.STRATEGIES, seed=0)
+    chase = ChaseSQL(SCHEMA, "How many orders?")
+    best = chase.generate_adaptive(policy, validate=lambda sql: True)
+    assert best == "SELECT broken FROM" and len(calls) == 1 and len(chase.candidates) == 1
+
+
+def test_adaptive_generation_escalates_on_failure(fake_llm):
+    calls = fake_llm("SELECT broken FROM")
+    policy = StrategyPolicy(ChaseSQL.STRATEGIES, seed=0)
+    chase = ChaseSQL(SCHEMA, "How many orders?")
+    attempts = iter([False, False, True, True])
+    chase.generate_adaptive(policy, validate=lambda sql: next(attempts))
+    assert len(calls) == 3
+    key = f"{dataset_key(SCHEMA)}|aggregate"
+    assert sorted(counts for counts in policy.outcomes[key].values()) == [[0.0, 1.0], [0.0, 1.0], [1.0, 0.0]]
+
+
+def test_legacy_generator_tries_strategies_in_policy_order(monkeypatch):
+    schema = {"table_name": "sales", "columns": {"region": {}, "amount": {}}}
+    generator = CHASESQLGenerator.__new__(CHASESQLGenerator)
+    generator.schema = schema
+    monkeypatch.setattr(generator, "_direct_translation", lambda q: "not sql at all")
+    monkeypatch.setattr(generator, "_template_based_approach", lambda q: "```sql\nSELECT SUM(amount) FROM sales\n```")
+    monkeypatch.setattr(generator, "_semantic_parsing_approach", lambda q: "")
+    policy = StrategyPolicy(CHASESQLGenerator.STRATEGIES, seed=0)
+    sql = generator.generate_sql_adaptive("Total amount?", policy)
+    assert "SUM(amount)" in sql
+    assert policy.success_rate(dataset_key(schema), "aggregate", "template_based") > 0.5